@@ -1,15 +1,58 @@
 import os
 import re
 import copy
-from PySide6.QtCore import QObject, Signal
+import sqlite3
+from PySide6.QtCore import QObject, Signal, QRunnable, QThreadPool
 
 import parser
+import tracing
 from parser import Highlight
-from transcript_parser import process_new_highlight
+from transcript_parser import process_new_highlight, parse_transcript_file
+from search_index import SearchIndex, as_search_query
+from keyword_matcher import KeywordMatcher
+from speaker_index import SpeakerIndex
+from stats_engine import StatsEngine
+from highlight_index import HighlightIndex
+from workspace import Workspace, DocumentState
+from highlight_store import HighlightStore, content_hash
+from utils import resource_path
+
+def _read_document(filepath: str, file_tags: list, store: HighlightStore | None) -> tuple:
+    """Parses a document and hashes its source; returns (raw_text, highlights, mode, content hash or None)."""
+    key = None
+    if store is not None and os.path.dirname(os.path.abspath(filepath)) != os.path.abspath(resource_path("tutorials")):
+        key = content_hash(filepath)
+    with_highlights = key is None or not store.has(key)
+    return (*parser.parse_document(filepath, file_tags, with_highlights), key)
+
+class _ParseSignals(QObject):
+    parsed = Signal(str, object)
+    failed = Signal(str, str)
+
+class _ParseTask(QRunnable):
+    def __init__(self, filepath, file_tags, store):
+        super().__init__()
+        self.signals = _ParseSignals()
+        self._filepath = filepath
+        self._file_tags = file_tags
+        self._store = store
+
+    def run(self):
+        try:
+            result = _read_document(self._filepath, self._file_tags, self._store)
+        except Exception as e:
+            # Nothing above a pool thread can catch this, so every failure is reported back.
+            self.signals.failed.emit(self._filepath, str(e))
+            return
+        self.signals.parsed.emit(self._filepath, result)
 
 class AppController(QObject):
     model_updated = Signal(str, list, str, bool, bool)
+    highlights_moved = Signal(list, bool, bool)
     status_message_requested = Signal(str, int)
+    workspace_changed = Signal(list, str)
+    document_open_failed = Signal(str, str)
+    document_changed_on_disk = Signal(str)
 
     def __init__(self, theme_manager):
         super().__init__()
@@ -20,68 +63,282 @@ class AppController(QObject):
         self.highlights: list[Highlight] = []
         self.current_filepath = None
         self.document_mode = "simple"
-        self.last_shown_search_term = None
+        self.last_shown_search = None
+        self._search_index = None
+        self._speaker_index = None
+        self._content_hash = None
+        self.stats_engine = StatsEngine()
+        self.highlight_index = HighlightIndex()
+        self.highlight_store = self._open_highlight_store()
         
         # HISTORY NOW STORES A TUPLE: (raw_text, highlights_list)
         self._history: list[tuple[str, list[Highlight]]] = []
         self._history_index = -1
 
+        budget_mb = self.theme_manager.get_value("app_config.workspace_memory_budget_mb", 256)
+        self.workspace = Workspace(budget_mb * 1024 * 1024)
+        self._pending_parses = {} # filepath -> signals of its running parse task
+        self._activate_on_parse = None
+        self._changed_on_disk: set[str] = set() # modified documents whose file changed while inactive
+
+    def _open_highlight_store(self) -> HighlightStore | None:
+        db_path = self.theme_manager.get_value("app_config.highlight_store_db", "")
+        if not db_path: return None
+        try:
+            return HighlightStore(db_path)
+        except (sqlite3.Error, OSError):
+            # Without the sidecar store highlights still save to text files as before.
+            return None
+
+    @tracing.traced("AppController.process_file")
     def process_file(self, filepath: str):
+        # A failed parse raises before anything is touched, so the open documents stay as they were.
+        result = _read_document(filepath, self.file_tags, self.highlight_store)
+        self._open_parsed_document(filepath, result, activate=True)
+
+    def open_documents(self, filepaths: list[str]):
+        """Parses several documents concurrently on the thread pool; the first one becomes active."""
+        if not filepaths: return
+        self._activate_on_parse = filepaths[0]
+        for filepath in filepaths:
+            if self.workspace.is_open(filepath) and filepath not in self._pending_parses:
+                if filepath == self._activate_on_parse:
+                    self.switch_document(filepath)
+                continue
+            self._start_parse(filepath)
+
+    def reload_in_background(self, filepath: str):
+        """
+        Re-parses an open, inactive document whose file changed on disk. One with
+        unsaved edits is left alone; activating it asks whether to reload instead.
+        """
+        if self.workspace.is_modified(filepath):
+            self._changed_on_disk.add(filepath)
+            return
+        self._start_parse(filepath)
+
+    def forget_disk_change(self, filepath: str):
+        self._changed_on_disk.discard(filepath)
+
+    def _start_parse(self, filepath: str):
+        if filepath in self._pending_parses: return
+        task = _ParseTask(filepath, self.file_tags, self.highlight_store)
+        task.signals.parsed.connect(self._on_document_parsed)
+        task.signals.failed.connect(self._on_document_parse_failed)
+        self._pending_parses[filepath] = task.signals
+        QThreadPool.globalInstance().start(task)
+
+    def _on_document_parsed(self, filepath: str, result):
+        self._pending_parses.pop(filepath, None)
+        activate = filepath in (self._activate_on_parse, self.current_filepath)
+        if filepath == self._activate_on_parse:
+            self._activate_on_parse = None
+        if not activate and self.workspace.is_modified(filepath):
+            # The document was edited while its reload was parsing; keep the edits.
+            self._changed_on_disk.add(filepath)
+            return
+        self._open_parsed_document(filepath, result, activate)
+
+    def _on_document_parse_failed(self, filepath: str, error: str):
+        self._pending_parses.pop(filepath, None)
+        if filepath == self._activate_on_parse:
+            self._activate_on_parse = None
+        self.document_open_failed.emit(filepath, error)
+
+    @tracing.traced("AppController._open_parsed_document")
+    def _open_parsed_document(self, filepath: str, result: tuple, activate: bool):
+        raw_text, highlights, document_mode, key = result
+        restored = False
+        if key is not None:
+            try:
+                if self.highlight_store.has(key):
+                    raw_text, highlights = self.highlight_store.load(key, raw_text)
+                    restored = True
+                else:
+                    self._set_simple_sort_keys(highlights, document_mode)
+                    self.highlight_store.create(key, filepath, raw_text, highlights)
+            except sqlite3.Error as e:
+                key = None
+                self.status_message_requested.emit(f"Could not use the highlight store: {e}", 5000)
+        if not restored:
+            self._set_simple_sort_keys(highlights, document_mode)
+        state = DocumentState(filepath, raw_text, highlights, document_mode,
+                              history=[(raw_text, copy.deepcopy(highlights))], history_index=0, content_hash=key)
+        if not activate:
+            self.workspace.put(state)
+            self._emit_workspace_changed()
+            return
+
+        if self.current_filepath != filepath:
+            self._stash_active_document()
+        self._restore_document(state)
+        self._emit_model_update()
+
+        is_tutorial = self.current_filepath and self.current_filepath.startswith("tutorials")
+        if not is_tutorial:
+            self.status_message_requested.emit(f"Loaded {len(self.highlights)} highlights.", 5000)
+
+    @staticmethod
+    def _set_simple_sort_keys(highlights: list[Highlight], document_mode: str):
+        if document_mode == "simple":
+            for h in highlights:
+                h.sort_key = h.start_pos
+
+    @tracing.traced("AppController._persist_highlights")
+    def _persist_highlights(self) -> bool:
+        if self._content_hash is None: return False
         try:
-            self.raw_text, self.highlights, self.document_mode = parser.parse_document(filepath, self.file_tags)
-            self.current_filepath = filepath
-            self.last_shown_search_term = None
-            
-            if self.document_mode == "simple":
-                for h in self.highlights:
-                    h.sort_key = h.start_pos
-            
-            self._save_state_to_history(clear_history=True)
-            self._emit_model_update()
-            
-            is_tutorial = self.current_filepath and self.current_filepath.startswith("tutorials")
-            if not is_tutorial:
-                self.status_message_requested.emit(f"Loaded {len(self.highlights)} highlights.", 5000)
+            self.highlight_store.sync(self._content_hash, self.highlights, self.raw_text)
+        except sqlite3.Error as e:
+            self.status_message_requested.emit(f"Could not save highlights to the highlight store: {e}", 5000)
+            return False
+        return True
+
+    @tracing.traced("AppController.switch_document")
+    def switch_document(self, filepath: str):
+        """Makes another open document active without re-parsing it."""
+        if filepath == self.current_filepath or not self.workspace.is_open(filepath): return
+        self._stash_active_document()
+        self.workspace.active_path = filepath
+        state = self.workspace.take(filepath)
+        if state is None:
+            # Its cache file is gone; fall back to parsing the source again.
+            self.workspace.remove(filepath)
+            try:
+                self.process_file(filepath)
+            except ValueError as e:
+                self.document_open_failed.emit(filepath, str(e))
+            return
+        self._restore_document(state)
+        self._emit_model_update()
+        if filepath in self._changed_on_disk:
+            self.document_changed_on_disk.emit(filepath)
 
-        except ValueError as e:
-            self.close_file()
-            raise e
+    def modified_documents(self) -> list[str]:
+        return [p for p in self.workspace.paths()
+                if (self.is_modified() if p == self.current_filepath else self.workspace.is_modified(p))]
 
-    def _add_highlight_logic(self, selected_text: str, selection_start: int):
-        paragraphs = selected_text.split('\n\n')
-        offset = 0
-        for para in paragraphs:
+    def _capture_document(self) -> DocumentState:
+        return DocumentState(self.current_filepath, self.raw_text, self.highlights, self.document_mode,
+                             self._history, self._history_index, self.last_shown_search, self._search_index,
+                             self._content_hash)
+
+    def _stash_active_document(self):
+        if self.current_filepath:
+            self.workspace.put(self._capture_document())
+
+    def _restore_document(self, state: DocumentState):
+        self.workspace.active_path = state.filepath
+        self.current_filepath = state.filepath
+        self.raw_text = state.raw_text
+        self.highlights = state.highlights
+        self.document_mode = state.document_mode
+        self._history = state.history
+        self._history_index = state.history_index
+        self.last_shown_search = state.last_shown_search
+        self._search_index = state.search_index
+        self._content_hash = state.content_hash
+        self.stats_engine.reset_highlights(self.highlights)
+        self.highlight_index.reset(self.highlights)
+        self.workspace.put(state)
+
+    @staticmethod
+    def _paragraph_spans(selected_text: str, selection_start: int) -> list[tuple[int, int]]:
+        """Splits a selection into one stripped (start, end) span per paragraph."""
+        spans, offset = [], 0
+        for para in selected_text.split('\n\n'):
             para = para.strip()
             if not para: continue
-            para_start = selection_start + offset + selected_text.find(para, offset)
-            offset = para_start - selection_start + len(para)
-            if any(h.start_pos == para_start and h.text == para for h in self.highlights):
-                continue
-            new_highlight = process_new_highlight(self.raw_text, para, para_start)
+            para_offset = selected_text.find(para, offset)
+            offset = para_offset + len(para)
+            spans.append((selection_start + para_offset, selection_start + offset))
+        return spans
+
+    def _add_highlight_spans(self, spans: list[tuple[int, int]]):
+        """Adds a highlight for every span of raw_text that isn't highlighted exactly like that already."""
+        new_spans, seen = [], set()
+        for start, end in sorted(spans):
+            if (start, end) in seen or self.highlight_index.contains(start, self.raw_text[start:end]): continue
+            seen.add((start, end))
+            new_spans.append((start, end))
+        # One forward pass finds the timestamps for all of them (see parse_transcript_file).
+        for new_highlight in parse_transcript_file(self.raw_text, new_spans):
             if self.document_mode == "simple":
                 new_highlight.sort_key = new_highlight.start_pos
             self.highlights.append(new_highlight)
+            self.stats_engine.highlight_added(new_highlight)
+            self.highlight_index.highlight_added(new_highlight)
+
+    def _add_highlight_logic(self, selected_text: str, selection_start: int):
+        self._add_highlight_spans(self._paragraph_spans(selected_text, selection_start))
 
-    def add_highlight(self, selected_text: str, selection_start: int, full_doc_text: str):
+    @tracing.traced("AppController.add_highlight")
+    def add_highlight(self, selected_text: str, selection_start: int):
         self._add_highlight_logic(selected_text, selection_start)
         self._save_state_to_history()
         self._emit_model_update()
         self.status_message_requested.emit("Highlight(s) added.", 3000)
 
-    def highlight_all_occurrences(self, search_term: str):
-        if not search_term: return
-        match_count = 0
-        for match in re.finditer(re.escape(search_term), self.raw_text, re.IGNORECASE):
-            self._add_highlight_logic(match.group(0), match.start())
-            match_count += 1
-        
-        if match_count > 0:
+    @tracing.traced("AppController.get_search_index")
+    def get_search_index(self) -> SearchIndex:
+        # Built lazily once per text version; undo/redo restore the same string objects from history.
+        if self._search_index is None or self._search_index.text is not self.raw_text:
+            self._search_index = SearchIndex(self.raw_text)
+        return self._search_index
+
+    @tracing.traced("AppController.get_speaker_index")
+    def get_speaker_index(self) -> SpeakerIndex:
+        # Like the search index, parsed once per text version (and mode) and shared with export tasks.
+        index = self._speaker_index
+        if index is None or index.text is not self.raw_text or index.mode != self.document_mode:
+            self._speaker_index = index = SpeakerIndex(self.raw_text, self.document_mode)
+        return index
+
+    @tracing.traced("AppController.highlight_all_occurrences")
+    def highlight_all_occurrences(self, search):
+        search = as_search_query(search)
+        if not search.text: return
+        search_term = search.text
+        try:
+            matches = self.get_search_index().search(search)
+        except re.error as e:
+            self.status_message_requested.emit(f"Invalid search pattern '{search_term}': {e}", 5000)
+            return
+        highlight_count = len(self.highlights)
+        self._add_highlight_spans([span for start, end in matches
+                                   for span in self._paragraph_spans(self.raw_text[start:end], start)])
+        added = len(self.highlights) - highlight_count
+
+        if added > 0:
             self._save_state_to_history()
             self._emit_model_update()
-            self.status_message_requested.emit(f"Created {match_count} highlights for '{search_term}'.", 3000)
+            self.status_message_requested.emit(f"Created {added} highlights for '{search_term}'.", 3000)
+        elif matches:
+            self.status_message_requested.emit(f"Every occurrence of '{search_term}' is already highlighted.", 3000)
         else:
             self.status_message_requested.emit(f"No occurrences of '{search_term}' found to highlight.", 3000)
 
+    @tracing.traced("AppController.highlight_keywords")
+    def highlight_keywords(self, keywords: list[str], case_sensitive: bool = False, whole_word: bool = False):
+        """Highlights every occurrence of every keyword in one pass over the document, as a single undo step."""
+        matcher = KeywordMatcher(keywords, case_sensitive)
+        if not matcher: return
+        matches = self.get_search_index().keyword_ranges(matcher, whole_word)
+        highlight_count = len(self.highlights)
+        self._add_highlight_spans(matches)
+        added = len(self.highlights) - highlight_count
+
+        if added > 0:
+            self._save_state_to_history()
+            self._emit_model_update()
+            self.status_message_requested.emit(
+                f"Created {added} highlights from {len(matches)} occurrences of {len(matcher)} keywords.", 3000)
+        elif matches:
+            self.status_message_requested.emit("Every keyword occurrence is already highlighted.", 3000)
+        else:
+            self.status_message_requested.emit(f"No occurrences of the {len(matcher)} keywords found to highlight.", 3000)
+
+    @tracing.traced("AppController.update_highlight_text")
     def update_highlight_text(self, original_highlight: Highlight, new_text: str):
         old_text = original_highlight.text
         if old_text == new_text: return
@@ -90,59 +347,146 @@ class AppController(QObject):
         original_highlight.text = new_text
         original_highlight.display_text = ""
         original_highlight.__post_init__()
+        self.stats_engine.highlight_changed(original_highlight)
+        self.highlight_index.highlight_changed(original_highlight)
         delta = len(new_text) - len(old_text)
         if delta != 0:
-            for h in self.highlights:
-                if h != original_highlight and h.start_pos > start:
-                    h.start_pos += delta
-                    if self.document_mode == "simple":
-                        h.sort_key += delta
+            shifted = self.highlight_index.shift_after(start, delta)
+            if self.document_mode == "simple":
+                for h in shifted:
+                    h.sort_key += delta
+                self.highlight_index.order_changed(shifted)
         self._save_state_to_history()
         self._emit_model_update()
         self.status_message_requested.emit("Highlight updated.", 3000)
 
-    def reorder_highlights(self, new_ordered_highlights: list):
-        if self.document_mode != "simple": return
-        for i, h in enumerate(new_ordered_highlights):
-            h.sort_key = i
-        self.highlights = new_ordered_highlights
+    @tracing.traced("AppController.merge_overlapping_highlights")
+    def merge_overlapping_highlights(self):
+        """Replaces every chain of overlapping highlights with one highlight spanning it, as a single undo step."""
+        groups = [[h for h in group if self.raw_text.startswith(h.text, h.start_pos)]
+                  for group in self.highlight_index.overlap_groups()]
+        groups = [group for group in groups if len(group) > 1]
+        if not groups:
+            self.status_message_requested.emit("No overlapping highlights to merge.", 3000)
+            return
+
+        merged_ids, merged_highlights = set(), []
+        for group in groups:
+            start = min(h.start_pos for h in group)
+            end = max(h.start_pos + len(h.text) for h in group)
+            merged = process_new_highlight(self.raw_text, self.raw_text[start:end], start)
+            if self.document_mode == "simple":
+                merged.sort_key = min(h.sort_key for h in group)
+            merged_ids.update(id(h) for h in group)
+            merged_highlights.append(merged)
+            for h in group:
+                self.stats_engine.highlight_removed(h)
+                self.highlight_index.highlight_removed(h)
+        # Appended like any new highlight, which keeps the index's tie order the same as the list's.
+        self.highlights = [h for h in self.highlights if id(h) not in merged_ids] + merged_highlights
+        for merged in merged_highlights:
+            self.stats_engine.highlight_added(merged)
+            self.highlight_index.highlight_added(merged)
         self._save_state_to_history()
         self._emit_model_update()
+        count = sum(len(group) for group in groups)
+        self.status_message_requested.emit(f"Merged {count} overlapping highlights into {len(groups)}.", 3000)
+
+    @tracing.traced("AppController.move_highlights")
+    def move_highlights(self, moved: list[Highlight], above: Highlight | None, below: Highlight | None):
+        """
+        Moves highlights between two neighbours in simple mode by giving only the
+        moved ones new sort keys from the gap between the neighbours' keys.
+        Only when the gap has no room left (equal keys or float precision used up)
+        are all keys spread back out, as part of the same undo step.
+        """
+        if self.document_mode != "simple" or not moved or (above is None and below is None): return
+        keys = self._order_keys_between(above, below, len(moved))
+        if keys is None:
+            self._renumber_order_keys()
+            keys = self._order_keys_between(above, below, len(moved))
+        for h, key in zip(moved, keys):
+            h.sort_key = key
+        self.highlight_index.order_changed(moved)
+        self._save_state_to_history()
+        self.highlights_moved.emit(moved, self._history_index > 0, False)
+        self._emit_workspace_changed()
         self.status_message_requested.emit("Highlights reordered.", 3000)
 
+    @staticmethod
+    def _order_keys_between(above: Highlight | None, below: Highlight | None, count: int) -> list | None:
+        """count evenly spaced keys strictly between the neighbours' keys; None if there's no room."""
+        lo = above.sort_key if above is not None else below.sort_key - count - 1
+        hi = below.sort_key if below is not None else above.sort_key + count + 1
+        step = (hi - lo) / (count + 1)
+        keys = [lo + step * (i + 1) for i in range(count)]
+        if step <= 0 or not lo < keys[0] or not keys[-1] < hi or len(set(keys)) < count: return None
+        # Whole-number keys stay ints, as keys always were before they could be fractional.
+        return [int(k) if k == int(k) else k for k in keys]
+
+    def _renumber_order_keys(self):
+        """Spreads sort keys back out to 0..n-1 without changing the order."""
+        in_order = self.highlight_index.by_user_order()
+        for i, h in enumerate(in_order):
+            h.sort_key = i
+        self.highlight_index.order_changed(in_order)
+
+    @tracing.traced("AppController.remove_highlights")
     def remove_highlights(self, highlights_to_remove: list[Highlight]):
         if not highlights_to_remove: return
         ids_to_remove = {id(h) for h in highlights_to_remove}
         self.highlights = [h for h in self.highlights if id(h) not in ids_to_remove]
+        for h in highlights_to_remove:
+            self.stats_engine.highlight_removed(h)
+            self.highlight_index.highlight_removed(h)
         self._save_state_to_history()
         self._emit_model_update()
         count = len(highlights_to_remove)
         self.status_message_requested.emit(f"{count} highlight{'s' if count > 1 else ''} removed.", 3000)
     
+    @tracing.traced("AppController.remove_all_highlights")
     def remove_all_highlights(self):
         if not self.highlights: return
         self.highlights.clear()
+        self.stats_engine.reset_highlights(self.highlights)
+        self.highlight_index.reset(self.highlights)
         self._save_state_to_history()
         self._emit_model_update()
         self.status_message_requested.emit("All highlights removed.", 3000)
 
     def close_file(self):
+        """Closes the active document and switches to the most recently used remaining one, if any."""
+        if self.current_filepath:
+            self.workspace.remove(self.current_filepath)
+            self._changed_on_disk.discard(self.current_filepath)
+        if self._content_hash is not None:
+            self.highlight_store.forget(self._content_hash)
+        while (next_path := self.workspace.most_recent()) is not None:
+            self.workspace.active_path = next_path
+            state = self.workspace.take(next_path)
+            if state is not None:
+                self._restore_document(state)
+                self._emit_model_update()
+                return
+            self.workspace.remove(next_path)
+
         self.raw_text = ""
         self.highlights = []
+        self.stats_engine.reset_highlights(self.highlights)
+        self.highlight_index.reset(self.highlights)
         self.current_filepath = None
         self.document_mode = "simple"
-        self.last_shown_search_term = None
+        self.last_shown_search = None
+        self._search_index = None
+        self._content_hash = None
         self._history = []
         self._history_index = -1
         self._emit_model_update()
 
+    @tracing.traced("AppController.get_content_for_saving")
     def get_content_for_saving(self, include_header=False) -> str:
-        text_with_markers = self.raw_text
-        sorted_highlights = sorted(self.highlights, key=lambda h: h.start_pos, reverse=True)
-        for h in sorted_highlights:
-            start = h.start_pos
-            end = start + len(h.text)
-            text_with_markers = text_with_markers[:start] + "==" + h.text + "==" + text_with_markers[end:]
+        ranges = parser.resolve_highlight_ranges(self.raw_text, self.highlight_index.by_position(), presorted=True)
+        text_with_markers = parser.insert_markers(self.raw_text, ranges)
             
         if include_header:
             header = self.theme_manager.get_text("external_edit_header")
@@ -151,12 +495,32 @@ class AppController(QObject):
         return text_with_markers
 
     def confirm_save(self):
+        # The store only ever holds saved states, so discarding unsaved edits really discards them.
+        self._persist_highlights()
         self._save_state_to_history(clear_history=True)
         self._emit_model_update()
 
+    def uses_highlight_store(self) -> bool:
+        """Whether the active document's highlights are kept in the highlight store."""
+        return self._content_hash is not None
+
+    def save_to_highlight_store(self) -> bool:
+        """Saves the active document's highlights to the highlight store only, without writing a text file."""
+        if not self._persist_highlights(): return False
+        self._save_state_to_history(clear_history=True)
+        self._emit_model_update()
+        return True
+
     def is_modified(self):
         return self._history_index > 0
 
+    def current_snapshot(self) -> tuple | None:
+        """The history entry for the current state; it stays the same object until the state changes."""
+        if 0 <= self._history_index < len(self._history):
+            return self._history[self._history_index]
+        return None
+
+    @tracing.traced("AppController.undo")
     def undo(self):
         if self._history_index > 0:
             self._history_index -= 1
@@ -164,8 +528,11 @@ class AppController(QObject):
             text, highlights = self._history[self._history_index]
             self.raw_text = text
             self.highlights = copy.deepcopy(highlights)
+            self.stats_engine.reset_highlights(self.highlights)
+            self.highlight_index.reset(self.highlights)
             self._emit_model_update()
 
+    @tracing.traced("AppController.redo")
     def redo(self):
         if self._history_index < len(self._history) - 1:
             self._history_index += 1
@@ -173,8 +540,11 @@ class AppController(QObject):
             text, highlights = self._history[self._history_index]
             self.raw_text = text
             self.highlights = copy.deepcopy(highlights)
+            self.stats_engine.reset_highlights(self.highlights)
+            self.highlight_index.reset(self.highlights)
             self._emit_model_update()
             
+    @tracing.traced("AppController._save_state_to_history")
     def _save_state_to_history(self, clear_history=False):
         if clear_history: self._history = []
         if self._history_index < len(self._history) - 1:
@@ -188,4 +558,10 @@ class AppController(QObject):
     def _emit_model_update(self):
         can_undo = self._history_index > 0
         can_redo = self._history_index < len(self._history) - 1
-        self.model_updated.emit(self.raw_text, self.highlights, self.document_mode, can_undo, can_redo)
\ No newline at end of file
+        self.model_updated.emit(self.raw_text, self.highlights, self.document_mode, can_undo, can_redo)
+        self._emit_workspace_changed()
+
+    def _emit_workspace_changed(self):
+        modified = set(self.modified_documents())
+        documents = [(p, p in modified) for p in self.workspace.paths()]
+        self.workspace_changed.emit(documents, self.current_filepath or "")
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""Synthetic documents in every supported format, at configurable sizes and highlight densities."""
+import os
+import random
+
+import docx
+import fitz
+from docx.enum.text import WD_COLOR_INDEX
+
+FORMATS = ("txt", "md", "srt", "vtt", "transcript", "docx", "pdf")
+
+WORDS = (
+    "sloth branch leaf slow moss canopy yawn quiet morning river stone cloud dream "
+    "patience moment gentle drift hammock nap rhythm forest path breath pause light "
+    "shadow wander ponder linger listen meadow ripple whisper tender steady amble"
+).split()
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+def _paragraph(rng: random.Random, words: int = 60) -> str:
+    sentences = []
+    while words > 0:
+        n = min(words, rng.randint(6, 14))
+        sentences.append(_sentence(rng, n))
+        words -= n
+    return " ".join(sentences)
+
+def _mark(rng: random.Random, text: str, density: float) -> str:
+    """Wraps a random run of words in == markers with probability density."""
+    if rng.random() >= density: return text
+    words = text.split(" ")
+    start = rng.randrange(len(words))
+    end = min(len(words), start + rng.randint(2, 8))
+    return " ".join(words[:start] + ["==" + " ".join(words[start:end]) + "=="] + words[end:])
+
+def _srt_time(seconds: float, separator: str = ",") -> str:
+    ms = int(round(seconds * 1000))
+    hours, ms = divmod(ms, 3600000)
+    minutes, ms = divmod(ms, 60000)
+    secs, ms = divmod(ms, 1000)
+    return f"{hours:02}:{minutes:02}:{secs:02}{separator}{ms:03}"
+
+def _frame_time(seconds: float, fps: int = 25) -> str:
+    frames = int(round(seconds * fps))
+    secs, frame = divmod(frames, fps)
+    minutes, secs = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02}:{minutes:02}:{secs:02}:{frame:02}"
+
+def simple_text(blocks: int, density: float, seed: int = 0, markdown: bool = False) -> str:
+    rng = random.Random(seed)
+    paragraphs = []
+    for i in range(blocks):
+        if markdown and i % 10 == 0:
+            paragraphs.append(f"## Section {i // 10 + 1}")
+        paragraphs.append(_mark(rng, _paragraph(rng), density))
+    return "\n\n".join(paragraphs)
+
+def srt_text(blocks: int, density: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    cues, t = ["[SRT]"], 0.0
+    for i in range(blocks):
+        end = t + rng.uniform(1.5, 6.0)
+        lines = "\n".join(_sentence(rng, rng.randint(4, 10)) for _ in range(rng.randint(1, 2)))
+        cues.append(f"{i + 1}\n{_srt_time(t)} --> {_srt_time(end)}\n{_mark(rng, lines, density)}\n")
+        t = end + rng.uniform(0.0, 1.0)
+    return "\n".join(cues)
+
+def vtt_text(blocks: int, density: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    cues, t = ["[VTT]\nWEBVTT\n"], 0.0
+    for _ in range(blocks):
+        end = t + rng.uniform(1.5, 6.0)
+        lines = "\n".join(_sentence(rng, rng.randint(4, 10)) for _ in range(rng.randint(1, 2)))
+        cues.append(f"{_srt_time(t, '.')} --> {_srt_time(end, '.')}\n{_mark(rng, lines, density)}\n")
+        t = end + rng.uniform(0.0, 1.0)
+    return "\n".join(cues)
+
+def transcript_text(blocks: int, density: float, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    turns, t = ["[TRANSCRIPT]"], 0.0
+    for _ in range(blocks):
+        speaker = f"Speaker {rng.randint(1, 4)}"
+        turns.append(f"{_frame_time(t)} {speaker}\n{_mark(rng, _paragraph(rng, rng.randint(15, 60)), density)}\n")
+        t += rng.uniform(5.0, 40.0)
+    return "\n".join(turns)
+
+def write_docx(path: str, blocks: int, density: float, seed: int = 0):
+    rng = random.Random(seed)
+    document = docx.Document()
+    for _ in range(blocks):
+        paragraph = document.add_paragraph()
+        words = _paragraph(rng).split(" ")
+        if rng.random() < density:
+            start = rng.randrange(len(words))
+            end = min(len(words), start + rng.randint(2, 8))
+            paragraph.add_run(" ".join(words[:start]) + " ")
+            paragraph.add_run(" ".join(words[start:end])).font.highlight_color = WD_COLOR_INDEX.YELLOW
+            paragraph.add_run(" " + " ".join(words[end:]))
+        else:
+            paragraph.add_run(" ".join(words))
+    document.save(path)
+
+def write_pdf(path: str, blocks: int, density: float, seed: int = 0, blocks_per_page: int = 6):
+    rng = random.Random(seed)
+    document = fitz.open()
+    for first in range(0, blocks, blocks_per_page):
+        page = document.new_page()
+        paragraphs = [_paragraph(rng, 40) for _ in range(min(blocks_per_page, blocks - first))]
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), "\n\n".join(paragraphs), fontsize=9)
+        for paragraph in paragraphs:
+            if rng.random() >= density: continue
+            words = paragraph.split(" ")
+            start = rng.randrange(len(words) - 3)
+            quads = page.search_for(" ".join(words[start:start + 3]), quads=True)
+            if quads: page.add_highlight_annot(quads[0])
+    document.save(path)
+    document.close()
+
+def write_document(directory: str, fmt: str, blocks: int, density: float, seed: int = 0) -> str:
+    """Writes one synthetic document and returns its path."""
+    os.makedirs(directory, exist_ok=True)
+    extension = {"md": "md", "docx": "docx", "pdf": "pdf"}.get(fmt, "txt")
+    path = os.path.join(directory, f"{fmt}-{blocks}-{density:g}-{seed}.{extension}")
+    if fmt == "docx":
+        write_docx(path, blocks, density, seed)
+    elif fmt == "pdf":
+        write_pdf(path, blocks, density, seed)
+    else:
+        text = {
+            "txt": lambda: simple_text(blocks, density, seed),
+            "md": lambda: simple_text(blocks, density, seed, markdown=True),
+            "srt": lambda: srt_text(blocks, density, seed),
+            "vtt": lambda: vtt_text(blocks, density, seed),
+            "transcript": lambda: transcript_text(blocks, density, seed),
+        }[fmt]()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return path
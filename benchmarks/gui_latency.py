@@ -0,0 +1,175 @@
+"""
+End-to-end latency of MainWindow interactions, driven headlessly.
+
+    python -m benchmarks.gui_latency --formats txt,transcript --sizes 200,2000 --repeat 20 --output gui.json
+
+Each interaction is timed from the call that a user action triggers until the
+event loop is idle again and background searches have delivered, so deferred
+work is included. Incremental search runs with the debounce delay set to zero
+so only the search itself is measured. Runs under QT_QPA_PLATFORM=offscreen
+unless another platform is set.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import platform
+import statistics
+from datetime import datetime, timezone
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import Qt, QThreadPool
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication
+
+from app_controller import AppController
+from gui.main_window import MainWindow
+from benchmarks.generators import FORMATS, WORDS, write_document
+from benchmarks.run_benchmarks import _theme_manager, _git_commit
+
+def _settle(app: QApplication):
+    app.processEvents()
+    while QThreadPool.globalInstance().activeThreadCount():
+        QThreadPool.globalInstance().waitForDone(50)
+        app.processEvents()
+    app.processEvents()
+
+def _percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1))))
+    return ordered[rank]
+
+def _summary(name: str, fmt: str, blocks: int, highlights: int, times: list[float]) -> dict:
+    ms = [t * 1000 for t in times]
+    return {
+        "benchmark": name, "format": fmt, "blocks": blocks, "highlights": highlights, "runs": len(ms),
+        "p50_ms": _percentile(ms, 50), "p90_ms": _percentile(ms, 90), "p99_ms": _percentile(ms, 99),
+        "max_ms": max(ms), "mean_ms": statistics.fmean(ms),
+    }
+
+class LatencyBench:
+    def __init__(self, app: QApplication, repeat: int, seed: int):
+        self.app = app
+        self.repeat = repeat
+        self.rng = random.Random(seed)
+        self.controller = AppController(_theme_manager())
+        self.window = MainWindow(self.controller.theme_manager, self.controller)
+        self.window.resize(1400, 800)
+        self.window.show()
+        self.viewer = self.window.doc_viewer
+        self.viewer._search_debounce.setInterval(0)
+        _settle(app)
+
+    def _time(self, action, setup=None) -> list[float]:
+        times = []
+        for _ in range(self.repeat):
+            if setup: setup()
+            _settle(self.app)
+            start = time.perf_counter()
+            action()
+            _settle(self.app)
+            times.append(time.perf_counter() - start)
+        return times
+
+    def _random_span(self) -> tuple[int, int]:
+        text = self.controller.raw_text
+        start = self.rng.randrange(max(len(text) - 60, 1))
+        return start, min(len(text), start + self.rng.randint(10, 50))
+
+    def run_document(self, path: str, fmt: str, blocks: int) -> list[dict]:
+        window, viewer, controller = self.window, self.viewer, self.controller
+        results = []
+        record = lambda name, times: results.append(_summary(name, fmt, blocks, len(controller.highlights), times))
+
+        record("open", self._time(lambda: window._process_file_with_controller(path)))
+
+        def select_in_list():
+            count = len(controller.highlights)
+            if not count: return
+            index = self.rng.randrange(count)
+            window.highlights_panel.select_highlight(index)
+            window._on_highlight_activated(index)
+        record("click_select_highlight", self._time(select_in_list))
+
+        def click_document():
+            start, _ = self._random_span()
+            viewer.select_range(start, start)
+            browser = viewer.text_browser
+            QTest.mouseClick(browser.viewport(), Qt.LeftButton, pos=browser.cursorRect().center())
+        record("click_document", self._time(click_document))
+
+        def select_random_span():
+            viewer.select_range(*self._random_span())
+        record("add_highlight", self._time(window.add_highlight, setup=select_random_span))
+        record("undo", self._time(controller.undo, setup=controller.redo))
+
+        term = self.rng.choice(WORDS)
+        def show_all():
+            viewer.search_input.setText(term)
+            viewer._on_show_all()
+        record("highlight_all", self._time(window.add_highlight, setup=show_all))
+        record("undo_highlight_all", self._time(controller.undo, setup=controller.redo))
+
+        def type_search():
+            viewer.search_input.setText(self.rng.choice(WORDS)[:self.rng.randint(2, 5)])
+        record("search_incremental", self._time(type_search, setup=lambda: viewer.search_input.clear()))
+        record("search_find_next", self._time(viewer._find_next))
+        record("search_show_all", self._time(viewer._on_show_all, setup=viewer.clear_temporary_highlights))
+        viewer.clear_temporary_highlights()
+        controller.last_shown_search = None
+        viewer.search_input.clear()
+        return results
+
+def run(formats: list[str], sizes: list[int], density: float, repeat: int, seed: int, progress=print) -> dict:
+    app = QApplication.instance() or QApplication([])
+    bench = LatencyBench(app, repeat, seed)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="slothy-gui-bench-") as directory:
+        for fmt in formats:
+            for blocks in sizes:
+                path = write_document(directory, fmt, blocks, density, seed)
+                progress(f"{fmt} x {blocks}")
+                results.extend(bench.run_document(path, fmt, blocks))
+    bench.window.hide()
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(), "commit": _git_commit(),
+            "python": sys.version.split()[0], "platform": platform.platform(),
+            "qt_platform": os.environ.get("QT_QPA_PLATFORM"), "density": density, "repeat": repeat, "seed": seed,
+        },
+        "results": results,
+    }
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--formats", default="txt,srt,transcript", help="comma-separated subset of " + ",".join(FORMATS))
+    arg_parser.add_argument("--sizes", default="200,2000", help="comma-separated document sizes in blocks")
+    arg_parser.add_argument("--density", type=float, default=0.2)
+    arg_parser.add_argument("--repeat", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = set(formats) - set(FORMATS)
+    if unknown: arg_parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    report = run(formats, sizes, args.density, args.repeat, args.seed, progress=lambda msg: print(msg, file=sys.stderr))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for r in report["results"]:
+        print(f"{r['format']:<11} {r['blocks']:>6} {r['benchmark']:<24} p50 {r['p50_ms']:8.2f} ms  "
+              f"p90 {r['p90_ms']:8.2f} ms  p99 {r['p99_ms']:8.2f} ms", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+The HTML renderer the document viewer used before it switched to resolved
+highlight ranges and character formats. Kept as the baseline the render and
+memory benchmarks compare against.
+"""
+import re
+import html
+
+import tracing
+from parser import Highlight
+
+def _create_styled_span(text, index, is_selected, highlight_color, selection_color):
+    bg_color = selection_color if is_selected else highlight_color
+    style = f"background-color:{bg_color};"
+    if is_selected:
+        style += " color:white;"
+    
+    escaped_text = html.escape(text).replace('\n', '<br>')
+    return f'<a href="slothy:highlight_{index}" style="color:inherit; text-decoration:none;"><span style="{style}">{escaped_text}</span></a>'
+
+@tracing.traced("legacy_render.render_document_with_highlights")
+def render_document_with_highlights(raw_text: str, all_highlights: list[Highlight], selected_highlights: list[Highlight], highlight_color: str, selection_color: str) -> str:
+    rendered_text = html.escape(raw_text)
+    sorted_by_len = sorted(all_highlights, key=lambda h: len(h.text), reverse=True)
+    
+    for h_obj in sorted_by_len:
+        is_selected = (h_obj in selected_highlights)
+        try:
+            stable_index = all_highlights.index(h_obj)
+            replacement_html = _create_styled_span(h_obj.text, stable_index, is_selected, highlight_color, selection_color)
+            escaped_search_text = html.escape(h_obj.text)
+            rendered_text = re.sub(re.escape(escaped_search_text), replacement_html, rendered_text, 1)
+        except (ValueError, re.error):
+            continue
+            
+    return rendered_text.replace('\n', '<br>')
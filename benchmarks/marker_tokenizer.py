@@ -0,0 +1,113 @@
+"""
+Worst-case inputs for == marker parsing: the single-pass tokenizer against the
+regex-based parsing it replaced.
+
+    python -m benchmarks.marker_tokenizer --sizes 1000,10000 --output markers.json
+"""
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+import parser
+from transcript_parser import parse_transcript_file, _time_to_seconds, _create_display_text
+from benchmarks.generators import WORDS
+
+def legacy_parse_simple(content: str):
+    raw_text = re.sub(r'==(.*?)==', r'\1', flags=re.DOTALL, string=content)
+    highlight_texts = re.findall(r'==(.*?)==', content, re.DOTALL)
+    return raw_text, [(h, raw_text.find(h)) for h in highlight_texts]
+
+def _legacy_preceding_timestamp(text_before: str):
+    lines = text_before.strip().split('\n')
+    for i in range(len(lines) - 1, -1, -1):
+        line = lines[i].strip()
+        if '-->' in line or re.search(r'\d{1,2}:\d{2}:\d{2}', line):
+            if '-->' in line:
+                parts = line.split('-->')
+                return line, _time_to_seconds(parts[0]), _time_to_seconds(parts[1])
+            return line, _time_to_seconds(line), -1.0
+    return None, -1.0, -1.0
+
+def legacy_parse_transcript(content: str):
+    raw_text = re.sub(r'==(.*?)==', r'\1', flags=re.DOTALL, string=content)
+    highlights = []
+    for match in re.finditer(r'==(.+?)==', content, re.DOTALL):
+        time_str, start, end = _legacy_preceding_timestamp(content[:match.start(1)])
+        highlights.append((match.group(1), start, end, _create_display_text(time_str, match.group(1))))
+    return raw_text, highlights
+
+def parse_simple(content: str):
+    return parser._parse_simple(content)
+
+def parse_transcript(content: str):
+    raw_text, spans = parser.tokenize_markers(content)
+    return raw_text, parse_transcript_file(raw_text, spans)
+
+def _filler(i: int, words: int = 12) -> str:
+    return " ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(words))
+
+# name -> (builder(n) -> content, is transcript)
+CASES = {
+    # Every highlight is unique text, so each legacy raw_text.find() scans up to its own position.
+    "unique_highlights": (lambda n: "\n\n".join(f"{_filler(i)} =={_filler(i, 4)} #{i}==" for i in range(n)), False),
+    # Identical highlight text everywhere: the legacy find() anchors all of them to the first one.
+    "duplicate_highlights": (lambda n: "\n\n".join(f"{_filler(i)} ==same words== {_filler(i + 1)}" for i in range(n)), False),
+    # Prose full of stray == (e.g. code snippets or comparisons) that pair up across paragraphs.
+    "stray_markers": (lambda n: "\n\n".join(f"if a == b then {_filler(i)}" for i in range(n)), False),
+    # A single unclosed marker at the start of a long document.
+    "unclosed_opener": (lambda n: "==" + "\n\n".join(_filler(i) for i in range(n)), False),
+    # Escaped markers throughout.
+    "escaped_markers": (lambda n: "\n\n".join(f"{_filler(i)} \\== literal =={_filler(i, 3)}==" for i in range(n)), False),
+    # A transcript with many highlights: the legacy parser re-splits the whole prefix for each one.
+    "transcript_dense": (lambda n: "[TRANSCRIPT]\n" + "\n\n".join(
+        f"{i // 3600:02}:{i // 60 % 60:02}:{i % 60:02}:00 Speaker {i % 3}\n{_filler(i)} =={_filler(i, 5)}==" for i in range(n)), True),
+    # Highlights but no timestamps at all: every legacy lookup walks back to the start.
+    "transcript_no_timestamps": (lambda n: "[TRANSCRIPT]\n" + "\n\n".join(f"{_filler(i)} =={_filler(i, 5)}==" for i in range(n)), True),
+}
+
+def _time(fn, content: str, repeat: int) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        times.append(time.perf_counter() - start)
+    return times
+
+def run(sizes: list[int], repeat: int, legacy_limit: int) -> dict:
+    results = []
+    for name, (build, is_transcript) in CASES.items():
+        current, legacy = (parse_transcript, legacy_parse_transcript) if is_transcript else (parse_simple, legacy_parse_simple)
+        for n in sizes:
+            content = build(n)
+            row = {"case": name, "blocks": n, "chars": len(content),
+                   "tokenizer_median_s": statistics.median(_time(current, content, repeat))}
+            if n <= legacy_limit:
+                row["legacy_median_s"] = statistics.median(_time(legacy, content, repeat))
+            results.append(row)
+    return {"meta": {"repeat": repeat, "legacy_limit": legacy_limit}, "results": results}
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--sizes", default="1000,10000", help="comma-separated case sizes in blocks")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--legacy-limit", type=int, default=2000, help="skip the legacy parser above this size")
+    arg_parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    report = run([int(s) for s in args.sizes.split(",") if s], args.repeat, args.legacy_limit)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    for r in report["results"]:
+        legacy = f"{r['legacy_median_s'] * 1000:10.2f} ms" if "legacy_median_s" in r else f"{'-':>13}"
+        print(f"{r['case']:<26} {r['blocks']:>7}  tokenizer {r['tokenizer_median_s'] * 1000:10.2f} ms  legacy {legacy}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Replays a scripted editing session through AppController under tracemalloc and
+reports peak and retained memory per subsystem (text, highlights, history,
+rendered output, ...).
+
+    python -m benchmarks.memory_scenario --format transcript --blocks 500 --operations 300 --output memory.json
+
+The session mixes adds, highlight text edits and undos. After every operation
+the render output is rebuilt the way the viewer does (resolved highlight
+ranges; --html renders the legacy HTML instead) and the last one is kept alive.
+"""
+import sys
+import json
+import random
+import argparse
+import tempfile
+import tracemalloc
+
+from PySide6.QtCore import QCoreApplication
+
+import parser
+import memory_profile
+from app_controller import AppController
+from benchmarks import legacy_render
+from benchmarks.generators import FORMATS, write_document
+from benchmarks.run_benchmarks import _theme_manager, HIGHLIGHT_COLOR, SELECTION_COLOR
+
+OPERATION_WEIGHTS = {"add": 0.6, "edit": 0.2, "undo": 0.2}
+
+def _operation(controller: AppController, rng: random.Random, name: str):
+    if name == "edit" and controller.highlights:
+        h = rng.choice(controller.highlights)
+        controller.update_highlight_text(h, h.text + " " + rng.choice(("indeed", "slowly", "perhaps")))
+    elif name == "undo" and controller.is_modified():
+        controller.undo()
+    else:
+        text = controller.raw_text
+        start = rng.randrange(max(len(text) - 60, 1))
+        controller.add_highlight(text[start:start + rng.randint(10, 50)], start)
+
+def run(fmt: str, blocks: int, density: float, operations: int, seed: int, sample_every: int, html: bool) -> dict:
+    QCoreApplication.instance() or QCoreApplication([])
+    rng = random.Random(seed)
+    names, weights = zip(*OPERATION_WEIGHTS.items())
+    samples, peaks = [], {}
+    with tempfile.TemporaryDirectory(prefix="slothy-memory-") as directory:
+        path = write_document(directory, fmt, blocks, density, seed)
+        controller = AppController(_theme_manager())
+
+        memory_profile.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.take_snapshot()
+        controller.process_file(path)
+        rendered = None
+        for i in range(1, operations + 1):
+            _operation(controller, rng, rng.choices(names, weights)[0])
+            if html:
+                rendered = legacy_render.render_document_with_highlights(controller.raw_text, controller.highlights, [], HIGHLIGHT_COLOR, SELECTION_COLOR)
+            else:
+                rendered = parser.resolve_highlight_ranges(controller.raw_text, controller.highlights)
+            if i % sample_every == 0 or i == operations:
+                sizes = memory_profile.subsystem_sizes()
+                for subsystem, size in sizes.items():
+                    peaks[subsystem] = max(peaks.get(subsystem, 0), size)
+                samples.append({"operation": i, "highlights": len(controller.highlights),
+                                "history_entries": len(controller._history), "by_subsystem": sizes})
+
+        _, peak = tracemalloc.get_traced_memory()
+        final = tracemalloc.take_snapshot()
+        retained = dict.fromkeys(memory_profile.SUBSYSTEMS, 0)
+        for statistic in final.compare_to(baseline, "traceback"):
+            retained[memory_profile._subsystem(statistic.traceback)] += statistic.size_diff
+        del rendered
+        tracemalloc.stop()
+
+    return {
+        "meta": {"format": fmt, "blocks": blocks, "density": density, "operations": operations,
+                 "seed": seed, "render": "html" if html else "ranges"},
+        "peak_bytes": peak,
+        "peak_by_subsystem": peaks,
+        "retained_by_subsystem": retained,
+        "samples": samples,
+    }
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--format", default="txt", choices=FORMATS)
+    arg_parser.add_argument("--blocks", type=int, default=500)
+    arg_parser.add_argument("--density", type=float, default=0.2)
+    arg_parser.add_argument("--operations", type=int, default=200)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--sample-every", type=int, default=25, help="take a per-subsystem sample every N operations")
+    arg_parser.add_argument("--html", action="store_true", help="keep rendered HTML instead of resolved ranges")
+    arg_parser.add_argument("--output", help="write the report JSON here (default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    report = run(args.format, args.blocks, args.density, args.operations, args.seed, max(args.sample_every, 1), args.html)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    mib = lambda n: f"{n / 1048576:8.2f} MiB"
+    print(f"peak {mib(report['peak_bytes'])}", file=sys.stderr)
+    for subsystem in memory_profile.SUBSYSTEMS:
+        print(f"  {subsystem:<13} peak {mib(report['peak_by_subsystem'].get(subsystem, 0))}"
+              f"  retained {mib(report['retained_by_subsystem'][subsystem])}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Times the hot paths on synthetic documents and writes the results as JSON.
+
+    python -m benchmarks.run_benchmarks --sizes 100,1000 --density 0.2 --output results.json
+    python -m benchmarks.run_benchmarks --compare results.json
+
+Sizes are in blocks: paragraphs for txt/md/docx/pdf, cues for SRT/VTT and
+speaker turns for TRANSCRIPT. Every timing is the wall-clock time of one call;
+min/median/mean/max are taken over --repeat runs.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime, timezone
+
+from PySide6.QtCore import QCoreApplication
+
+import parser
+import export_engine
+from app_controller import AppController
+from theme_manager import ThemeManager
+from utils import resource_path
+from benchmarks import legacy_render
+from benchmarks.generators import FORMATS, write_document
+
+HIGHLIGHT_COLOR = "rgba(243, 156, 18, 0.5)"
+SELECTION_COLOR = "#E5007E"
+KEYWORD_LIST_SIZE = 200
+
+def _timings(fn, repeat: int, setup=None) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+def _summary(name: str, fmt: str, blocks: int, highlights: int, times: list[float]) -> dict:
+    return {
+        "benchmark": name, "format": fmt, "blocks": blocks, "highlights": highlights, "runs": len(times),
+        "min_s": min(times), "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times), "max_s": max(times),
+    }
+
+def _theme_manager() -> ThemeManager:
+    tm = ThemeManager(resource_path('config.json'), resource_path('themes/light.json'))
+    # Benchmarks must not write to the user's highlight store.
+    tm._theme_data["app_config"]["highlight_store_db"] = ""
+    return tm
+
+def bench_document(path: str, fmt: str, blocks: int, repeat: int, term: str, tm: ThemeManager) -> list[dict]:
+    file_tags = tm.get_value("app_config.file_tags", [])
+    results = []
+    raw_text, highlights, mode = parser.parse_document(path, file_tags)
+    count = len(highlights)
+    record = lambda name, times: results.append(_summary(name, fmt, blocks, count, times))
+
+    record("parse_document", _timings(lambda: parser.parse_document(path, file_tags), repeat))
+    record("resolve_highlight_ranges", _timings(lambda: parser.resolve_highlight_ranges(raw_text, highlights), repeat))
+    record("render_document_with_highlights", _timings(
+        lambda: legacy_render.render_document_with_highlights(raw_text, highlights, highlights[:1], HIGHLIGHT_COLOR, SELECTION_COLOR), repeat))
+
+    controller = AppController(tm)
+    controller.process_file(path)
+    record("get_content_for_saving", _timings(controller.get_content_for_saving, repeat))
+
+    rng = random.Random(blocks)
+    def add():
+        start = rng.randrange(max(len(controller.raw_text) - 40, 1))
+        controller.add_highlight(controller.raw_text[start:start + 30], start)
+    record("controller.add_highlight", _timings(add, repeat, setup=lambda: controller.undo() if controller.is_modified() else None))
+    record("controller.undo", _timings(controller.undo, repeat, setup=controller.redo))
+    record("controller.redo", _timings(controller.redo, repeat, setup=controller.undo))
+    record("controller.highlight_all_occurrences", _timings(
+        lambda: controller.highlight_all_occurrences(term), repeat, setup=lambda: controller.process_file(path)))
+    words = sorted(set(controller.raw_text.split()))
+    keywords = rng.sample(words, min(KEYWORD_LIST_SIZE, len(words)))
+    record("controller.highlight_keywords", _timings(
+        lambda: controller.highlight_keywords(keywords, whole_word=True), repeat, setup=lambda: controller.process_file(path)))
+
+    for export_format in export_engine.EXPORT_FORMATS:
+        record(f"export.{export_format}", _timings(
+            lambda: "".join(export_engine.iter_export(export_format, controller.highlights, controller.document_mode)), repeat))
+    return results
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(formats: list[str], sizes: list[int], density: float, repeat: int, term: str, seed: int, progress=print) -> dict:
+    QCoreApplication.instance() or QCoreApplication([])
+    tm = _theme_manager()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="slothy-bench-") as directory:
+        for fmt in formats:
+            for blocks in sizes:
+                path = write_document(directory, fmt, blocks, density, seed)
+                progress(f"{fmt} x {blocks}")
+                results.extend(bench_document(path, fmt, blocks, repeat, term, tm))
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(), "commit": _git_commit(),
+            "python": sys.version.split()[0], "platform": platform.platform(),
+            "density": density, "repeat": repeat, "seed": seed, "highlight_all_term": term,
+        },
+        "results": results,
+    }
+
+def compare(baseline: dict, current: dict) -> list[str]:
+    """One line per benchmark present in both runs, with the ratio of median times."""
+    key = lambda r: (r["benchmark"], r["format"], r["blocks"])
+    before = {key(r): r for r in baseline["results"]}
+    lines = []
+    for r in current["results"]:
+        old = before.get(key(r))
+        if old is None or not old["median_s"]: continue
+        ratio = r["median_s"] / old["median_s"]
+        lines.append(f"{r['benchmark']:<40} {r['format']:<11} {r['blocks']:>7}  "
+                     f"{old['median_s'] * 1000:10.2f} ms -> {r['median_s'] * 1000:10.2f} ms  x{ratio:.2f}")
+    return lines
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--formats", default=",".join(FORMATS), help="comma-separated subset of " + ",".join(FORMATS))
+    arg_parser.add_argument("--sizes", default="100,1000", help="comma-separated document sizes in blocks")
+    arg_parser.add_argument("--density", type=float, default=0.2, help="fraction of blocks that carry a highlight")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--term", default="hammock", help="term used for highlight-all")
+    arg_parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    arg_parser.add_argument("--compare", metavar="BASELINE", help="print median ratios against an earlier results file")
+    args = arg_parser.parse_args(argv)
+
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = set(formats) - set(FORMATS)
+    if unknown: arg_parser.error(f"unknown formats: {', '.join(sorted(unknown))}")
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    report = run(formats, sizes, args.density, args.repeat, args.term, args.seed,
+                 progress=lambda msg: print(msg, file=sys.stderr))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print("\n".join(compare(baseline, report)), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
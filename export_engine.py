@@ -0,0 +1,152 @@
+import csv
+import io
+import json
+import os
+from datetime import timedelta
+from parser import Highlight
+from speaker_index import SPEAKER_PREFIX_PATTERN
+PROGRESS_INTERVAL = 500
+
+class ExportCancelled(Exception):
+    """Raised when an export's should_cancel callback asks it to stop."""
+
+def _seconds_to_srt_time(seconds: float) -> str:
+    if seconds < 0: seconds = 0
+    td = timedelta(seconds=seconds)
+    total_seconds = int(td.total_seconds())
+    milliseconds = int(td.microseconds / 1000)
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{secs:02},{milliseconds:03}"
+
+def _seconds_to_vtt_time(seconds: float) -> str:
+    return _seconds_to_srt_time(seconds).replace(',', '.')
+
+def _seconds_to_timecode(seconds: float, fps: int) -> str:
+    """Formats seconds as a non-drop-frame HH:MM:SS:FF timecode."""
+    total_frames = int(round(max(seconds, 0) * fps))
+    frames = total_frames % fps
+    total_seconds = total_frames // fps
+    hours, remainder = divmod(total_seconds, 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02}:{minutes:02}:{secs:02}:{frames:02}"
+
+def ordered_for_export(highlights: list[Highlight], mode: str) -> list[Highlight]:
+    """Document order in simple mode, chronological order otherwise; unplaced highlights are skipped."""
+    if mode == "simple":
+        return sorted((h for h in highlights if h.start_pos != -1), key=lambda h: h.start_pos)
+    return sorted((h for h in highlights if h.start_time != -1), key=lambda h: h.start_time)
+
+def timed_highlights(highlights: list[Highlight]) -> list[Highlight]:
+    return sorted((h for h in highlights if h.start_time >= 0), key=lambda h: h.start_time)
+
+def _cue_times(timed: list[Highlight]):
+    """Yields (highlight, start, end) with end times filled in from the next cue where missing."""
+    for i, item in enumerate(timed):
+        end_seconds = item.end_time
+        if not (end_seconds > item.start_time):
+            if i + 1 < len(timed):
+                end_seconds = timed[i + 1].start_time
+            else:
+                end_seconds = item.start_time + 5.0
+
+        if end_seconds <= item.start_time:
+            end_seconds = item.start_time + 1.0
+        yield item, item.start_time, end_seconds
+
+def _cue_text(h: Highlight) -> str:
+    # Without a SpeakerIndex of the document, labels are found by matching each highlight.
+    return SPEAKER_PREFIX_PATTERN.sub('', h.text, count=1).strip()
+
+def _csv_line(row: list) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+def _txt_chunks(records, title, fps, cue_text):
+    for i, h in enumerate(records):
+        yield h.display_text if i == 0 else "\n\n" + h.display_text
+
+def _srt_chunks(records, title, fps, cue_text):
+    for i, (h, start, end) in enumerate(_cue_times(records)):
+        block = f"{i + 1}\n{_seconds_to_srt_time(start)} --> {_seconds_to_srt_time(end)}\n{cue_text(h)}\n"
+        yield block if i == 0 else "\n" + block
+
+def _vtt_chunks(records, title, fps, cue_text):
+    yield "WEBVTT\n"
+    for h, start, end in _cue_times(records):
+        yield f"\n{_seconds_to_vtt_time(start)} --> {_seconds_to_vtt_time(end)}\n{cue_text(h)}\n"
+
+def _csv_chunks(records, title, fps, cue_text):
+    yield _csv_line(["index", "start_pos", "start_time", "end_time", "text", "display_text"])
+    for i, h in enumerate(records):
+        start_time = h.start_time if h.start_time >= 0 else ""
+        end_time = h.end_time if h.end_time >= 0 else ""
+        yield _csv_line([i + 1, h.start_pos, start_time, end_time, h.text, h.display_text])
+
+def _jsonl_chunks(records, title, fps, cue_text):
+    for i, h in enumerate(records):
+        record = {
+            "index": i + 1, "start_pos": h.start_pos,
+            "start_time": h.start_time if h.start_time >= 0 else None,
+            "end_time": h.end_time if h.end_time >= 0 else None,
+            "text": h.text, "display_text": h.display_text,
+        }
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+def _edl_chunks(records, title, fps, cue_text):
+    """CMX3600 EDL: each cue becomes a cut, laid end to end on the record timeline."""
+    yield f"TITLE: {title}\nFCM: NON-DROP FRAME\n"
+    clip_name = title or "SOURCE"
+    record_in = 0.0
+    for i, (h, start, end) in enumerate(_cue_times(records)):
+        record_out = record_in + (end - start)
+        timecodes = " ".join(_seconds_to_timecode(t, fps) for t in (start, end, record_in, record_out))
+        comment = " ".join(cue_text(h).split())
+        yield f"\n{i + 1:03}  AX       AA/V  C        {timecodes}\n* FROM CLIP NAME: {clip_name}\n* COMMENT: {comment}\n"
+        record_in = record_out
+
+# format -> (chunk generator, needs timed highlights)
+EXPORT_FORMATS = {
+    "txt": (_txt_chunks, False),
+    "transcript": (_txt_chunks, True),
+    "srt": (_srt_chunks, True),
+    "vtt": (_vtt_chunks, True),
+    "csv": (_csv_chunks, False),
+    "jsonl": (_jsonl_chunks, False),
+    "edl": (_edl_chunks, True),
+}
+
+def export_records(fmt: str, highlights: list[Highlight], mode: str) -> list[Highlight]:
+    """The highlights a format exports, sorted once in the order they are written."""
+    _, needs_timing = EXPORT_FORMATS[fmt]
+    return timed_highlights(highlights) if needs_timing else ordered_for_export(highlights, mode)
+
+def iter_export(fmt: str, highlights: list[Highlight], mode: str, title: str = "", fps: int = 25, speaker_index=None):
+    """Yields the export as text chunks, one record at a time."""
+    chunks, _ = EXPORT_FORMATS[fmt]
+    cue_text = speaker_index.cue_text if speaker_index is not None else _cue_text
+    yield from chunks(export_records(fmt, highlights, mode), title, fps, cue_text)
+
+def write_export(filepath: str, fmt: str, highlights: list[Highlight], mode: str, fps: int = 25, progress=None, should_cancel=None, ordered=False,
+                 speaker_index=None) -> int:
+    """
+    Streams an export to filepath and returns the number of records written.
+    progress(done, total) is called periodically; should_cancel() aborts with ExportCancelled.
+    ordered=True means highlights already are the export_records for fmt, e.g. from a sorted index.
+    A SpeakerIndex of the document, if given, supplies the speaker labels stripped from cue text.
+    """
+    chunks, _ = EXPORT_FORMATS[fmt]
+    cue_text = speaker_index.cue_text if speaker_index is not None else _cue_text
+    records = highlights if ordered else export_records(fmt, highlights, mode)
+    total = len(records)
+    title = os.path.splitext(os.path.basename(filepath))[0]
+    # csv rows carry their own line terminators.
+    with open(filepath, 'w', encoding='utf-8', newline='' if fmt == "csv" else None) as f:
+        for done, chunk in enumerate(chunks(records, title, fps, cue_text)):
+            f.write(chunk)
+            if done % PROGRESS_INTERVAL == 0:
+                if should_cancel and should_cancel(): raise ExportCancelled()
+                if progress: progress(min(done, total), total)
+    if progress: progress(total, total)
+    return total
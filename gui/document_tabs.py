@@ -0,0 +1,43 @@
+import os
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QTabBar
+
+class DocumentTabBar(QTabBar):
+    """One closable tab per open document; hidden while only a single document is open."""
+    document_selected = Signal(str)
+    document_close_requested = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("DocumentTabBar")
+        self.setTabsClosable(True)
+        self.setExpanding(False)
+        self.setDocumentMode(True)
+        self.currentChanged.connect(self._on_current_changed)
+        self.tabCloseRequested.connect(self._on_close_requested)
+        self.setVisible(False)
+
+    def set_documents(self, documents: list, active_path: str):
+        """documents is a list of (filepath, is_modified) in the order they were opened."""
+        self.blockSignals(True)
+        while self.count() > len(documents):
+            self.removeTab(self.count() - 1)
+        for i, (path, is_modified) in enumerate(documents):
+            text = os.path.basename(path) + (" *" if is_modified else "")
+            if i >= self.count():
+                self.addTab(text)
+            else:
+                self.setTabText(i, text)
+            self.setTabData(i, path)
+            self.setTabToolTip(i, path)
+            if path == active_path:
+                self.setCurrentIndex(i)
+        self.blockSignals(False)
+        self.setVisible(len(documents) > 1)
+
+    def _on_current_changed(self, index: int):
+        if index >= 0:
+            self.document_selected.emit(self.tabData(index))
+
+    def _on_close_requested(self, index: int):
+        self.document_close_requested.emit(self.tabData(index))
@@ -1,9 +1,44 @@
-from PySide6.QtCore import Signal
-from PySide6.QtWidgets import QWidget, QTextBrowser, QGroupBox, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit
-from PySide6.QtGui import QTextCursor, QTextDocument, QTextCharFormat, QColor
+import re
+from bisect import bisect_left
+from PySide6.QtCore import Signal, QPoint, QTimer
+from PySide6.QtWidgets import QWidget, QTextBrowser, QGroupBox, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit, QLabel, QCheckBox
+from PySide6.QtGui import QTextCursor, QTextCharFormat, QColor
+import tracing
 from gui.widgets import ContextMenuTextBrowser
 from gui.word_stats_panel import WordStatsPanel
 from gui.duration_stats_panel import DurationStatsPanel
+from gui.search_worker import SearchWorker
+from search_index import SearchQuery
+from position_map import PositionMap
+from render_cache import RenderPlan
+from highlight_index import IntervalTree
+
+def _common_prefix_length(a: str, b: str) -> int:
+    # Binary search over slice comparisons keeps the character work in C.
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]: lo = mid
+        else: hi = mid - 1
+    return lo
+
+def _common_suffix_length(a: str, b: str, prefix: int) -> int:
+    """Longest common suffix that doesn't overlap the common prefix of either string."""
+    lo, hi = 0, min(len(a), len(b)) - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]: lo = mid
+        else: hi = mid - 1
+    return lo
+
+def _css_to_qcolor(css_color: str) -> QColor:
+    """Converts a theme colour (hex, name or css rgba()) into a QColor."""
+    match = re.match(r'rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*([\d.]+)\s*)?\)', css_color or "")
+    if match:
+        r, g, b, a = match.groups()
+        alpha = int(float(a) * 255) if a is not None else 255
+        return QColor(int(r), int(g), int(b), alpha)
+    return QColor(css_color)
 
 class DocumentViewer(QWidget):
     open_requested = Signal()
@@ -12,7 +47,8 @@ class DocumentViewer(QWidget):
     close_requested = Signal()
     add_requested = Signal()
     highlight_activated_by_index = Signal(int)
-    show_all_requested = Signal(str)
+    show_all_requested = Signal(object)
+    show_all_dismissed = Signal()
 
     def __init__(self, theme_manager, parent=None):
         super().__init__(parent)
@@ -24,6 +60,7 @@ class DocumentViewer(QWidget):
         group_layout = QVBoxLayout(self.groupbox)
         
         self._setup_temporary_highlight_format()
+        self._setup_content_state()
 
         button_bar = QWidget()
         button_layout = QHBoxLayout(button_bar)
@@ -55,6 +92,22 @@ class DocumentViewer(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search document...")
         self.search_input.returnPressed.connect(self._find_next)
+        self.search_input.textChanged.connect(self._on_search_text_changed)
+        self.regex_checkbox = QCheckBox(self.theme_manager.get_text("search_regex"))
+        self.whole_word_checkbox = QCheckBox(self.theme_manager.get_text("search_whole_word"))
+        self.regex_checkbox.toggled.connect(self._on_search_text_changed)
+        self.whole_word_checkbox.toggled.connect(self._on_search_text_changed)
+        self.match_label = QLabel()
+        self.match_label.setObjectName("HelperLabel")
+
+        # Search-as-you-type: keystrokes restart the debounce timer, and the search itself runs on the pool.
+        self._search_debounce = QTimer(self)
+        self._search_debounce.setSingleShot(True)
+        self._search_debounce.setInterval(self.theme_manager.get_value("app_config.search_debounce_ms", 200))
+        self._search_debounce.timeout.connect(self._start_incremental_search)
+        self._search_worker = SearchWorker(self)
+        self._search_worker.search_finished.connect(self._on_incremental_search_finished)
+        self._search_worker.search_failed.connect(self._on_incremental_search_failed)
         self.prev_button = QPushButton("Previous")
         self.next_button = QPushButton("Next")
         self.show_all_button = QPushButton("Show All")
@@ -64,13 +117,18 @@ class DocumentViewer(QWidget):
         self.show_all_button.clicked.connect(self._on_show_all)
         
         search_layout.addWidget(self.search_input)
+        search_layout.addWidget(self.match_label)
+        search_layout.addWidget(self.regex_checkbox)
+        search_layout.addWidget(self.whole_word_checkbox)
         search_layout.addWidget(self.prev_button)
         search_layout.addWidget(self.next_button)
         search_layout.addWidget(self.show_all_button)
 
         self.text_browser = ContextMenuTextBrowser(self.theme_manager, self)
         self.text_browser.setOpenExternalLinks(False)
-        self.text_browser.anchorClicked.connect(self._on_anchor_clicked)
+        self.text_browser.document().setUndoRedoEnabled(False)
+        self.text_browser.position_clicked.connect(self._on_position_clicked)
+        self.text_browser.verticalScrollBar().valueChanged.connect(self._on_scrolled)
         
         self.word_stats_panel = WordStatsPanel(self.theme_manager)
         self.duration_stats_panel = DurationStatsPanel(self.theme_manager)
@@ -90,6 +148,31 @@ class DocumentViewer(QWidget):
         self._temp_highlight_format = QTextCharFormat()
         self._temp_highlight_format.setBackground(QColor("#D2B4DE")) # A light purple color
         self._temp_highlight_format.setForeground(QColor("black"))
+        self._temp_search = None
+        self._search_index = None
+
+    def _setup_content_state(self):
+        # Documents above the threshold are shown through a sliding window of roughly three chunks.
+        self._virtualize_threshold = self.theme_manager.get_value("app_config.virtualize_threshold_chars", 1000000)
+        self._chunk_chars = self.theme_manager.get_value("app_config.virtual_chunk_chars", 100000)
+        self._virtual = False
+        self._position_map = PositionMap()
+        self._shifting_window = False
+
+        self._loaded_text = None
+        self._applied_ranges = {} # (start, end) in viewer positions -> is_selected
+        self._hit_ranges = [] # (start, end, index) in raw text offsets, sorted by start
+        self._hit_intervals = IntervalTree([], [])
+        self._range_by_index = {}
+        self._plan_formats = {}
+        self._plain_format = QTextCharFormat()
+        self._highlight_format = QTextCharFormat()
+        self._selected_format = QTextCharFormat()
+
+    def set_highlight_colors(self, highlight_color: str, selection_color: str):
+        self._highlight_format.setBackground(_css_to_qcolor(highlight_color))
+        self._selected_format.setBackground(_css_to_qcolor(selection_color))
+        self._selected_format.setForeground(QColor("white"))
         
     def set_button_states(self, is_file_open: bool, is_modified: bool, is_tutorial: bool):
         self.open_button.setEnabled(True)
@@ -98,22 +181,69 @@ class DocumentViewer(QWidget):
         self.close_button.setEnabled(is_file_open)
         self.add_button.setEnabled(is_file_open)
         self.search_input.setEnabled(is_file_open)
+        self.regex_checkbox.setEnabled(is_file_open)
+        self.whole_word_checkbox.setEnabled(is_file_open)
         self.prev_button.setEnabled(is_file_open)
         self.next_button.setEnabled(is_file_open)
         self.show_all_button.setEnabled(is_file_open)
 
-    def _find(self, backwards=False):
-        self.clear_temporary_highlights()
-        query = self.search_input.text()
-        if not query: return
-        find_flags = QTextDocument.FindFlag.FindBackward if backwards else QTextDocument.FindFlag(0)
-        if not self.text_browser.find(query, find_flags):
-            # Wrap around if not found
+    def set_search_index(self, search_index):
+        self._search_index = search_index
+
+    def current_search_query(self) -> SearchQuery:
+        return SearchQuery(self.search_input.text(), self.regex_checkbox.isChecked(), self.whole_word_checkbox.isChecked())
+
+    def _find(self, backwards=False, offset=None):
+        self._dismiss_show_all()
+        query = self.current_search_query()
+        if not query.text or self._search_index is None:
+            self.match_label.clear()
+            return
+        if offset is None:
             cursor = self.text_browser.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.Start if not backwards else QTextCursor.MoveOperation.End)
-            self.text_browser.setTextCursor(cursor)
-            self.text_browser.find(query, find_flags)
+            if cursor.hasSelection():
+                offset = self._position_map.to_raw(cursor.selectionStart())
+            else:
+                offset = self._position_map.to_raw(cursor.position()) - (0 if backwards else 1)
+        try:
+            located = self._search_index.locate(query, offset, backwards)
+        except re.error:
+            self.match_label.setText(self.theme_manager.get_text("search_invalid_pattern"))
+            return
+        if located is None:
+            self.match_label.setText(self.theme_manager.get_text("search_no_matches"))
+            return
+        match_number, (start, end) = located
+        self.select_range(start, end)
+        self.match_label.setText(self.theme_manager.get_text("search_match_position", current=match_number + 1, total=self._search_index.count(query)))
+
+    def _on_search_text_changed(self, *args):
+        self._search_worker.cancel()
+        self._dismiss_show_all()
+        if not self.search_input.text():
+            self._search_debounce.stop()
+            self.match_label.clear()
+            return
+        self._search_debounce.start()
 
+    def _start_incremental_search(self):
+        query = self.current_search_query()
+        if query.text and self._search_index is not None:
+            self._search_worker.submit(self._search_index, query)
+
+    def _on_incremental_search_finished(self, generation, search_index, query, ranges):
+        # Results for an older query, option set or document version are dropped.
+        if not self._search_worker.is_current(generation) or search_index is not self._search_index: return
+        if query != self.current_search_query(): return
+        if not ranges:
+            self.match_label.setText(self.theme_manager.get_text("search_no_matches"))
+            return
+        # Stay on the current match while it still matches the longer query.
+        self._find(offset=self.get_selection_start() - 1)
+
+    def _on_incremental_search_failed(self, generation, message):
+        if self._search_worker.is_current(generation):
+            self.match_label.setText(self.theme_manager.get_text("search_invalid_pattern"))
 
     def _find_next(self):
         self._find()
@@ -122,69 +252,288 @@ class DocumentViewer(QWidget):
         self._find(backwards=True)
 
     def _on_show_all(self):
-        query = self.search_input.text()
-        if query:
+        query = self.current_search_query()
+        if query.text:
             self.show_all_requested.emit(query)
 
-    def apply_temporary_highlights(self, search_term: str):
+    @tracing.traced("DocumentViewer.apply_temporary_highlights")
+    def apply_temporary_highlights(self, search):
         self.clear_temporary_highlights()
-        if not search_term: return
-        
+        if not search: return
+        self._temp_search = search
+        if self._search_index is None: return
+
+        # Matches come from the shared index; only those inside the loaded window get a selection.
+        try:
+            matches = self._search_index.search(search)
+        except re.error:
+            self.match_label.setText(self.theme_manager.get_text("search_invalid_pattern"))
+            return
+        position_map = self._position_map
+        ws, we = position_map.window_start, position_map.window_end
+        lo = bisect_left(matches, (ws, ws))
+        hi = bisect_left(matches, (we, we))
         doc = self.text_browser.document()
-        cursor = QTextCursor(doc)
-        
-        while not cursor.isNull() and not cursor.atEnd():
-            cursor = doc.find(search_term, cursor) # Case-insensitivity is default
-            if not cursor.isNull():
-                selection = QTextBrowser.ExtraSelection()
-                selection.format = self._temp_highlight_format
-                selection.cursor = cursor
-                self._extra_selections.append(selection)
+        for start, end in matches[lo:hi]:
+            cursor = QTextCursor(doc)
+            cursor.setPosition(position_map.to_view(start))
+            cursor.setPosition(position_map.to_view(end), QTextCursor.MoveMode.KeepAnchor)
+            selection = QTextBrowser.ExtraSelection()
+            selection.format = self._temp_highlight_format
+            selection.cursor = cursor
+            self._extra_selections.append(selection)
 
         self.text_browser.setExtraSelections(self._extra_selections)
+        self.match_label.setText(self.theme_manager.get_text("search_match_count", total=len(matches)))
+
+    def _dismiss_show_all(self):
+        # The user moved on from the query shown with Show All, so Add must not highlight its matches any more.
+        self.clear_temporary_highlights()
+        self.show_all_dismissed.emit()
 
     def clear_temporary_highlights(self):
+        self._temp_search = None
         self._extra_selections.clear()
         self.text_browser.setExtraSelections(self._extra_selections)
 
-    def get_selected_text(self) -> str:
+    def get_selection_range(self) -> tuple[int, int]:
+        """The selection as raw text offsets [start, end)."""
         cursor = self.text_browser.textCursor()
-        return cursor.selection().toPlainText().strip() if cursor.hasSelection() else ""
+        return self._position_map.to_raw(cursor.selectionStart()), self._position_map.to_raw(cursor.selectionEnd())
+
+    def get_selection_start(self) -> int:
+        """Returns the selection start as an offset into the full raw text."""
+        return self._position_map.to_raw(self.text_browser.textCursor().selectionStart())
 
-    def _on_anchor_clicked(self, url):
-        href = url.toString()
-        if href.startswith("slothy:highlight_"):
-            try:
-                index = int(href.split("_")[1])
-                self.highlight_activated_by_index.emit(index)
-            except (IndexError, ValueError): pass
+    def _on_position_clicked(self, position: int):
+        position = self._position_map.to_raw(position)
+        # Innermost (latest starting) highlight covering the click wins.
+        hits = self._hit_intervals.stabbing(position)
+        if hits:
+            self.highlight_activated_by_index.emit(self._hit_ranges[hits[-1]][2])
 
     def show_placeholder_message(self):
         header = self.theme_manager.get_text('placeholder_header')
         body = self.theme_manager.get_text('placeholder_body')
         placeholder_html = f"<div style='text-align: center;'><p id='PlaceholderHeader'>{header}</p><p id='PlaceholderBody'>{body}</p></div>"
         self.text_browser.setHtml(placeholder_html)
+        self._reset_loaded_state()
 
-    def set_content(self, rendered_html: str, raw_text: str, mode: str):
-        self.clear_temporary_highlights()
+    def reset_view(self):
+        """Forgets the loaded text so the next set_content starts from the top (e.g. after switching documents)."""
+        self._reset_loaded_state()
+
+    def _reset_loaded_state(self):
+        self._loaded_text = None
+        self._virtual = False
+        self._position_map = PositionMap()
+        self._range_by_index = {}
+        self._applied_ranges = {}
+        self._hit_ranges = []
+        self._hit_intervals = IntervalTree([], [])
+        self._plan_formats = {}
+
+    def _load_text(self, raw_text: str):
+        """Loads plain text into the document only when it actually changed."""
+        if self._loaded_text is not None and (raw_text is self._loaded_text or raw_text == self._loaded_text):
+            return
+        was_loaded = self._loaded_text is not None
+        if was_loaded and not self._virtual and len(raw_text) <= self._virtualize_threshold:
+            self._replace_changed_segment(self._loaded_text, raw_text)
+            self._loaded_text = raw_text
+            self._position_map = PositionMap(0, len(raw_text), raw_text)
+            return
+        anchor = self._top_visible_offset() if was_loaded else 0
+        self._loaded_text = raw_text
+        self._applied_ranges = {}
+        self._virtual = len(raw_text) > self._virtualize_threshold
+        if self._virtual:
+            self._load_window(min(anchor, len(raw_text)))
+            self._scroll_offset_to_top(anchor)
+            return
         v_scrollbar = self.text_browser.verticalScrollBar()
-        scroll_position = v_scrollbar.value()
-        self.text_browser.setHtml(rendered_html)
+        scroll_position = v_scrollbar.value() if was_loaded else 0
+        self._shifting_window = True
+        self.text_browser.setPlainText(raw_text)
+        self._shifting_window = False
+        self._position_map = PositionMap(0, len(raw_text), raw_text)
         v_scrollbar.setValue(scroll_position)
-        
+
+    def _replace_changed_segment(self, old_text: str, new_text: str):
+        """
+        Swaps only the differing middle of the loaded text for its new version, so
+        an edited highlight doesn't re-layout the whole document. Applied formats
+        after the edit are shifted, the ones it touches are cleared and dropped.
+        """
+        prefix = _common_prefix_length(old_text, new_text)
+        suffix = _common_suffix_length(old_text, new_text, prefix)
+        middle = new_text[prefix:len(new_text) - suffix]
+        # From here on everything is in viewer (UTF-16) positions, like the applied ranges.
+        position_map = self._position_map
+        prefix, old_end = position_map.to_view(prefix), position_map.to_view(len(old_text) - suffix)
+        new_end = prefix + PositionMap(0, len(middle), middle).to_view(len(middle))
+        delta = new_end - old_end
+
+        cursor = QTextCursor(self.text_browser.document())
+        cursor.beginEditBlock()
+        cursor.setPosition(prefix)
+        cursor.setPosition(old_end, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText(middle, self._plain_format)
+
+        applied, cleared = {}, []
+        for (start, end), is_selected in self._applied_ranges.items():
+            if end <= prefix: applied[(start, end)] = is_selected
+            elif start >= old_end: applied[(start + delta, end + delta)] = is_selected
+            else: cleared.append((min(start, prefix), max(end + delta, new_end)))
+        for start, end in cleared:
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            cursor.setCharFormat(self._plain_format)
+        cursor.endEditBlock()
+        # Clearing may have wiped part of a range that overlaps a touched one; forget those too.
+        if cleared:
+            applied = {key: is_selected for key, is_selected in applied.items()
+                       if not any(key[0] < end and key[1] > start for start, end in cleared)}
+        self._applied_ranges = applied
+
+    def _load_window(self, anchor: int):
+        """Loads the slice of raw text around anchor: one chunk above it and two below."""
+        text = self._loaded_text
+        start = max(0, anchor - self._chunk_chars)
+        end = min(len(text), start + 3 * self._chunk_chars)
+        start = max(0, end - 3 * self._chunk_chars)
+        # Snap to line boundaries so a window edge never splits a paragraph mid-line.
+        if start > 0:
+            newline = text.rfind('\n', max(0, start - 1000), start)
+            if newline != -1: start = newline + 1
+        if end < len(text):
+            newline = text.find('\n', end, end + 1000)
+            if newline != -1: end = newline + 1
+        self._shifting_window = True
+        self.text_browser.setPlainText(text[start:end])
+        self._shifting_window = False
+        self._position_map = PositionMap(start, end, text[start:end])
+        self._applied_ranges = {}
+
+    def _refresh_window(self, anchor: int):
+        temp_search = self._temp_search
+        self._load_window(anchor)
+        self._apply_highlight_formats(self._window_formats())
+        if temp_search:
+            self.apply_temporary_highlights(temp_search)
+
+    def _on_scrolled(self, value: int):
+        if not self._virtual or self._shifting_window: return
+        bar = self.text_browser.verticalScrollBar()
+        near_top = value <= bar.minimum() + bar.pageStep() // 2 and self._position_map.window_start > 0
+        near_bottom = value >= bar.maximum() - bar.pageStep() // 2 and self._position_map.window_end < len(self._loaded_text)
+        if near_top or near_bottom:
+            top_offset = self._top_visible_offset()
+            self._refresh_window(top_offset)
+            self._scroll_offset_to_top(top_offset)
+
+    def _top_visible_offset(self) -> int:
+        return self._position_map.to_raw(self.text_browser.cursorForPosition(QPoint(0, 0)).position())
+
+    def _scroll_offset_to_top(self, offset: int):
+        cursor = QTextCursor(self.text_browser.document())
+        cursor.setPosition(self._position_map.to_view(offset))
+        bar = self.text_browser.verticalScrollBar()
+        self._shifting_window = True
+        bar.setValue(bar.value() + self.text_browser.cursorRect(cursor).top())
+        self._shifting_window = False
+
+    def _window_formats(self) -> dict:
+        """Clips the raw-offset highlight formats to the loaded window, in viewer positions."""
+        position_map = self._position_map
+        if not self._virtual and not position_map.astral: return self._plan_formats
+        ws, we = position_map.window_start, position_map.window_end
+        formats = {}
+        for i in self._hit_intervals.overlapping(ws, we):
+            start, end, _ = self._hit_ranges[i]
+            formats[(position_map.to_view(start), position_map.to_view(end))] = self._plan_formats[(start, end)]
+        return formats
+
+    def select_range(self, start: int, end: int):
+        """Selects the raw text range [start, end), loading the window around it first if needed."""
+        if self._virtual and not self._position_map.contains(start, end):
+            self._refresh_window(start)
+        cursor = self.text_browser.textCursor()
+        cursor.setPosition(self._position_map.to_view(start))
+        cursor.setPosition(self._position_map.to_view(end), QTextCursor.MoveMode.KeepAnchor)
+        self.text_browser.setTextCursor(cursor)
+        self.text_browser.ensureCursorVisible()
+
+    def _apply_highlight_formats(self, wanted: dict):
+        """Diffs the wanted (start, end) -> is_selected formats against those applied and only touches what changed."""
+        stale = [key for key, is_selected in self._applied_ranges.items() if wanted.get(key) != is_selected]
+        to_apply = {key for key, is_selected in wanted.items() if self._applied_ranges.get(key) != is_selected}
+
+        cursor = QTextCursor(self.text_browser.document())
+        cursor.beginEditBlock()
+        for start, end in stale:
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            cursor.setCharFormat(self._plain_format)
+
+        # Clearing a stale range may have wiped part of an overlapping range that is still wanted.
+        if stale:
+            wanted_keys = sorted(wanted)
+            wanted_intervals = IntervalTree([k[0] for k in wanted_keys], [k[1] for k in wanted_keys])
+            for start, end in stale:
+                to_apply.update(wanted_keys[i] for i in wanted_intervals.overlapping(start, end))
+
+        # Selected ranges are applied last so they win over plain highlights where they overlap.
+        for start, end in sorted(to_apply, key=lambda k: (wanted[k], k)):
+            cursor.setPosition(start)
+            cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+            cursor.setCharFormat(self._selected_format if wanted[(start, end)] else self._highlight_format)
+        cursor.endEditBlock()
+        self._applied_ranges = wanted
+
+    def set_pending_content(self, raw_text: str):
+        """
+        Shows raw_text while its render plan is still being built. Formats already
+        applied stay until set_content diffs against them, but no highlight can be
+        hit-tested or jumped to in the meantime.
+        """
+        self.clear_temporary_highlights()
+        self._hit_ranges, self._hit_intervals, self._range_by_index = [], IntervalTree([], []), {}
+        self._plan_formats = {}
+        self._load_text(raw_text)
+
+    @tracing.traced("DocumentViewer.set_content")
+    def set_content(self, raw_text: str, plan: RenderPlan):
+        """Shows raw_text with the highlights of a render plan (see render_cache)."""
+        self.clear_temporary_highlights()
+        self._hit_ranges = plan.ranges
+        self._hit_intervals = plan.intervals
+        self._range_by_index = plan.range_by_index
+        self._plan_formats = plan.formats
+        self._load_text(raw_text)
+        self._apply_highlight_formats(self._window_formats())
+
+    @tracing.traced("DocumentViewer.update_stats")
+    def update_stats(self, document_stats, mode: str):
         if mode in ["[SRT]", "[VTT]"]:
             self.word_stats_panel.clear()
-            self.duration_stats_panel.update_stats_from_text(raw_text)
+            self.duration_stats_panel.update_stats(document_stats.duration)
         else:
             self.duration_stats_panel.clear()
-            self.word_stats_panel.update_stats(raw_text)
+            self.word_stats_panel.update_stats(document_stats.word_count)
 
-    def jump_to_text(self, text: str):
-        self.text_browser.moveCursor(QTextCursor.MoveOperation.Start)
-        self.text_browser.find(text)
+    @tracing.traced("DocumentViewer.jump_to_highlight")
+    def jump_to_highlight(self, index: int):
+        """Selects the highlight with the given controller index using its resolved offsets."""
+        highlight_range = self._range_by_index.get(index)
+        if highlight_range:
+            self.select_range(*highlight_range)
 
     def clear_content(self):
         self.clear_temporary_highlights()
+        self.match_label.clear()
+        self._search_worker.cancel()
+        self._search_index = None
         self.show_placeholder_message()
         self.word_stats_panel.clear()
         self.duration_stats_panel.clear()
\ No newline at end of file
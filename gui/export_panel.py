@@ -1,29 +1,48 @@
 import os
-import re
-from datetime import datetime, timedelta
-from PySide6.QtCore import Signal, Qt
+import copy
+import threading
+from PySide6.QtCore import Signal, Qt, QObject, QRunnable, QThreadPool
 from PySide6.QtWidgets import (
     QWidget, QGroupBox, QHBoxLayout, QPushButton,
-    QApplication, QFileDialog, QMessageBox
+    QApplication, QFileDialog, QMessageBox, QMenu
 )
-
-def _seconds_to_srt_time(seconds: float) -> str:
-    if seconds < 0: seconds = 0
-    td = timedelta(seconds=seconds)
-    total_seconds = int(td.total_seconds())
-    milliseconds = int(td.microseconds / 1000)
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, secs = divmod(remainder, 60)
-    return f"{hours:02}:{minutes:02}:{secs:02},{milliseconds:03}"
-
-def _seconds_to_vtt_time(seconds: float) -> str:
-    if seconds < 0: seconds = 0
-    td = timedelta(seconds=seconds)
-    total_seconds = int(td.total_seconds())
-    milliseconds = int(td.microseconds / 1000)
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, secs = divmod(remainder, 60)
-    return f"{hours:02}:{minutes:02}:{secs:02}.{milliseconds:03}"
+import export_engine
+from highlight_index import HighlightIndex
+
+class _ExportSignals(QObject):
+    progress = Signal(int, int)
+    finished = Signal(str, int)
+    failed = Signal(str)
+    cancelled = Signal(str)
+
+class _ExportTask(QRunnable):
+    """Writes one export on the thread pool so large exports never block the UI; setting cancel_event stops it."""
+    def __init__(self, filepath, fmt, records, mode, fps, speaker_index, cancel_event):
+        super().__init__()
+        self.signals = _ExportSignals()
+        self._args = (filepath, fmt, records, mode)
+        self._fps = fps
+        self._speaker_index = speaker_index
+        self._cancel_event = cancel_event
+
+    def run(self):
+        filepath = self._args[0]
+        try:
+            count = export_engine.write_export(*self._args, fps=self._fps, progress=self.signals.progress.emit,
+                                                should_cancel=self._cancel_event.is_set, ordered=True,
+                                                speaker_index=self._speaker_index)
+        except export_engine.ExportCancelled:
+            # A half-written export is of no use; don't leave it behind.
+            try:
+                os.remove(filepath)
+            except OSError:
+                pass
+            self.signals.cancelled.emit(filepath)
+            return
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(filepath, count)
 
 class ExportPanel(QWidget):
     status_message_requested = Signal(str, int)
@@ -32,8 +51,13 @@ class ExportPanel(QWidget):
         self.theme_manager = tm = theme_manager
         self._list_widget = list_widget
         self._highlights = []
+        self._highlight_index = HighlightIndex()
+        self._speaker_index = None
+        self._speakers = None # exported speakers, None for everyone
         self._current_filename = "Document"
         self._document_mode = "simple"
+        self._active_export = None
+        self._export_cancel = None
 
         layout = QHBoxLayout(self); layout.setContentsMargins(0, 0, 0, 0)
         groupbox = QGroupBox(tm.get_text("export_panel_title")); groupbox.setObjectName("ExportPanelGroupBox")
@@ -43,11 +67,16 @@ class ExportPanel(QWidget):
         self.copy_selected_btn = self._create_button(tm.get_text("export_button_copy_selected"), "copy_selected", self.copy_selected_highlights)
         self.txt_btn = self._create_button(tm.get_text("export_button_txt"), "txt", self.export_highlights_txt)
         self.transcript_btn = self._create_button("Export", "srt", self.export_transcript)
+        self.data_btn = self._create_button(tm.get_text("export_button_data"), "data", self._show_data_menu)
+        self.cancel_btn = self._create_button(tm.get_text("export_button_cancel"), "cancel", self.cancel_export)
+        self.cancel_btn.setVisible(False)
 
         groupbox_layout.addWidget(self.copy_btn)
         groupbox_layout.addWidget(self.copy_selected_btn)
         groupbox_layout.addWidget(self.txt_btn)
         groupbox_layout.addWidget(self.transcript_btn)
+        groupbox_layout.addWidget(self.data_btn)
+        groupbox_layout.addWidget(self.cancel_btn)
         layout.addWidget(groupbox)
         self.set_enabled(False)
 
@@ -58,8 +87,14 @@ class ExportPanel(QWidget):
         btn.clicked.connect(on_click_slot)
         return btn
 
-    def set_data(self, highlights: list, filename: str, mode: str):
+    def set_data(self, highlights: list, filename: str, mode: str, highlight_index: HighlightIndex, speaker_index=None):
+        """
+        highlight_index supplies the position and time orders exports are written in;
+        speaker_index, for transcripts and subtitles, whose highlights each speaker's are.
+        """
         self._highlights = highlights
+        self._highlight_index = highlight_index
+        self._speaker_index = speaker_index
         self._current_filename = filename
         self._document_mode = mode
         has_timestamps = any(h.start_time >= 0 for h in highlights)
@@ -69,34 +104,48 @@ class ExportPanel(QWidget):
 
         if mode == "[SRT]":
             self.transcript_btn.setText(self.theme_manager.get_text("export_button_srt"))
-            self.transcript_btn.setEnabled(has_timestamps)
+            self.transcript_btn.setEnabled(has_timestamps and self._active_export is None)
         elif mode == "[VTT]":
             self.transcript_btn.setText(self.theme_manager.get_text("export_button_vtt"))
-            self.transcript_btn.setEnabled(has_timestamps)
+            self.transcript_btn.setEnabled(has_timestamps and self._active_export is None)
         
         self.set_enabled(bool(highlights))
         self.set_copy_selected_enabled(False) # Default to disabled until a selection is made
 
     def set_enabled(self, enabled: bool):
+        enabled = enabled and self._active_export is None
         self.copy_btn.setEnabled(enabled)
         self.txt_btn.setEnabled(enabled)
+        self.data_btn.setEnabled(enabled)
         if not enabled:
             self.transcript_btn.setEnabled(False)
             self.copy_selected_btn.setEnabled(False)
 
+    def set_speaker_filter(self, speakers: set | None):
+        """Restricts copying and exporting all highlights to these speakers' highlights; None lifts it."""
+        self._speakers = speakers
+
     def set_copy_selected_enabled(self, enabled: bool):
         self.copy_selected_btn.setEnabled(enabled)
             
     def _get_sorted_display_texts(self, highlight_list) -> list[str]:
-        if self._document_mode == "simple":
-            sorted_highlights = sorted([h for h in highlight_list if h.start_pos != -1], key=lambda h: h.start_pos)
+        return [h.display_text for h in export_engine.ordered_for_export(highlight_list, self._document_mode)]
+
+    def _export_records(self, fmt: str | None = None) -> list:
+        """What export_engine.export_records would return, read off the controller's sorted views."""
+        index = self._highlight_index
+        if (fmt is not None and export_engine.EXPORT_FORMATS[fmt][1]) or self._document_mode != "simple":
+            records = index.by_time()
         else:
-            sorted_highlights = sorted([h for h in highlight_list if h.start_time != -1], key=lambda h: h.start_time)
-        return [h.display_text for h in sorted_highlights]
+            records = [h for h in index.by_position() if h.start_pos != -1]
+        if self._speakers is not None and self._speaker_index is not None:
+            speaker_of = self._speaker_index.speaker_of
+            records = [h for h in records if speaker_of(h.start_pos) in self._speakers]
+        return records
 
     def copy_all_highlights(self):
-        if not self._highlights: return
-        formatted_texts = self._get_sorted_display_texts(self._highlights)
+        formatted_texts = [h.display_text for h in self._export_records()]
+        if not formatted_texts: return
         QApplication.clipboard().setText("\n\n".join(formatted_texts))
         self.status_message_requested.emit(self.theme_manager.get_text("status_copied"), 3000)
 
@@ -110,66 +159,74 @@ class ExportPanel(QWidget):
         self.status_message_requested.emit(f"Copied {len(selected_highlights)} selected highlight(s).", 3000)
 
     def export_highlights_txt(self):
-        def generate_content():
-            formatted_texts = self._get_sorted_display_texts(self._highlights)
-            return "\n\n".join(formatted_texts)
-        self._export_handler("dialog_save_txt_title", "Text Files (*.txt)", generate_content)
+        self._export_handler("dialog_save_txt_title", "Text Files (*.txt)", "txt")
 
     def export_transcript(self):
-        timed_highlights = sorted([h for h in self._highlights if h.start_time >= 0], key=lambda h: h.start_time)
-        if not timed_highlights:
+        if not self._export_records("transcript"):
             self.status_message_requested.emit(self.theme_manager.get_text("status_no_timestamps"), 3000)
             return
 
         if self._document_mode == "[TRANSCRIPT]":
-            def generate_transcript_content():
-                return "\n\n".join([h.display_text for h in timed_highlights])
-            self._export_handler("dialog_save_transcript_title", "Text Files (*.txt)", generate_transcript_content)
-            return
-
-        is_vtt = self._document_mode == "[VTT]"
-        time_formatter = _seconds_to_vtt_time if is_vtt else _seconds_to_srt_time
-        
-        def generate_content():
-            blocks = []
-            if is_vtt:
-                blocks.append("WEBVTT\n")
-
-            for i, item in enumerate(timed_highlights):
-                start = time_formatter(item.start_time)
-                
-                end_seconds = item.end_time
-                if not (end_seconds > item.start_time):
-                    if i + 1 < len(timed_highlights):
-                        end_seconds = timed_highlights[i + 1].start_time
-                    else:
-                        end_seconds = item.start_time + 5.0
-                
-                if end_seconds <= item.start_time:
-                    end_seconds = item.start_time + 1.0
-
-                end = time_formatter(end_seconds)
-                text = re.sub(r'^\s*Speaker\s*\d+[:\-]?\s*', '', item.text, flags=re.IGNORECASE).strip()
-
-                if is_vtt:
-                    blocks.append(f"{start} --> {end}\n{text}\n")
-                else: # SRT
-                    blocks.append(f"{i + 1}\n{start} --> {end}\n{text}\n")
-            
-            return "\n".join(blocks)
-
-        if is_vtt:
-            self._export_handler("dialog_save_vtt_title", "WebVTT Subtitle (*.vtt)", generate_content)
+            self._export_handler("dialog_save_transcript_title", "Text Files (*.txt)", "transcript")
+        elif self._document_mode == "[VTT]":
+            self._export_handler("dialog_save_vtt_title", "WebVTT Subtitle (*.vtt)", "vtt")
         else: # SRT
-            self._export_handler("dialog_save_srt_title", "SubRip Subtitle (*.srt)", generate_content)
-
-    def _export_handler(self, dialog_title_key, file_filter, content_generator):
-        if not self._highlights: return
+            self._export_handler("dialog_save_srt_title", "SubRip Subtitle (*.srt)", "srt")
+
+    def _show_data_menu(self):
+        tm = self.theme_manager
+        menu = QMenu(self)
+        menu.addAction(tm.get_text("export_menu_csv"), lambda: self._export_handler("dialog_save_csv_title", "CSV Files (*.csv)", "csv"))
+        menu.addAction(tm.get_text("export_menu_jsonl"), lambda: self._export_handler("dialog_save_jsonl_title", "JSON Lines (*.jsonl)", "jsonl"))
+        edl_action = menu.addAction(tm.get_text("export_menu_edl"), lambda: self._export_handler("dialog_save_edl_title", "Edit Decision List (*.edl)", "edl"))
+        edl_action.setEnabled(any(h.start_time >= 0 for h in self._highlights))
+        menu.exec(self.data_btn.mapToGlobal(self.data_btn.rect().bottomLeft()))
+
+    def _export_handler(self, dialog_title_key, file_filter, fmt):
+        if not self._highlights or self._active_export is not None: return
         default_filename = os.path.splitext(self._current_filename)[0]
         filepath, _ = QFileDialog.getSaveFileName(self, self.theme_manager.get_text(dialog_title_key), default_filename, file_filter)
         if not filepath: return
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f: f.write(content_generator())
-            self.status_message_requested.emit(self.theme_manager.get_text("status_saved", file=os.path.basename(filepath)), 3000)
-        except IOError as e:
-            QMessageBox.critical(self, self.theme_manager.get_text("error_title"), self.theme_manager.get_text("error_file_save_failed", error=e))
\ No newline at end of file
+
+        # Snapshot the highlights so edits made while the export runs don't race with the writer.
+        snapshot = [copy.copy(h) for h in self._export_records(fmt)]
+        fps = self.theme_manager.get_value("app_config.edl_fps", 25)
+        self._export_cancel = threading.Event()
+        task = _ExportTask(filepath, fmt, snapshot, self._document_mode, fps, self._speaker_index, self._export_cancel)
+        task.signals.progress.connect(self._on_export_progress)
+        task.signals.finished.connect(self._on_export_finished)
+        task.signals.failed.connect(self._on_export_failed)
+        task.signals.cancelled.connect(self._on_export_cancelled)
+        self._active_export = task.signals
+        self.set_enabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.cancel_btn.setVisible(True)
+        QThreadPool.globalInstance().start(task)
+
+    def cancel_export(self):
+        """Asks the running export to stop; it deletes its partial file and reports back through cancelled."""
+        if self._export_cancel is None: return
+        self._export_cancel.set()
+        self.cancel_btn.setEnabled(False)
+
+    def _on_export_progress(self, done, total):
+        if total:
+            self.status_message_requested.emit(self.theme_manager.get_text("status_exporting", percent=int(done * 100 / total)), 0)
+
+    def _end_export(self):
+        self._active_export = None
+        self._export_cancel = None
+        self.cancel_btn.setVisible(False)
+        self.set_data(self._highlights, self._current_filename, self._document_mode, self._highlight_index, self._speaker_index)
+
+    def _on_export_finished(self, filepath, count):
+        self._end_export()
+        self.status_message_requested.emit(self.theme_manager.get_text("status_saved", file=os.path.basename(filepath)), 3000)
+
+    def _on_export_cancelled(self, filepath):
+        self._end_export()
+        self.status_message_requested.emit(self.theme_manager.get_text("status_export_cancelled"), 3000)
+
+    def _on_export_failed(self, error):
+        self._end_export()
+        QMessageBox.critical(self, self.theme_manager.get_text("error_title"), self.theme_manager.get_text("error_file_save_failed", error=error))
@@ -1,23 +1,39 @@
+from collections import Counter
 from PySide6.QtCore import Signal, Qt
-from PySide6.QtWidgets import QWidget, QGroupBox, QVBoxLayout, QPushButton, QHBoxLayout, QMessageBox, QLabel
+from PySide6.QtWidgets import QWidget, QGroupBox, QVBoxLayout, QPushButton, QHBoxLayout, QMessageBox, QLabel, QToolButton, QMenu, QLineEdit
+import tracing
+from highlight_index import HighlightIndex
+from stats_engine import HighlightTotals
 from gui.widgets import HighlightListWidget
 from gui.export_panel import ExportPanel
 from gui.word_stats_panel import WordStatsPanel
-from gui.duration_stats_panel import DurationStatsPanel
+from gui.duration_stats_panel import DurationStatsPanel, _format_seconds
 
 class HighlightsPanel(QWidget):
     highlight_selected = Signal(int)
     remove_highlights_requested = Signal(list) 
     remove_all_highlights_requested = Signal()
+    merge_overlapping_requested = Signal()
     undo_requested = Signal()
     redo_requested = Signal()
-    reorder_requested = Signal(list)
+    move_requested = Signal(list, object, object) # moved highlights, new neighbour above, below
     edit_highlight_requested = Signal(object, str)
     
     def __init__(self, theme_manager, parent=None):
         super().__init__(parent)
         self.theme_manager = tm = theme_manager
         self._sorted_highlights = []
+        self._mode = "simple"
+        self._filename = None
+        self._highlight_totals = HighlightTotals()
+        self._speaker_index = None
+        self._row_speakers = [] # speaker of each row, from the speaker index
+        self._speaker_totals = {}
+        self._chosen_speakers = None # None shows every speaker
+        self._row_texts = [] # casefolded display_text of each row, from the highlight index
+        self._row_hidden = []
+        self._filter_query = ""
+        self._text_matches = None # whether each row matches the filter text, None without one
         
         main_layout = QVBoxLayout(self)
         main_layout.setContentsMargins(0, 0, 0, 0)
@@ -29,18 +45,31 @@ class HighlightsPanel(QWidget):
         self.redo_button = QPushButton(tm.get_text("button_redo"))
         self.remove_button = QPushButton(tm.get_text("button_remove_highlight"))
         self.remove_all_button = QPushButton(tm.get_text("button_remove_all"))
+        self.merge_button = QPushButton(tm.get_text("button_merge_overlapping"))
+        self.merge_button.setToolTip(tm.get_text("button_merge_overlapping_tooltip"))
 
         self.undo_button.clicked.connect(self.undo_requested.emit)
         self.redo_button.clicked.connect(self.redo_requested.emit)
         self.remove_button.clicked.connect(self._on_remove_clicked)
         self.remove_all_button.clicked.connect(self._on_remove_all_clicked)
+        self.merge_button.clicked.connect(self.merge_overlapping_requested.emit)
         
         top_button_bar_layout.addWidget(self.undo_button)
         top_button_bar_layout.addWidget(self.redo_button)
         top_button_bar_layout.addStretch()
+        top_button_bar_layout.addWidget(self.merge_button)
         top_button_bar_layout.addWidget(self.remove_button)
         top_button_bar_layout.addWidget(self.remove_all_button)
 
+        self.speaker_filter_button = QToolButton()
+        self.speaker_filter_button.setToolTip(tm.get_text("speaker_filter_tooltip"))
+        self.speaker_filter_button.setPopupMode(QToolButton.InstantPopup)
+        self.speaker_filter_menu = QMenu(self.speaker_filter_button)
+        self.speaker_filter_menu.triggered.connect(self._on_speaker_action)
+        self.speaker_filter_button.setMenu(self.speaker_filter_menu)
+        self.speaker_filter_button.setVisible(False)
+        top_button_bar_layout.insertWidget(2, self.speaker_filter_button)
+
         self.mode_indicator_label = QLabel()
         self.mode_indicator_label.setAlignment(Qt.AlignCenter)
         self.mode_indicator_label.setObjectName("HelperLabel")
@@ -52,10 +81,15 @@ class HighlightsPanel(QWidget):
         self.helper_label.setWordWrap(True)
         self.helper_label.setVisible(False)
 
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText(tm.get_text("highlights_filter_placeholder"))
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.textChanged.connect(self._on_filter_text_changed)
+
         self.list_widget = HighlightListWidget(self.theme_manager, self)
         self.list_widget.itemClicked.connect(self._on_item_clicked)
         self.list_widget.itemSelectionChanged.connect(self._on_selection_changed)
-        self.list_widget.reorder_requested.connect(self.reorder_requested.emit)
+        self.list_widget.rows_reordered.connect(self._on_rows_reordered)
         self.list_widget.edit_requested.connect(self.edit_highlight_requested.emit)
 
         self.word_stats_panel = WordStatsPanel(self.theme_manager)
@@ -65,6 +99,7 @@ class HighlightsPanel(QWidget):
         group_layout.addLayout(top_button_bar_layout)
         group_layout.addWidget(self.mode_indicator_label)
         group_layout.addWidget(self.helper_label)
+        group_layout.addWidget(self.filter_input)
         group_layout.addWidget(self.list_widget, 1)
         group_layout.addWidget(self.word_stats_panel)
         group_layout.addWidget(self.duration_stats_panel)
@@ -80,6 +115,18 @@ class HighlightsPanel(QWidget):
         self.remove_button.setEnabled(bool(selected_items))
         self.export_panel.set_copy_selected_enabled(bool(selected_items))
     
+    def _on_rows_reordered(self, order: list, moved_rows: list):
+        # The list widget already shows the new order; mirror it in place so the export panel sees it too.
+        for rows in (self._sorted_highlights, self._row_texts, self._row_hidden):
+            rows[:] = [rows[i] for i in order]
+        if not moved_rows: return
+        # A drop leaves the moved items together; re-key the whole span so the model matches the list either way.
+        first, last = min(moved_rows), max(moved_rows)
+        moved = self._sorted_highlights[first:last + 1]
+        above = self._sorted_highlights[first - 1] if first > 0 else None
+        below = self._sorted_highlights[last + 1] if last + 1 < len(self._sorted_highlights) else None
+        self.move_requested.emit(moved, above, below)
+
     def _on_remove_clicked(self):
         selected_items = self.list_widget.selectedItems()
         if not selected_items:
@@ -105,29 +152,141 @@ class HighlightsPanel(QWidget):
             self.list_widget.clearSelection()
             self.list_widget.setCurrentRow(index)
 
-    def populate(self, highlights: list, filename: str, mode: str):
-        if mode == "simple":
-            self._sorted_highlights = sorted(highlights, key=lambda h: h.sort_key)
-        else:
-            self._sorted_highlights = sorted([h for h in highlights if h.start_time >= 0], key=lambda h: h.start_time)
+    @tracing.traced("HighlightsPanel.populate")
+    def populate(self, highlight_index: HighlightIndex, filename: str, mode: str, highlight_totals, speaker_index=None):
+        """speaker_index, for transcripts and subtitles, backs the speaker filter."""
+        # A copy, since drag moves rearrange it in place.
+        self._sorted_highlights = list(highlight_index.by_user_order() if mode == "simple" else highlight_index.by_time())
+        self._mode = mode
+        self._highlight_totals = highlight_totals
         
         self.list_widget.populate(self._sorted_highlights, mode)
-        self.export_panel.set_data(self._sorted_highlights, filename, mode)
-        
-        if mode in ["[SRT]", "[VTT]"]:
+        self.export_panel.set_data(self._sorted_highlights, filename, mode, highlight_index, speaker_index)
+        self._row_texts = highlight_index.folded_texts(self._sorted_highlights)
+        self._row_hidden = [False] * len(self._sorted_highlights)
+        self._text_matches = None # the rows are new, so nothing can be narrowed down
+        self._text_matches = self._match_rows(self._filter_query)
+        self._set_speakers(speaker_index, filename)
+        self._apply_speaker_filter()
+        self.mode_indicator_label.setText(self.theme_manager.get_text("mode_indicator_label", mode=mode.upper()))
+
+    def _show_totals(self, totals: HighlightTotals):
+        # Only timed highlights are listed outside simple mode, so only they count towards the stats.
+        if self._mode in ["[SRT]", "[VTT]"]:
             self.word_stats_panel.clear()
-            self.duration_stats_panel.update_stats_from_highlights(self._sorted_highlights)
+            self.duration_stats_panel.update_stats(totals.timed_duration)
         else:
             self.duration_stats_panel.clear()
-            combined_text = "\n\n".join(h.text for h in self._sorted_highlights)
-            self.word_stats_panel.update_stats(combined_text)
-            
-        self.mode_indicator_label.setText(self.theme_manager.get_text("mode_indicator_label", mode=mode.upper()))
+            word_count = totals.word_count if self._mode == "simple" else totals.timed_word_count
+            self.word_stats_panel.update_stats(word_count)
+
+    def _set_speakers(self, speaker_index, filename: str):
+        speakers = speaker_index.speakers if speaker_index is not None else []
+        if not speakers:
+            self._speaker_index, self._row_speakers, self._speaker_totals = None, [], {}
+        else:
+            self._speaker_index = speaker_index
+            self._row_speakers = [speaker_index.speaker_of(h.start_pos) for h in self._sorted_highlights]
+            self._speaker_totals = speaker_index.speaker_totals(self._sorted_highlights)
+        # The choice survives edits to the same document, minus speakers that are gone.
+        if filename != self._filename or self._chosen_speakers is None:
+            self._chosen_speakers = None
+        else:
+            self._chosen_speakers = self._chosen_speakers & set(speakers) or None
+        self._filename = filename
+
+        menu = self.speaker_filter_menu
+        menu.clear()
+        all_action = menu.addAction(self.theme_manager.get_text("speaker_filter_all"))
+        all_action.setData(None)
+        menu.addSeparator()
+        counts = Counter(self._row_speakers)
+        for speaker in speakers:
+            duration = _format_seconds(self._speaker_totals[speaker].timed_duration)
+            action = menu.addAction(self.theme_manager.get_text(
+                "speaker_filter_item", speaker=speaker, count=counts[speaker], duration=duration))
+            action.setData(speaker)
+            action.setCheckable(True)
+        self.speaker_filter_button.setVisible(bool(speakers))
+
+    def _on_speaker_action(self, action):
+        speaker = action.data()
+        speakers = self._speaker_index.speakers if self._speaker_index is not None else []
+        if speaker is None:
+            self._chosen_speakers = None
+        else:
+            chosen = set(speakers) if self._chosen_speakers is None else set(self._chosen_speakers)
+            chosen.symmetric_difference_update({speaker})
+            self._chosen_speakers = None if chosen == set(speakers) or not chosen else chosen
+        self._apply_speaker_filter()
+
+    def _apply_speaker_filter(self):
+        chosen = self._chosen_speakers
+        if chosen is None or not self._row_speakers:
+            totals = self._highlight_totals
+        else:
+            totals = HighlightTotals()
+            for speaker in chosen:
+                t = self._speaker_totals[speaker]
+                totals.word_count += t.word_count
+                totals.timed_word_count += t.timed_word_count
+                totals.timed_duration += t.timed_duration
+        self.export_panel.set_speaker_filter(chosen)
+        self._show_totals(totals)
+
+        tm = self.theme_manager
+        for action in self.speaker_filter_menu.actions():
+            if action.isCheckable(): action.setChecked(chosen is None or action.data() in chosen)
+        total = len(self._speaker_totals)
+        self.speaker_filter_button.setText(tm.get_text("speaker_filter_all") if chosen is None
+                                           else tm.get_text("speaker_filter_some", count=len(chosen), total=total))
+        self._update_hidden_rows()
+
+    def _match_rows(self, query: str) -> list[bool] | None:
+        if not query: return None
+        # Typing usually extends the query, and then only rows that matched so far can match.
+        if self._text_matches is not None and self._filter_query and query.startswith(self._filter_query):
+            return [matched and query in text for matched, text in zip(self._text_matches, self._row_texts)]
+        return [query in text for text in self._row_texts]
+
+    @tracing.traced("HighlightsPanel._on_filter_text_changed")
+    def _on_filter_text_changed(self, text: str):
+        query = text.casefold()
+        self._text_matches = self._match_rows(query)
+        self._filter_query = query
+        self._update_hidden_rows()
+
+    def _update_hidden_rows(self):
+        """Shows only rows of the chosen speakers that match the filter text; the items themselves are left alone."""
+        chosen, matches = self._chosen_speakers, self._text_matches
+        speakers = self._row_speakers if chosen is not None and self._row_speakers else None
+        if speakers is None and matches is None:
+            hidden = [False] * len(self._row_hidden)
+        elif matches is None:
+            hidden = [speaker not in chosen for speaker in speakers]
+        elif speakers is None:
+            hidden = [not matched for matched in matches]
+        else:
+            hidden = [not matched or speaker not in chosen for matched, speaker in zip(matches, speakers)]
+
+        list_widget = self.list_widget
+        for item in list_widget.selectedItems():
+            if hidden[list_widget.row(item)]: item.setSelected(False)
+        set_row_hidden = list_widget.setRowHidden
+        for row in [row for row, (old, new) in enumerate(zip(self._row_hidden, hidden)) if old != new]:
+            set_row_hidden(row, hidden[row])
+        self._row_hidden = hidden
+        # Dropping between rows that aren't all shown would be ambiguous.
+        list_widget.setDragEnabled(self._mode == "simple" and matches is None)
 
     def clear_panel(self):
         self._sorted_highlights = []
+        self._row_texts, self._row_hidden = [], []
+        self._text_matches = [] if self._filter_query else None
         self.list_widget.clear()
-        self.export_panel.set_data([], "", "simple")
+        self.export_panel.set_data([], "", "simple", HighlightIndex())
+        self._set_speakers(None, None)
+        self.export_panel.set_speaker_filter(None)
         self.word_stats_panel.clear()
         self.duration_stats_panel.clear()
         self.set_editing_enabled(is_file_open=False, can_undo=False, can_redo=False)
@@ -137,6 +296,8 @@ class HighlightsPanel(QWidget):
         has_items = self.list_widget.count() > 0
         self.remove_button.setEnabled(is_file_open and has_selection)
         self.remove_all_button.setEnabled(is_file_open and has_items)
+        self.merge_button.setEnabled(is_file_open and has_items)
+        self.filter_input.setEnabled(is_file_open)
         self.undo_button.setEnabled(can_undo)
         self.redo_button.setEnabled(can_redo)
         self.helper_label.setVisible(is_file_open and has_items)
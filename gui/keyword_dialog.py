@@ -0,0 +1,66 @@
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QPushButton,
+    QCheckBox, QLabel, QDialogButtonBox, QFileDialog, QMessageBox
+)
+from keyword_matcher import parse_keyword_list
+
+class KeywordListDialog(QDialog):
+    """Collects a keyword list, pasted or imported from a text file, to highlight in one pass."""
+    def __init__(self, theme_manager, parent=None):
+        super().__init__(parent)
+        self.theme_manager = tm = theme_manager
+        self.setWindowTitle(tm.get_text("keyword_dialog_title"))
+        self.resize(420, 480)
+
+        layout = QVBoxLayout(self)
+        self.keywords_edit = QPlainTextEdit()
+        self.keywords_edit.setPlaceholderText(tm.get_text("keyword_placeholder"))
+        self.keywords_edit.textChanged.connect(self._update_count)
+
+        options_row = QHBoxLayout()
+        self.import_btn = QPushButton(tm.get_text("keyword_import_file"))
+        self.import_btn.clicked.connect(self._import_file)
+        self.match_case_check = QCheckBox(tm.get_text("keyword_match_case"))
+        self.whole_word_check = QCheckBox(tm.get_text("keyword_whole_word"))
+        self.count_label = QLabel()
+        options_row.addWidget(self.import_btn)
+        options_row.addWidget(self.match_case_check)
+        options_row.addWidget(self.whole_word_check)
+        options_row.addStretch(1)
+        options_row.addWidget(self.count_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        self.ok_button = buttons.button(QDialogButtonBox.Ok)
+
+        layout.addWidget(self.keywords_edit, 1)
+        layout.addLayout(options_row)
+        layout.addWidget(buttons)
+        self._update_count()
+
+    def _import_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, self.theme_manager.get_text("keyword_import_file"), "",
+                                              "Text Files (*.txt *.csv);;All Files (*)")
+        if not path: return
+        try:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError as e:
+            QMessageBox.warning(self, "Error", f"Could not read the keyword file.\n\nDetails: {e}")
+            return
+        self.keywords_edit.setPlainText("\n".join(parse_keyword_list(text)))
+
+    def _update_count(self):
+        count = len(self.keywords())
+        self.count_label.setText(self.theme_manager.get_text("keyword_count", count=count))
+        self.ok_button.setEnabled(count > 0)
+
+    def keywords(self) -> list[str]:
+        return parse_keyword_list(self.keywords_edit.toPlainText())
+
+    def case_sensitive(self) -> bool:
+        return self.match_case_check.isChecked()
+
+    def whole_word(self) -> bool:
+        return self.whole_word_check.isChecked()
@@ -0,0 +1,169 @@
+import os
+from PySide6.QtCore import Qt, Signal, QObject, QRunnable, QThreadPool, QTimer
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
+    QListWidget, QListWidgetItem, QLabel, QFileDialog
+)
+from library_index import LibraryIndex, LibraryHit, format_timestamp
+
+class _UpdateSignals(QObject):
+    progress = Signal(int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+class _UpdateTask(QRunnable):
+    """Re-indexes changed files on the thread pool; SQLite connections are per thread, so it opens its own."""
+    def __init__(self, db_path, file_tags, folder=None):
+        super().__init__()
+        self.signals = _UpdateSignals()
+        self._db_path = db_path
+        self._file_tags = file_tags
+        self._folder = folder
+
+    def run(self):
+        index = None
+        try:
+            index = LibraryIndex(self._db_path, self._file_tags)
+            if self._folder:
+                index.add_folder(self._folder)
+            summary = index.update(progress=self.signals.progress.emit)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        finally:
+            if index is not None: index.close()
+        self.signals.finished.emit(summary)
+
+class _SearchSignals(QObject):
+    finished = Signal(int, list)
+
+class _SearchTask(QRunnable):
+    """Runs one library search on the thread pool with its own connection."""
+    def __init__(self, db_path, file_tags, text, generation):
+        super().__init__()
+        self.signals = _SearchSignals()
+        self._db_path = db_path
+        self._file_tags = file_tags
+        self._text = text
+        self._generation = generation
+
+    def run(self):
+        index, hits = None, []
+        try:
+            index = LibraryIndex(self._db_path, self._file_tags)
+            hits = index.search(self._text)
+        except Exception:
+            # An unreadable index just finds nothing; updating it reports the actual error.
+            hits = []
+        finally:
+            if index is not None: index.close()
+        self.signals.finished.emit(self._generation, hits)
+
+class LibraryDialog(QDialog):
+    """Searches every document in the library folders; activating a hit opens it at the match."""
+    hit_activated = Signal(object)
+
+    def __init__(self, theme_manager, parent=None):
+        super().__init__(parent)
+        self.theme_manager = tm = theme_manager
+        self.setWindowTitle(tm.get_text("library_dialog_title"))
+        self.resize(700, 500)
+        self._db_path = tm.get_value("app_config.library_db", "~/.slothy-marker/library.sqlite3")
+        self._file_tags = tm.get_value("app_config.file_tags", [])
+        self._index = LibraryIndex(self._db_path, self._file_tags)
+        self._active_update = None
+        self._active_search = None
+        self._search_generation = 0
+
+        layout = QVBoxLayout(self)
+        top_row = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText(tm.get_text("library_search_placeholder"))
+        self.search_input.setClearButtonEnabled(True)
+        # Keystrokes restart the debounce timer; the search itself runs on the pool.
+        self._search_debounce = QTimer(self)
+        self._search_debounce.setSingleShot(True)
+        self._search_debounce.setInterval(tm.get_value("app_config.search_debounce_ms", 200))
+        self._search_debounce.timeout.connect(self._run_search)
+        self.search_input.textChanged.connect(self._search_debounce.start)
+        self.add_folder_btn = QPushButton(tm.get_text("library_add_folder"))
+        self.add_folder_btn.clicked.connect(self._add_folder)
+        self.update_btn = QPushButton(tm.get_text("library_update"))
+        self.update_btn.clicked.connect(lambda: self._start_update())
+        top_row.addWidget(self.search_input, 1)
+        top_row.addWidget(self.add_folder_btn)
+        top_row.addWidget(self.update_btn)
+
+        self.results_list = QListWidget()
+        self.results_list.setWordWrap(True)
+        self.results_list.itemActivated.connect(self._on_item_activated)
+        self.status_label = QLabel()
+
+        layout.addLayout(top_row)
+        layout.addWidget(self.results_list, 1)
+        layout.addWidget(self.status_label)
+        if not self._index.folders():
+            self.status_label.setText(tm.get_text("library_no_folders"))
+
+    def _add_folder(self):
+        folder = QFileDialog.getExistingDirectory(self, self.theme_manager.get_text("library_add_folder"))
+        if folder: self._start_update(folder)
+
+    def _start_update(self, folder=None):
+        if self._active_update is not None: return
+        task = _UpdateTask(self._db_path, self._file_tags, folder)
+        task.signals.progress.connect(self._on_update_progress)
+        task.signals.finished.connect(self._on_update_finished)
+        task.signals.failed.connect(self._on_update_failed)
+        self._active_update = task
+        self.add_folder_btn.setEnabled(False)
+        self.update_btn.setEnabled(False)
+        QThreadPool.globalInstance().start(task)
+
+    def _on_update_progress(self, done, total):
+        self.status_label.setText(self.theme_manager.get_text("library_updating", done=done, total=total))
+
+    def _end_update(self):
+        self._active_update = None
+        self.add_folder_btn.setEnabled(True)
+        self.update_btn.setEnabled(True)
+
+    def _on_update_finished(self, summary):
+        self._end_update()
+        self.status_label.setText(self.theme_manager.get_text("library_update_summary", **summary.__dict__))
+        self._run_search()
+
+    def _on_update_failed(self, error):
+        self._end_update()
+        self.status_label.setText(self.theme_manager.get_text("library_update_failed", error=error))
+
+    def _run_search(self):
+        self._search_debounce.stop()
+        self._search_generation += 1
+        text = self.search_input.text().strip()
+        if not text:
+            self._active_search = None
+            self.results_list.clear()
+            return
+        task = _SearchTask(self._db_path, self._file_tags, text, self._search_generation)
+        task.signals.finished.connect(self._on_search_finished)
+        self._active_search = task
+        QThreadPool.globalInstance().start(task)
+
+    def _on_search_finished(self, generation, hits):
+        # Results of a query the user has typed past are dropped.
+        if generation != self._search_generation: return
+        self._active_search = None
+        self.results_list.clear()
+        for hit in hits:
+            location = os.path.basename(hit.path)
+            if hit.start_time >= 0: location += f"  {format_timestamp(hit.start_time)}"
+            item = QListWidgetItem(f"{location}\n{' '.join(hit.snippet.split())}")
+            item.setData(Qt.UserRole, hit)
+            item.setToolTip(hit.path)
+            self.results_list.addItem(item)
+        self.status_label.setText(self.theme_manager.get_text("library_result_count", count=len(hits)))
+
+    def _on_item_activated(self, item: QListWidgetItem):
+        hit: LibraryHit = item.data(Qt.UserRole)
+        self.hit_activated.emit(hit)
@@ -1,7 +1,7 @@
 import os
 import webbrowser
 from pathlib import Path
-from PySide6.QtCore import Qt, QFileSystemWatcher
+from PySide6.QtCore import Qt, QFileSystemWatcher, QTimer
 from PySide6.QtWidgets import (
     QMainWindow, QSplitter, QFileDialog, QMessageBox, 
     QStatusBar, QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel
@@ -9,10 +9,15 @@ from PySide6.QtWidgets import (
 from PySide6.QtGui import QAction, QDragEnterEvent, QDropEvent, QCloseEvent, QResizeEvent, QShortcut, QKeySequence
 
 from app_controller import AppController
-import parser
+from render_cache import RenderCache, build_render_plan
+import tracing
 from gui.document_viewer import DocumentViewer
 from gui.highlights_panel import HighlightsPanel
 from gui.tutorial_sidebar import TutorialSidebar
+from gui.document_tabs import DocumentTabBar
+from gui.library_dialog import LibraryDialog
+from gui.keyword_dialog import KeywordListDialog
+from gui.render_worker import RenderWorker
 from utils import resource_path # <-- IMPORT THE HELPER
 
 class MainWindow(QMainWindow):
@@ -30,13 +35,23 @@ class MainWindow(QMainWindow):
         self.highlight_color = self.theme_manager.get_value("colors.highlight_bg", "rgba(243, 156, 18, 0.5)")
         self.selection_color = self.theme_manager.get_value("colors.accent_pink_selection", "#E5007E")
 
+        self._displayed_filepath = None
+        self._library_dialog = None
+        self.render_cache = RenderCache(tm.get_value("app_config.render_cache_mb", 16) * 1024 * 1024)
+        self.render_worker = RenderWorker(self)
+        self.render_worker.render_finished.connect(self._on_render_finished)
+        self._pending_active_index = None
         self.file_watcher = QFileSystemWatcher(self)
         self.file_watcher.fileChanged.connect(self._on_file_changed)
         
         self.setup_ui_structure()
+        self.doc_viewer.set_highlight_colors(self.highlight_color, self.selection_color)
         self.connect_signals()
         self.setup_menus()
         self.setStatusBar(QStatusBar(self))
+        self.trace_label = QLabel()
+        self.trace_label.setVisible(tracing.is_enabled())
+        self.statusBar().addPermanentWidget(self.trace_label)
         self.setup_shortcuts()
         self.populate_tutorials_and_load_default()
 
@@ -53,9 +68,17 @@ class MainWindow(QMainWindow):
         self.splitter = QSplitter(Qt.Horizontal)
         self.splitter.addWidget(self.doc_viewer)
         self.splitter.addWidget(self.highlights_panel)
+
+        self.document_tabs = DocumentTabBar()
+        documents_area = QWidget()
+        documents_layout = QVBoxLayout(documents_area)
+        documents_layout.setContentsMargins(0, 0, 0, 0)
+        documents_layout.setSpacing(0)
+        documents_layout.addWidget(self.document_tabs)
+        documents_layout.addWidget(self.splitter, 1)
         
         main_layout.addWidget(self.sidebar)
-        main_layout.addWidget(self.splitter, 1)
+        main_layout.addWidget(documents_area, 1)
         self.setCentralWidget(central_widget)
         
         self.drop_overlay = QWidget(self)
@@ -70,7 +93,15 @@ class MainWindow(QMainWindow):
 
     def connect_signals(self):
         self.controller.model_updated.connect(self._on_model_updated)
+        self.controller.highlights_moved.connect(self._on_highlights_moved)
+        # Deferred so the spans of the controller call that emitted the update have closed too.
+        self.controller.model_updated.connect(lambda *_: QTimer.singleShot(0, self._show_trace_summary))
         self.controller.status_message_requested.connect(self.statusBar().showMessage)
+        self.controller.workspace_changed.connect(self.document_tabs.set_documents)
+        self.controller.document_open_failed.connect(self._on_document_open_failed)
+        self.controller.document_changed_on_disk.connect(self._on_document_changed_on_disk)
+        self.document_tabs.document_selected.connect(self.controller.switch_document)
+        self.document_tabs.document_close_requested.connect(self._on_document_close_requested)
 
         self.doc_viewer.open_requested.connect(self.open_file_dialog)
         self.doc_viewer.save_and_edit_requested.connect(self.edit_file_externally)
@@ -79,13 +110,15 @@ class MainWindow(QMainWindow):
         self.doc_viewer.add_requested.connect(self.add_highlight)
         self.doc_viewer.highlight_activated_by_index.connect(self._select_highlight_in_list)
         self.doc_viewer.show_all_requested.connect(self._on_show_all_requested)
+        self.doc_viewer.show_all_dismissed.connect(self._on_show_all_dismissed)
 
         self.highlights_panel.remove_highlights_requested.connect(self.controller.remove_highlights)
         self.highlights_panel.remove_all_highlights_requested.connect(self.controller.remove_all_highlights)
+        self.highlights_panel.merge_overlapping_requested.connect(self.controller.merge_overlapping_highlights)
         self.highlights_panel.undo_requested.connect(self.controller.undo)
         self.highlights_panel.redo_requested.connect(self.controller.redo)
         self.highlights_panel.highlight_selected.connect(self._on_highlight_activated)
-        self.highlights_panel.reorder_requested.connect(self.controller.reorder_highlights)
+        self.highlights_panel.move_requested.connect(self.controller.move_highlights)
         self.highlights_panel.edit_highlight_requested.connect(self.controller.update_highlight_text)
         
         self.highlights_panel.export_panel.status_message_requested.connect(self.statusBar().showMessage)
@@ -106,19 +139,29 @@ class MainWindow(QMainWindow):
         close_action = QAction(tm.get_text("action_close"), self)
         close_action.triggered.connect(self.close_file)
         file_menu.addAction(close_action)
+        library_action = QAction(tm.get_text("action_search_library"), self)
+        library_action.setShortcut(QKeySequence.fromString("Ctrl+Shift+F"))
+        library_action.triggered.connect(self.show_library_dialog)
+        file_menu.addAction(library_action)
+        self.keyword_action = QAction(tm.get_text("action_highlight_keywords"), self)
+        self.keyword_action.triggered.connect(self.show_keyword_dialog)
+        self.keyword_action.setEnabled(False)
+        file_menu.addAction(self.keyword_action)
         file_menu.addSeparator()
         quit_action = QAction(tm.get_icon("quit"), tm.get_text("action_quit"), self)
         quit_action.triggered.connect(self.close)
         file_menu.addAction(quit_action)
 
-    def _on_model_updated(self, raw_text, highlights, document_mode, can_undo, can_redo):
+    def _is_tutorial_open(self) -> bool:
         # MODIFIED: Check if the current file is a tutorial by checking its base path
-        is_tutorial = False
-        if self.controller.current_filepath:
-             tutorial_base_path = os.path.normpath(resource_path("tutorials"))
-             file_base_path = os.path.normpath(os.path.dirname(self.controller.current_filepath))
-             is_tutorial = file_base_path == tutorial_base_path
+        if not self.controller.current_filepath: return False
+        tutorial_base_path = os.path.normpath(resource_path("tutorials"))
+        file_base_path = os.path.normpath(os.path.dirname(self.controller.current_filepath))
+        return file_base_path == tutorial_base_path
 
+    @tracing.traced("MainWindow._on_model_updated")
+    def _on_model_updated(self, raw_text, highlights, document_mode, can_undo, can_redo):
+        is_tutorial = self._is_tutorial_open()
         is_file_open = bool(self.controller.current_filepath)
         filename = os.path.basename(self.controller.current_filepath or "")
 
@@ -130,51 +173,107 @@ class MainWindow(QMainWindow):
 
         self.doc_viewer.set_button_states(is_file_open, self.controller.is_modified(), is_tutorial)
         self.highlights_panel.set_editing_enabled(is_file_open, can_undo, can_redo)
+        self.keyword_action.setEnabled(is_file_open)
+
+        if self.controller.current_filepath != self._displayed_filepath:
+            self._displayed_filepath = self.controller.current_filepath
+            self.doc_viewer.reset_view()
 
         if not is_file_open:
+            self.render_worker.cancel()
             self.doc_viewer.clear_content()
             self.highlights_panel.clear_panel()
         else:
-            self.highlights_panel.populate(highlights, filename, document_mode)
+            stats_engine = self.controller.stats_engine
+            speaker_index = self.controller.get_speaker_index() if document_mode != "simple" else None
+            self.highlights_panel.populate(self.controller.highlight_index, filename, document_mode,
+                                           stats_engine.highlight_totals, speaker_index)
             self._render_document_view(raw_text, highlights)
+            self.doc_viewer.update_stats(stats_engine.document_stats(raw_text), document_mode)
+
+    def _on_highlights_moved(self, moved, can_undo, can_redo):
+        # The list already shows the new order and the document is unchanged; only the edit state moves on.
+        self.doc_viewer.set_button_states(True, self.controller.is_modified(), self._is_tutorial_open())
+        self.highlights_panel.set_editing_enabled(True, can_undo, can_redo)
 
+    def _show_trace_summary(self):
+        summary = tracing.take_summary() if tracing.is_enabled() else None
+        if not summary: return
+        self.trace_label.setText(tracing.format_summary(summary))
+        self.trace_label.setToolTip(self.theme_manager.get_text("trace_tooltip", path=tracing.output_path()))
+
+    @tracing.traced("MainWindow._render_document_view")
     def _render_document_view(self, raw_text, highlights):
         # Get all selected highlights from the list widget
         selected_list_items = self.highlights_panel.list_widget.selectedItems()
-        selected_highlights = [item.data(Qt.UserRole) for item in selected_list_items]
+        selected_ids = {id(item.data(Qt.UserRole)) for item in selected_list_items}
 
-        # Jump to the text of the "current" (last clicked) item for navigation
+        # The "current" (last clicked) item is the one navigated to
+        active_id = None
         current_row = self.highlights_panel.list_widget.currentRow()
-        if current_row != -1:
-             sorted_highlights = self.highlights_panel.get_sorted_highlights()
-             if 0 <= current_row < len(sorted_highlights):
-                active_highlight = sorted_highlights[current_row]
-                self.doc_viewer.jump_to_text(active_highlight.text.replace('\n', ' '))
-        
-        rendered_html = parser.render_document_with_highlights(raw_text, highlights, selected_highlights, self.highlight_color, self.selection_color)
-        self.doc_viewer.set_content(rendered_html, raw_text, self.controller.document_mode)
-        
+        sorted_highlights = self.highlights_panel.get_sorted_highlights()
+        if 0 <= current_row < len(sorted_highlights):
+            active_id = id(sorted_highlights[current_row])
+
+        selected_indexes, active_index = set(), None
+        for i, h in enumerate(highlights):
+            if id(h) in selected_ids: selected_indexes.add(i)
+            if id(h) == active_id: active_index = i
+
+        self.doc_viewer.set_search_index(self.controller.get_search_index())
+        version = self.controller.current_snapshot()
+        plan = self.render_cache.lookup(version, selected_indexes)
+        if plan is None and version is not None and version[0] == raw_text:
+            # Resolving the ranges is the slow part; the text is shown now and the
+            # formats follow from the worker. Snapshot highlights are never mutated.
+            self._pending_active_index = active_index
+            self.render_worker.submit(version, raw_text, version[1], selected_indexes)
+            self.doc_viewer.set_pending_content(raw_text)
+            self._apply_temporary_highlights()
+            return
+
+        self.render_worker.cancel()
+        self._show_render_plan(raw_text, plan or build_render_plan(raw_text, highlights, selected_indexes), active_index)
+
+    @tracing.traced("MainWindow._on_render_finished")
+    def _on_render_finished(self, generation, version, plan):
+        if not self.render_worker.is_current(generation): return
+        self.render_cache.put(version, plan)
+        self._show_render_plan(version[0], plan, self._pending_active_index)
+
+    def _show_render_plan(self, raw_text, plan, active_index):
+        self.doc_viewer.set_content(raw_text, plan)
+        if active_index is not None:
+            self.doc_viewer.jump_to_highlight(active_index)
+        self._apply_temporary_highlights()
+
+    def _apply_temporary_highlights(self):
         # Re-apply temporary highlights if a search term is active
-        if self.controller.last_shown_search_term:
-            self.doc_viewer.apply_temporary_highlights(self.controller.last_shown_search_term)
+        if self.controller.last_shown_search:
+            self.doc_viewer.apply_temporary_highlights(self.controller.last_shown_search)
+
+    def _on_show_all_requested(self, search):
+        self.controller.last_shown_search = search
+        self.doc_viewer.apply_temporary_highlights(search)
 
-    def _on_show_all_requested(self, search_term: str):
-        self.controller.last_shown_search_term = search_term
-        self.doc_viewer.apply_temporary_highlights(search_term)
+    def _on_show_all_dismissed(self):
+        self.controller.last_shown_search = None
 
     def add_highlight(self):
         # If a "Show All" search is active, highlight all those terms.
-        if self.controller.last_shown_search_term:
-            search_term = self.controller.last_shown_search_term
-            self.controller.last_shown_search_term = None
+        if self.controller.last_shown_search:
+            search = self.controller.last_shown_search
+            self.controller.last_shown_search = None
             self.doc_viewer.clear_temporary_highlights()
-            self.controller.highlight_all_occurrences(search_term)
+            self.controller.highlight_all_occurrences(search)
         # Otherwise, highlight the current user selection.
         else:
-            selected_text = self.doc_viewer.get_selected_text()
-            if selected_text:
-                cursor = self.doc_viewer.text_browser.textCursor()
-                self.controller.add_highlight(selected_text, cursor.selectionStart(), "")
+            # Offsets come through the viewer's position map, so the text is cut from raw_text
+            # exactly rather than taken from Qt's selection (UTF-16, paragraph separators, stripped).
+            start, end = self.doc_viewer.get_selection_range()
+            selected_text = self.controller.raw_text[start:end]
+            if selected_text.strip():
+                self.controller.add_highlight(selected_text, start)
 
     def edit_file_externally(self):
         title = self.theme_manager.get_text("dialog_edit_file_title")
@@ -191,13 +290,71 @@ class MainWindow(QMainWindow):
                 QMessageBox.warning(self, "Error", f"Could not open file in external editor.\n\nDetails: {e}")
 
     def open_file_dialog(self):
-        if not self._prompt_to_save(): return
-        filepath, _ = QFileDialog.getOpenFileName(self, "Open Document", "", "All Supported Files (*.txt *.md *.docx *.pdf)")
-        if filepath:
+        filepaths, _ = QFileDialog.getOpenFileNames(self, "Open Document", "", "All Supported Files (*.txt *.md *.docx *.pdf)")
+        self._open_files(filepaths)
+
+    def _open_files(self, filepaths: list[str]):
+        # Opening adds to the workspace rather than replacing the current document, so nothing needs saving first.
+        if len(filepaths) == 1 and not self.controller.workspace.is_open(filepaths[0]):
+            self._process_file_with_controller(filepaths[0])
+            return
+        self.controller.open_documents(filepaths)
+        for filepath in filepaths:
+            self._watch_file(filepath)
+
+    def show_library_dialog(self):
+        if self._library_dialog is None:
+            self._library_dialog = LibraryDialog(self.theme_manager, self)
+            self._library_dialog.hit_activated.connect(self._open_library_hit)
+        self._library_dialog.show()
+        self._library_dialog.raise_()
+        self._library_dialog.activateWindow()
+
+    def show_keyword_dialog(self):
+        if not self.controller.current_filepath: return
+        dialog = KeywordListDialog(self.theme_manager, self)
+        if dialog.exec() == KeywordListDialog.Accepted:
+            self.controller.highlight_keywords(dialog.keywords(), dialog.case_sensitive(), dialog.whole_word())
+
+    def _open_library_hit(self, hit):
+        if self.controller.workspace.is_open(hit.path):
+            self.controller.switch_document(hit.path)
+        else:
+            self._process_file_with_controller(hit.path)
+        if self.controller.current_filepath != hit.path: return
+        offset = min(hit.offset, len(self.controller.raw_text))
+        self.doc_viewer.select_range(offset, min(offset + hit.length, len(self.controller.raw_text)))
+
+    def _watch_file(self, filepath: str):
+        tutorial_base_path = os.path.normpath(resource_path("tutorials"))
+        file_base_path = os.path.normpath(os.path.dirname(filepath))
+        if file_base_path != tutorial_base_path and filepath not in self.file_watcher.files():
+            self.file_watcher.addPath(filepath)
+
+    def _on_document_open_failed(self, filepath: str, error: str):
+        QMessageBox.critical(self, "Error Processing File", f"Could not process '{os.path.basename(filepath)}'.\n\nDetails: {error}")
+
+    def _on_document_changed_on_disk(self, filepath: str):
+        self.controller.forget_disk_change(filepath)
+        title = self.theme_manager.get_text("dialog_reload_changed_title")
+        text = self.theme_manager.get_text("dialog_reload_changed_text", filename=os.path.basename(filepath))
+        if QMessageBox.question(self, title, text, QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes:
             self._process_file_with_controller(filepath)
 
+    def _on_document_close_requested(self, filepath: str):
+        # Closing decides about its unsaved edits anyway, so don't ask about reloading first.
+        self.controller.forget_disk_change(filepath)
+        self.controller.switch_document(filepath)
+        self.close_file()
+
     def save_file(self, with_header=False) -> str | None:
         if not self.controller.current_filepath: return None
+        if not with_header and self.controller.uses_highlight_store():
+            # The source stays untouched; the store brings the highlights back when it is reopened.
+            if not self.controller.save_to_highlight_store(): return None
+            filename = os.path.basename(self.controller.current_filepath)
+            self.statusBar().showMessage(self.theme_manager.get_text("status_saved_to_store", filename=filename), 3000)
+            return self.controller.current_filepath
         
         content = self.controller.get_content_for_saving(include_header=with_header)
         default_filename = os.path.splitext(os.path.basename(self.controller.current_filepath))[0] + "_edited.txt"
@@ -218,7 +375,7 @@ class MainWindow(QMainWindow):
     def close_file(self):
         if not self._prompt_to_save(): return
         current_file = self.controller.current_filepath
-        if current_file and self.file_watcher.files():
+        if current_file and current_file in self.file_watcher.files():
             self.file_watcher.removePath(current_file)
         self.controller.close_file()
         self.doc_viewer.clear_temporary_highlights()
@@ -226,16 +383,8 @@ class MainWindow(QMainWindow):
     def _process_file_with_controller(self, filepath):
         QApplication.setOverrideCursor(Qt.WaitCursor)
         try:
-            if self.file_watcher.files():
-                self.file_watcher.removePaths(self.file_watcher.files())
-            
             self.controller.process_file(filepath)
-            
-            # MODIFIED: Check if the file is a tutorial before adding to watcher
-            tutorial_base_path = os.path.normpath(resource_path("tutorials"))
-            file_base_path = os.path.normpath(os.path.dirname(filepath))
-            if file_base_path != tutorial_base_path:
-                self.file_watcher.addPath(filepath)
+            self._watch_file(filepath)
                 
         except ValueError as e:
             QMessageBox.critical(self, "Error Processing File", f"Could not process the file.\n\nDetails: {e}")
@@ -246,6 +395,8 @@ class MainWindow(QMainWindow):
         if path == self.controller.current_filepath:
             self.statusBar().showMessage(self.theme_manager.get_text("status_file_reloaded"), 5000)
             self._process_file_with_controller(path)
+        elif self.controller.workspace.is_open(path):
+            self.controller.reload_in_background(path)
 
     def populate_tutorials_and_load_default(self):
         # MODIFIED: Use resource_path to locate the tutorials directory.
@@ -274,8 +425,10 @@ class MainWindow(QMainWindow):
             self.controller.close_file()
             
     def _on_tutorial_requested(self, filepath: str):
-        if not self._prompt_to_save(): return
-        if os.path.exists(filepath):
+        if not os.path.exists(filepath): return
+        if self.controller.workspace.is_open(filepath):
+            self.controller.switch_document(filepath)
+        else:
             self._process_file_with_controller(filepath)
 
     def _on_license_requested(self):
@@ -319,15 +472,19 @@ class MainWindow(QMainWindow):
         return reply != QMessageBox.Cancel
 
     def closeEvent(self, event: QCloseEvent):
-        if self._prompt_to_save(): event.accept()
-        else: event.ignore()
+        # Every open document with unsaved changes gets its own prompt.
+        for filepath in self.controller.modified_documents():
+            self.controller.switch_document(filepath)
+            if not self._prompt_to_save():
+                event.ignore()
+                return
+        event.accept()
 
     def dropEvent(self, event: QDropEvent):
         self.drop_overlay.hide()
         if event.mimeData().hasUrls():
-            if not self._prompt_to_save(): return
-            filepath = event.mimeData().urls()[0].toLocalFile()
-            self._process_file_with_controller(filepath)
+            filepaths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+            self._open_files(filepaths)
             
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls(): self.drop_overlay.show(); event.acceptProposedAction()
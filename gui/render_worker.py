@@ -0,0 +1,43 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from render_cache import build_render_plan
+
+class _RenderTask(QRunnable):
+    def __init__(self, worker, generation, version, raw_text, highlights, selected_indexes):
+        super().__init__()
+        self._worker = worker
+        self._generation = generation
+        self._version = version
+        self._raw_text = raw_text
+        self._highlights = highlights
+        self._selected_indexes = selected_indexes
+
+    def run(self):
+        # A newer render was requested while this one waited in the pool.
+        if not self._worker.is_current(self._generation): return
+        plan = build_render_plan(self._raw_text, self._highlights, self._selected_indexes)
+        self._worker.render_finished.emit(self._generation, self._version, plan)
+
+class RenderWorker(QObject):
+    """
+    Builds render plans on the global thread pool. Each submit supersedes the
+    previous one, so only the newest document state is ever applied.
+
+    The highlights handed over must not be mutated while the task runs; the
+    controller's history snapshots satisfy that.
+    """
+    render_finished = Signal(int, object, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+
+    def submit(self, version, raw_text: str, highlights: list, selected_indexes) -> int:
+        self.generation += 1
+        QThreadPool.globalInstance().start(_RenderTask(self, self.generation, version, raw_text, highlights, selected_indexes))
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.generation
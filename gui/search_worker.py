@@ -0,0 +1,43 @@
+import re
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+from search_index import SearchCancelled
+
+class _SearchTask(QRunnable):
+    def __init__(self, worker, generation, search_index, query):
+        super().__init__()
+        self._worker = worker
+        self._generation = generation
+        self._search_index = search_index
+        self._query = query
+
+    def run(self):
+        is_stale = lambda: self._worker.generation != self._generation
+        if is_stale(): return
+        try:
+            ranges = self._search_index.search(self._query, should_cancel=is_stale)
+        except SearchCancelled:
+            return
+        except re.error as e:
+            self._worker.search_failed.emit(self._generation, str(e))
+            return
+        self._worker.search_finished.emit(self._generation, self._search_index, self._query, ranges)
+
+class SearchWorker(QObject):
+    """Runs document searches on the global thread pool; submitting a new query cancels the previous one."""
+    search_finished = Signal(int, object, object, list)
+    search_failed = Signal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+
+    def submit(self, search_index, query) -> int:
+        self.generation += 1
+        QThreadPool.globalInstance().start(_SearchTask(self, self.generation, search_index, query))
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def is_current(self, generation: int) -> bool:
+        return generation == self.generation
@@ -3,12 +3,20 @@ from PySide6.QtWidgets import QTextBrowser, QListWidget, QListWidgetItem, QMenu,
 from PySide6.QtGui import QAction, QColor, QBrush
 
 class ContextMenuTextBrowser(QTextBrowser):
+    position_clicked = Signal(int)
+
     def __init__(self, theme_manager, parent=None):
         super().__init__(parent)
         self.theme_manager = theme_manager
         self.setContextMenuPolicy(Qt.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
 
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        # A plain click (no drag selection) is hit-tested against highlight ranges by the viewer.
+        if event.button() == Qt.LeftButton and not self.textCursor().hasSelection():
+            self.position_clicked.emit(self.cursorForPosition(event.position().toPoint()).position())
+
     def show_context_menu(self, pos):
         menu = QMenu(self)
         copy_action = QAction(self.theme_manager.get_text("context_menu_copy"), self)
@@ -19,13 +27,14 @@ class ContextMenuTextBrowser(QTextBrowser):
 
 
 class HighlightListWidget(QListWidget):
-    reorder_requested = Signal(list)
+    rows_reordered = Signal(list, list) # new order as old row numbers, new rows of the moved items
     edit_requested = Signal(object, str)
 
     def __init__(self, theme_manager, parent=None):
         super().__init__(parent)
         self.theme_manager = theme_manager
         self._is_simple_mode = True
+        self._in_drop = False
         
         self.setWordWrap(True)
         self.setAcceptDrops(True)
@@ -57,10 +66,32 @@ class HighlightListWidget(QListWidget):
         new_text = item.text()
         self.edit_requested.emit(original_highlight, new_text)
 
+    def dropEvent(self, event):
+        # Dropping a multi-selection moves its items one rowsMoved at a time; report the whole drop once.
+        if not self._is_simple_mode:
+            super().dropEvent(event)
+            return
+        before = {id(self.item(i).data(Qt.UserRole)): i for i in range(self.count())}
+        dragged = {id(item.data(Qt.UserRole)) for item in self.selectedItems()}
+        self._in_drop = True
+        try:
+            super().dropEvent(event)
+        finally:
+            self._in_drop = False
+        after = [id(self.item(i).data(Qt.UserRole)) for i in range(self.count())]
+        order = [before[key] for key in after]
+        if order != list(range(len(order))):
+            moved_rows = [row for row, key in enumerate(after) if key in dragged]
+            self.rows_reordered.emit(order, moved_rows or [row for row, old in enumerate(order) if old != row])
+
     def _on_rows_moved(self, parent, start, end, dest, row):
-        if not self._is_simple_mode: return
-        new_order_highlights = [self.item(i).data(Qt.UserRole) for i in range(self.count())]
-        self.reorder_requested.emit(new_order_highlights)
+        if not self._is_simple_mode or self._in_drop: return
+        count = end - start + 1
+        # row is the insertion point before the move; rows above it shifted up once the block left.
+        destination = row - count if row > start else row
+        order = [i for i in range(self.count()) if not start <= i <= end]
+        order[destination:destination] = range(start, end + 1)
+        self.rows_reordered.emit(order, list(range(destination, destination + count)))
         
     def _show_context_menu(self, pos):
         item = self.itemAt(pos)
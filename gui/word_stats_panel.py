@@ -48,12 +48,11 @@ class WordStatsPanel(QWidget):
         sep.setFrameShadow(QFrame.Sunken)
         return sep
 
-    def update_stats(self, text: str):
-        if not text or not text.strip():
+    def update_stats(self, word_count: int):
+        if not word_count:
             self.clear()
             return
 
-        word_count = len(text.split())
         self.words_label.setText(self.theme_manager.get_text("stats_panel.words", count=word_count))
         self.time90_label.setText(self.theme_manager.get_text("stats_panel.wpm_rate", wpm=90, duration=_format_seconds((word_count / 90.0) * 60)))
         self.time130_label.setText(self.theme_manager.get_text("stats_panel.wpm_rate", wpm=130, duration=_format_seconds((word_count / 130.0) * 60)))
@@ -0,0 +1,219 @@
+import sys
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from parser import Highlight
+
+class IntervalTree:
+    """
+    Static half-open intervals sorted by start, with a tree of maximum ends
+    over them (an implicit segment tree, leaves in sorted order).
+
+    A query bisects on start for the intervals that begin early enough, then
+    walks down only into subtrees whose maximum end reaches past the query, so
+    it costs O((k + 1) log n) for k hits however long the longest interval is.
+    Queries return positions into the sorted interval list, in that order.
+    """
+    def __init__(self, starts: list[int], ends: list[int]):
+        self._starts = starts
+        size = 1
+        while size < len(starts): size *= 2
+        self._size = size
+        max_end = [-1] * size + ends + [-1] * (size - len(ends))
+        for node in range(size - 1, 0, -1):
+            left, right = max_end[2 * node], max_end[2 * node + 1]
+            max_end[node] = left if left > right else right
+        self._max_end = max_end
+
+    def __len__(self):
+        return len(self._starts)
+
+    def estimated_size(self) -> int:
+        return sys.getsizeof(self._starts) + sys.getsizeof(self._max_end)
+
+    def overlapping(self, start: int, end: int) -> list[int]:
+        """Positions of the intervals overlapping [start, end)."""
+        return self._ending_after(bisect_left(self._starts, end), start)
+
+    def stabbing(self, offset: int) -> list[int]:
+        """Positions of the intervals containing offset."""
+        return self._ending_after(bisect_right(self._starts, offset), offset)
+
+    def _ending_after(self, limit: int, bound: int) -> list[int]:
+        # Positions below limit whose end is past bound, found by pruning subtrees that end too early.
+        hits, max_end, size = [], self._max_end, self._size
+        stack = [(1, 0, size)] if limit > 0 else []
+        while stack:
+            node, first, width = stack.pop()
+            if first >= limit or max_end[node] <= bound: continue
+            if node >= size:
+                hits.append(first)
+                continue
+            half = width // 2
+            stack.append((2 * node + 1, first + half, half))
+            stack.append((2 * node, first, half))
+        return hits
+
+class HighlightIndex:
+    """
+    Highlights kept sorted by position, by time and by user order (sort_key).
+
+    Each highlight's casefolded display_text is kept too, for filtering lists.
+    The position order is keyed by (start, end), so duplicate checks are a
+    bisect and overlapping chains fall out of one sweep over it; overlap and
+    point queries go through an IntervalTree over it, rebuilt on the first
+    query after a change. Every order is updated by insort per added, removed
+    or edited highlight, like StatsEngine; ties keep the order highlights were
+    added in.
+    """
+    def __init__(self):
+        self._keys: list[tuple[int, int, int, int]] = [] # (start_pos, end, seq, id(h)), sorted
+        self._time_keys: list[tuple[float, int, int]] = [] # (start_time, seq, id(h)) of timed highlights
+        self._order_keys: list[tuple[float, int, int]] = [] # (sort_key, seq, id(h))
+        self._entries: dict[int, tuple] = {} # id(h) -> (h, seq, key, time key or None, order key)
+        self._folded: dict[int, str] = {} # id(h) -> casefolded display_text
+        self._seq = count()
+        self._views: dict[str, list[Highlight]] = {}
+        self._tree: IntervalTree | None = None
+
+    @staticmethod
+    def _key(h: Highlight, seq: int) -> tuple[int, int, int, int]:
+        return (h.start_pos, h.start_pos + len(h.text), seq, id(h))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def reset(self, highlights: list[Highlight]):
+        self._seq = count()
+        self._entries = {}
+        for h in highlights:
+            seq = next(self._seq)
+            time_key = (h.start_time, seq, id(h)) if h.start_time >= 0 else None
+            self._entries[id(h)] = (h, seq, self._key(h, seq), time_key, (h.sort_key, seq, id(h)))
+        entries = self._entries.values()
+        self._keys = sorted(entry[2] for entry in entries)
+        self._time_keys = sorted(entry[3] for entry in entries if entry[3] is not None)
+        self._order_keys = sorted(entry[4] for entry in entries)
+        self._folded = {id(h): h.display_text.casefold() for h in highlights}
+        self._views, self._tree = {}, None
+
+    def highlight_added(self, h: Highlight):
+        seq = next(self._seq)
+        key, order_key = self._key(h, seq), (h.sort_key, seq, id(h))
+        time_key = (h.start_time, seq, id(h)) if h.start_time >= 0 else None
+        self._entries[id(h)] = (h, seq, key, time_key, order_key)
+        insort(self._keys, key)
+        if time_key is not None: insort(self._time_keys, time_key)
+        insort(self._order_keys, order_key)
+        self._folded[id(h)] = h.display_text.casefold()
+        self._views, self._tree = {}, None
+
+    def highlight_removed(self, h: Highlight):
+        entry = self._entries.pop(id(h), None)
+        if entry is None: return
+        _, _, key, time_key, order_key = entry
+        del self._keys[bisect_left(self._keys, key)]
+        if time_key is not None: del self._time_keys[bisect_left(self._time_keys, time_key)]
+        del self._order_keys[bisect_left(self._order_keys, order_key)]
+        del self._folded[id(h)]
+        self._views, self._tree = {}, None
+
+    def highlight_changed(self, h: Highlight):
+        """Re-keys a highlight after its text or start_pos changed; it keeps its place among ties."""
+        entry = self._entries[id(h)]
+        del self._keys[bisect_left(self._keys, entry[2])]
+        key = self._key(h, entry[1])
+        insort(self._keys, key)
+        self._entries[id(h)] = (h, entry[1], key, entry[3], entry[4])
+        self._folded[id(h)] = h.display_text.casefold()
+        self._views, self._tree = {}, None
+
+    def order_changed(self, highlights: list[Highlight]):
+        """Re-keys the user order after the sort_key of these highlights changed."""
+        if len(highlights) > len(self._order_keys) // 8:
+            for h in highlights:
+                _, seq, key, time_key, _ = self._entries[id(h)]
+                self._entries[id(h)] = (h, seq, key, time_key, (h.sort_key, seq, id(h)))
+            self._order_keys = sorted(entry[4] for entry in self._entries.values())
+        else:
+            for h in highlights:
+                _, seq, key, time_key, order_key = self._entries[id(h)]
+                del self._order_keys[bisect_left(self._order_keys, order_key)]
+                order_key = (h.sort_key, seq, id(h))
+                insort(self._order_keys, order_key)
+                self._entries[id(h)] = (h, seq, key, time_key, order_key)
+        self._views = {}
+
+    def _view(self, name: str, keys: list) -> list[Highlight]:
+        # Materialized once per change; callers must not mutate the returned list.
+        view = self._views.get(name)
+        if view is None:
+            view = self._views[name] = [self._entries[key[-1]][0] for key in keys]
+        return view
+
+    def by_position(self) -> list[Highlight]:
+        return self._view("position", self._keys)
+
+    def by_time(self) -> list[Highlight]:
+        """Highlights with a timestamp, chronologically."""
+        return self._view("time", self._time_keys)
+
+    def by_user_order(self) -> list[Highlight]:
+        return self._view("user order", self._order_keys)
+
+    def folded_texts(self, highlights: list[Highlight]) -> list[str]:
+        """The casefolded display_text of each of these indexed highlights."""
+        folded = self._folded
+        return [folded[id(h)] for h in highlights]
+
+    def contains(self, start: int, text: str) -> bool:
+        """Whether a highlight of exactly this text already starts at start."""
+        end = start + len(text)
+        i = bisect_left(self._keys, (start, end))
+        while i < len(self._keys) and self._keys[i][:2] == (start, end):
+            if self._entries[self._keys[i][3]][0].text == text: return True
+            i += 1
+        return False
+
+    def _interval_tree(self) -> IntervalTree:
+        if self._tree is None:
+            self._tree = IntervalTree([key[0] for key in self._keys], [key[1] for key in self._keys])
+        return self._tree
+
+    def overlapping(self, start: int, end: int) -> list[Highlight]:
+        """Highlights overlapping [start, end), ordered by position."""
+        keys, entries = self._keys, self._entries
+        return [entries[keys[i][3]][0] for i in self._interval_tree().overlapping(start, end)]
+
+    def covering(self, offset: int) -> list[Highlight]:
+        """Highlights containing the character at offset, ordered by position."""
+        keys, entries = self._keys, self._entries
+        return [entries[keys[i][3]][0] for i in self._interval_tree().stabbing(offset)]
+
+    def overlap_groups(self) -> list[list[Highlight]]:
+        """Chains of highlights that overlap one another (merely touching doesn't count), by position."""
+        groups, group_end = [], None
+        for start, end, _, key_id in self._keys:
+            h = self._entries[key_id][0]
+            if group_end is not None and start < group_end:
+                groups[-1].append(h)
+                group_end = max(group_end, end)
+            else:
+                groups.append([h])
+                group_end = end
+        return [group for group in groups if len(group) > 1]
+
+    def shift_after(self, offset: int, delta: int) -> list[Highlight]:
+        """Moves every highlight starting after offset by delta; returns the moved highlights."""
+        i = bisect_left(self._keys, (offset + 1,))
+        moved = []
+        for start, end, seq, key_id in self._keys[i:]:
+            key = (start + delta, end + delta, seq, key_id)
+            h, _, _, time_key, order_key = self._entries[key_id]
+            h.start_pos += delta
+            self._entries[key_id] = (h, seq, key, time_key, order_key)
+            moved.append(key)
+        self._keys[i:] = moved
+        # A shrinking edit can move a highlight that started inside it in front of its neighbours.
+        if i and moved and self._keys[i - 1] > moved[0]: self._keys.sort()
+        self._views, self._tree = {}, None
+        return [self._entries[key[3]][0] for key in moved]
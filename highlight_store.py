@@ -0,0 +1,140 @@
+import os
+import hashlib
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from parser import Highlight
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    content_hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    edited_text TEXT
+);
+CREATE TABLE IF NOT EXISTS highlights (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL REFERENCES documents(content_hash),
+    text TEXT NOT NULL,
+    start_pos INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    display_text TEXT NOT NULL,
+    sort_key REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS highlights_document ON highlights(content_hash);
+"""
+
+def content_hash(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _row(h: Highlight) -> tuple:
+    return (h.text, h.start_pos, h.start_time, h.end_time, h.display_text, h.sort_key)
+
+@dataclass
+class _Synced:
+    """What the database holds for one document, so a sync only writes the difference."""
+    source_text: str
+    text: str
+    rows: dict = field(default_factory=dict) # row tuple -> list of row ids
+
+class HighlightStore:
+    """
+    Sidecar database of highlights, keyed by a hash of the source file's bytes,
+    so highlights survive for formats that can't be written back (PDF, DOCX).
+
+    sync() is called when the user saves; it diffs against what was last
+    written and commits only the changed rows in one transaction. Only the GUI thread reads and
+    writes; has() is safe from any thread so parse workers can skip
+    extracting annotations the store already holds.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = os.path.expanduser(db_path)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._known = {row[0] for row in self._conn.execute("SELECT content_hash FROM documents")}
+        self._known_lock = threading.Lock()
+        self._synced: dict[str, _Synced] = {}
+
+    def close(self):
+        self._conn.close()
+
+    def has(self, key: str) -> bool:
+        with self._known_lock:
+            return key in self._known
+
+    def load(self, key: str, source_text: str) -> tuple[str, list[Highlight]]:
+        """Returns the stored text (the source text unless highlights were edited) and highlights."""
+        row = self._conn.execute("SELECT edited_text FROM documents WHERE content_hash = ?", (key,)).fetchone()
+        text = row[0] if row and row[0] is not None else source_text
+        synced = _Synced(source_text, text)
+        highlights = []
+        for row_id, *values in self._conn.execute(
+                "SELECT id, text, start_pos, start_time, end_time, display_text, sort_key FROM highlights "
+                "WHERE content_hash = ? ORDER BY id", (key,)):
+            highlights.append(Highlight(*values))
+            synced.rows.setdefault(tuple(values), []).append(row_id)
+        self._synced[key] = synced
+        return text, highlights
+
+    def create(self, key: str, path: str, source_text: str, highlights: list[Highlight]):
+        """Records a document seen for the first time, with the highlights parsed from it."""
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO documents(content_hash, path, edited_text) VALUES (?, ?, NULL)", (key, path))
+            self._conn.execute("DELETE FROM highlights WHERE content_hash = ?", (key,))
+            synced = _Synced(source_text, source_text)
+            self._insert_rows(key, synced, [_row(h) for h in highlights])
+        self._synced[key] = synced
+        with self._known_lock:
+            self._known.add(key)
+
+    def sync(self, key: str, highlights: list[Highlight], text: str) -> int:
+        """Writes only what changed since the last sync; returns the number of rows touched."""
+        synced = self._synced.get(key)
+        if synced is None: return 0
+
+        wanted = {}
+        for h in highlights:
+            row = _row(h)
+            wanted[row] = wanted.get(row, 0) + 1
+        stale_ids = []
+        for row, ids in synced.rows.items():
+            surplus = len(ids) - wanted.get(row, 0)
+            if surplus > 0: stale_ids.extend(ids[-surplus:])
+        new_rows = []
+        for row, count in wanted.items():
+            missing = count - len(synced.rows.get(row, ()))
+            if missing > 0: new_rows.extend([row] * missing)
+        text_changed = text is not synced.text and text != synced.text
+        if not stale_ids and not new_rows and not text_changed: return 0
+
+        with self._conn:
+            if stale_ids:
+                self._conn.executemany("DELETE FROM highlights WHERE id = ?", [(i,) for i in stale_ids])
+                stale = set(stale_ids)
+                for row in list(synced.rows):
+                    ids = [i for i in synced.rows[row] if i not in stale]
+                    if ids: synced.rows[row] = ids
+                    else: del synced.rows[row]
+            self._insert_rows(key, synced, new_rows)
+            if text_changed:
+                edited = None if text == synced.source_text else text
+                self._conn.execute("UPDATE documents SET edited_text = ? WHERE content_hash = ?", (edited, key))
+        synced.text = text
+        return len(stale_ids) + len(new_rows) + text_changed
+
+    def forget(self, key: str):
+        """Drops the in-memory copy of a closed document; its rows stay in the database."""
+        self._synced.pop(key, None)
+
+    def _insert_rows(self, key: str, synced: _Synced, rows: list[tuple]):
+        for row in rows:
+            cursor = self._conn.execute(
+                "INSERT INTO highlights(content_hash, text, start_pos, start_time, end_time, display_text, sort_key) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", (key, *row))
+            synced.rows.setdefault(row, []).append(cursor.lastrowid)
@@ -0,0 +1,70 @@
+def parse_keyword_list(text: str) -> list[str]:
+    """Splits a pasted or imported keyword list, one keyword per line, dropping blanks and repeats."""
+    keywords = (k.strip() for k in text.lstrip('\ufeff').splitlines())
+    return list(dict.fromkeys(k for k in keywords if k))
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a keyword list: one pass over a text finds every
+    occurrence of every keyword, however many keywords there are.
+
+    The automaton is built as a full DFA (each state's transitions include those
+    inherited through its failure links), so the scan costs one dict lookup per
+    character. Without case_sensitive, keywords are casefolded and the scan must
+    run over casefolded text (see SearchIndex.keyword_ranges).
+    """
+    def __init__(self, keywords: list[str], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        folded = keywords if case_sensitive else [k.casefold() for k in keywords]
+        self.keywords = list(dict.fromkeys(k for k in folded if k))
+        transitions = [{}]
+        lengths = [()] # keyword lengths ending at each state, through its failure links too
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword:
+                next_state = transitions[state].get(ch)
+                if next_state is None:
+                    next_state = len(transitions)
+                    transitions[state][ch] = next_state
+                    transitions.append({})
+                    lengths.append(())
+                state = next_state
+            lengths[state] = (len(keyword),)
+
+        # Breadth-first, so a state's failure target is complete before the state itself.
+        # Depth-one states fail to the root, whose transitions are just its children.
+        children = [dict(t) for t in transitions]
+        fail = [0] * len(transitions)
+        queue = list(children[0].values())
+        for state in queue:
+            transitions[state] = {**transitions[fail[state]], **children[state]}
+            lengths[state] = lengths[state] + lengths[fail[state]]
+            for ch, child in children[state].items():
+                fail[child] = transitions[fail[state]].get(ch, 0)
+                queue.append(child)
+        self._transitions = transitions
+        self._lengths = lengths
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def find_all(self, text: str) -> list[tuple[int, int]]:
+        """Every (start, end) occurrence of every keyword in text, overlapping ones included, by end."""
+        transitions, lengths = self._transitions, self._lengths
+        matches = []
+        state = 0
+        for i, ch in enumerate(text):
+            state = transitions[state].get(ch, 0)
+            if lengths[state]:
+                end = i + 1
+                matches.extend((end - length, end) for length in lengths[state])
+        return matches
+
+def leftmost_longest(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Keeps non-overlapping ranges, preferring the earliest start and then the longest match."""
+    kept, covered_to = [], -1
+    for start, end in sorted(ranges, key=lambda r: (r[0], -r[1])):
+        if start >= covered_to:
+            kept.append((start, end))
+            covered_to = end
+    return kept
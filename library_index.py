@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import sqlite3
+import argparse
+from dataclasses import dataclass
+
+import parser
+from transcript_parser import process_new_highlight
+
+SUPPORTED_EXTENSIONS = ('.txt', '.md', '.docx', '.pdf')
+# Transcript hits take their timestamp from the lines just before the match.
+TIMESTAMP_LOOKBACK_CHARS = 4096
+DEFAULT_DB_PATH = os.path.join("~", ".slothy-marker", "library.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (path TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime REAL NOT NULL,
+    mode TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS highlights (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    start_pos INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    start_time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS highlights_document ON highlights(document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS document_text USING fts5(body);
+CREATE VIRTUAL TABLE IF NOT EXISTS highlight_text USING fts5(body);
+"""
+
+@dataclass(frozen=True)
+class LibraryHit:
+    path: str
+    kind: str # "highlight" or "document"
+    offset: int
+    length: int
+    start_time: float
+    snippet: str
+
+@dataclass
+class UpdateSummary:
+    indexed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    failed: int = 0
+
+def _fts_query(text: str) -> str:
+    # Every word becomes a quoted term, so user input can never be read as FTS5 syntax.
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+class LibraryIndex:
+    """
+    Local full-text index over a library of highlighted documents, stored in
+    SQLite FTS5. Documents are re-parsed only when their mtime changes, and
+    each document is written in its own transaction.
+    """
+    def __init__(self, db_path: str, file_tags: list):
+        self.db_path = os.path.expanduser(db_path)
+        self.file_tags = file_tags
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def folders(self) -> list[str]:
+        return [row[0] for row in self._conn.execute("SELECT path FROM folders ORDER BY path")]
+
+    def add_folder(self, folder: str):
+        with self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO folders(path) VALUES (?)", (os.path.abspath(folder),))
+
+    def remove_folder(self, folder: str):
+        folder = os.path.abspath(folder)
+        with self._conn:
+            self._conn.execute("DELETE FROM folders WHERE path = ?", (folder,))
+        for path in self._indexed_paths(folder):
+            self._remove_document(path)
+
+    def update(self, progress=None) -> UpdateSummary:
+        """Brings every library folder up to date; progress(done, total) is called per file."""
+        summary = UpdateSummary()
+        for folder in self.folders():
+            self.update_folder(folder, summary, progress)
+        return summary
+
+    def update_folder(self, folder: str, summary: UpdateSummary | None = None, progress=None) -> UpdateSummary:
+        summary = summary or UpdateSummary()
+        folder = os.path.abspath(folder)
+        on_disk = {}
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name.lower().endswith(SUPPORTED_EXTENSIONS) and not name.startswith('.'):
+                    path = os.path.join(root, name)
+                    try:
+                        on_disk[path] = os.path.getmtime(path)
+                    except OSError:
+                        continue
+
+        known = dict(self._conn.execute("SELECT path, mtime FROM documents WHERE path LIKE ? ESCAPE '\\'",
+                                        (self._like_prefix(folder),)))
+        for path in known.keys() - on_disk.keys():
+            self._remove_document(path)
+            summary.removed += 1
+
+        for done, (path, mtime) in enumerate(sorted(on_disk.items()), 1):
+            if known.get(path) == mtime:
+                summary.unchanged += 1
+            elif self.index_document(path, mtime):
+                summary.indexed += 1
+            else:
+                summary.failed += 1
+            if progress: progress(done, len(on_disk))
+        return summary
+
+    def index_document(self, path: str, mtime: float | None = None) -> bool:
+        try:
+            raw_text, highlights, mode = parser.parse_document(path, self.file_tags)
+            mtime = os.path.getmtime(path) if mtime is None else mtime
+        except Exception:
+            # Unreadable or malformed files are skipped; they're retried once their mtime changes.
+            return False
+
+        with self._conn:
+            self._delete_rows(path)
+            cursor = self._conn.execute("INSERT INTO documents(path, mtime, mode) VALUES (?, ?, ?)", (path, mtime, mode))
+            document_id = cursor.lastrowid
+            self._conn.execute("INSERT INTO document_text(rowid, body) VALUES (?, ?)", (document_id, raw_text))
+            for start, end, index in parser.resolve_highlight_ranges(raw_text, highlights):
+                h = highlights[index]
+                cursor = self._conn.execute("INSERT INTO highlights(document_id, start_pos, length, start_time) VALUES (?, ?, ?, ?)",
+                                            (document_id, start, end - start, h.start_time))
+                self._conn.execute("INSERT INTO highlight_text(rowid, body) VALUES (?, ?)", (cursor.lastrowid, h.text))
+        return True
+
+    def search(self, text: str, limit: int = 50) -> list[LibraryHit]:
+        """Highlight hits first (they are what users quote), then matches in the full document text."""
+        query = _fts_query(text)
+        if not query: return []
+        try:
+            highlight_rows = self._conn.execute("""
+                SELECT d.path, h.start_pos, h.length, h.start_time, snippet(highlight_text, 0, '[', ']', '…', 16)
+                FROM highlight_text
+                JOIN highlights h ON h.id = highlight_text.rowid
+                JOIN documents d ON d.id = h.document_id
+                WHERE highlight_text MATCH ? ORDER BY rank LIMIT ?""", (query, limit)).fetchall()
+            # FTS5 marks the tokens it matched, so the first marker is the offset of the first hit in the
+            # raw text, exactly as the tokenizer saw it; only the two positions leave SQLite, not the body.
+            document_rows = self._conn.execute("""
+                SELECT id, path, mode, instr(marked, char(2)), instr(marked, char(3)), snippet FROM (
+                    SELECT d.id, d.path, d.mode, highlight(document_text, 0, char(2), char(3)) AS marked,
+                           snippet(document_text, 0, '[', ']', '…', 16) AS snippet
+                    FROM document_text
+                    JOIN documents d ON d.id = document_text.rowid
+                    WHERE document_text MATCH ? ORDER BY rank LIMIT ?)""", (query, max(limit - len(highlight_rows), 0))).fetchall()
+        except sqlite3.OperationalError:
+            return []
+
+        hits = [LibraryHit(path, "highlight", start, length, start_time, snippet)
+                for path, start, length, start_time, snippet in highlight_rows]
+        for document_id, path, mode, open_at, close_at, snippet in document_rows:
+            offset, length = (open_at - 1, close_at - open_at - 1) if 0 < open_at < close_at else (0, 0)
+            start_time = self._start_time_before(document_id, offset, length) if mode != "simple" else -1.0
+            hits.append(LibraryHit(path, "document", offset, length, start_time, snippet))
+        return hits
+
+    def _start_time_before(self, document_id: int, offset: int, length: int) -> float:
+        window_start = max(offset - TIMESTAMP_LOOKBACK_CHARS, 0)
+        row = self._conn.execute("SELECT substr(body, ?, ?) FROM document_text WHERE rowid = ?",
+                                 (window_start + 1, offset - window_start + length, document_id)).fetchone()
+        if row is None: return -1.0
+        window = row[0]
+        return process_new_highlight(window, window[offset - window_start:], offset - window_start).start_time
+
+    @staticmethod
+    def _like_prefix(folder: str) -> str:
+        escaped = folder.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        return escaped + os.sep.replace('\\', '\\\\') + '%'
+
+    def _indexed_paths(self, folder: str) -> list[str]:
+        rows = self._conn.execute("SELECT path FROM documents WHERE path LIKE ? ESCAPE '\\'", (self._like_prefix(folder),))
+        return [row[0] for row in rows]
+
+    def _delete_rows(self, path: str):
+        row = self._conn.execute("SELECT id FROM documents WHERE path = ?", (path,)).fetchone()
+        if row is None: return
+        document_id = row[0]
+        self._conn.execute("DELETE FROM highlight_text WHERE rowid IN (SELECT id FROM highlights WHERE document_id = ?)", (document_id,))
+        self._conn.execute("DELETE FROM highlights WHERE document_id = ?", (document_id,))
+        self._conn.execute("DELETE FROM document_text WHERE rowid = ?", (document_id,))
+        self._conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+
+    def _remove_document(self, path: str):
+        with self._conn:
+            self._delete_rows(path)
+
+def format_timestamp(seconds: float) -> str:
+    if seconds < 0: return ""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02}:{minutes:02}:{secs:02}"
+
+def main(argv=None):
+    """Headless entry point: python library_index.py [--db PATH] {add,update,search} ..."""
+    from utils import resource_path
+    with open(resource_path('config.json'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    app_config = config.get("app_config", {})
+
+    arg_parser = argparse.ArgumentParser(description="Search a library of highlighted documents.")
+    arg_parser.add_argument("--db", default=app_config.get("library_db", DEFAULT_DB_PATH))
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    add_command = commands.add_parser("add", help="add folders to the library and index them")
+    add_command.add_argument("folders", nargs="+")
+    commands.add_parser("update", help="re-index files changed since the last update")
+    search_command = commands.add_parser("search", help="search highlights and documents")
+    search_command.add_argument("query")
+    search_command.add_argument("--limit", type=int, default=20)
+    search_command.add_argument("--json", action="store_true", help="print one JSON object per hit")
+    args = arg_parser.parse_args(argv)
+
+    index = LibraryIndex(args.db, app_config.get("file_tags", []))
+    try:
+        if args.command == "add":
+            for folder in args.folders:
+                index.add_folder(folder)
+        if args.command in ("add", "update"):
+            summary = index.update()
+            print(f"Indexed {summary.indexed}, unchanged {summary.unchanged}, removed {summary.removed}, failed {summary.failed}.")
+        elif args.command == "search":
+            for hit in index.search(args.query, args.limit):
+                if args.json:
+                    print(json.dumps(hit.__dict__, ensure_ascii=False))
+                else:
+                    timestamp = format_timestamp(hit.start_time)
+                    print(f"{hit.path}:{hit.offset}{' @ ' + timestamp if timestamp else ''} [{hit.kind}] {' '.join(hit.snippet.split())}")
+    finally:
+        index.close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
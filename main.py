@@ -4,8 +4,12 @@ from theme_manager import ThemeManager
 from gui.main_window import MainWindow
 from app_controller import AppController
 from utils import resource_path  # <-- IMPORT THE HELPER
+import tracing
+import memory_profile
+from stall_watchdog import StallWatchdog
 
 if __name__ == '__main__':
+    memory_profile.configure()
     app = QApplication(sys.argv)
     
     try:
@@ -14,6 +18,7 @@ if __name__ == '__main__':
         theme_file = resource_path('themes/light.json')
         
         theme_manager = ThemeManager(config_file, theme_file)
+        tracing.configure(theme_manager)
         
         controller = AppController(theme_manager)
 
@@ -21,6 +26,13 @@ if __name__ == '__main__':
         
         window = MainWindow(theme_manager, controller)
         window.show()
+
+        stall_threshold_ms = theme_manager.get_value("app_config.stall_threshold_ms", 500)
+        if stall_threshold_ms > 0:
+            watchdog = StallWatchdog(theme_manager.get_value("app_config.stall_log_file", "~/.slothy-marker/stalls.log"),
+                                     stall_threshold_ms, document_size=lambda: len(controller.raw_text))
+            app.aboutToQuit.connect(watchdog.stop)
+            watchdog.start()
         
         sys.exit(app.exec())
         
@@ -0,0 +1,112 @@
+"""
+tracemalloc-based memory profiling, with allocations attributed to subsystems.
+
+Each traced allocation is assigned to the subsystem of the innermost frame
+that appears in SUBSYSTEM_FRAMES, e.g. the deep copies made while saving a
+history snapshot count as "history". Turn it on for a session with the
+SLOTHY_TRACEMALLOC environment variable set to a report path; the report is
+written as JSON at exit.
+"""
+import os
+import json
+import atexit
+import tracemalloc
+
+ENV_VAR = "SLOTHY_TRACEMALLOC"
+TRACEBACK_LIMIT = 32
+
+# (module file, function) -> subsystem. The innermost matching frame wins.
+SUBSYSTEM_FRAMES = {
+    ("app_controller.py", "_save_state_to_history"): "history",
+    ("app_controller.py", "_open_parsed_document"): "history",
+    ("app_controller.py", "undo"): "history",
+    ("app_controller.py", "redo"): "history",
+    ("app_controller.py", "update_highlight_text"): "text",
+    ("app_controller.py", "_add_highlight_spans"): "highlights",
+    ("highlight_index.py", "reset"): "highlights",
+    ("highlight_index.py", "highlight_added"): "highlights",
+    ("transcript_parser.py", "process_new_highlight"): "highlights",
+    ("transcript_parser.py", "parse_transcript_file"): "highlights",
+    ("parser.py", "_parse_simple"): "text",
+    ("parser.py", "parse_document"): "text",
+    ("parser.py", "resolve_highlight_ranges"): "rendered",
+    ("legacy_render.py", "render_document_with_highlights"): "rendered",
+    ("document_viewer.py", "set_content"): "rendered",
+    ("search_index.py", "__init__"): "search index",
+    ("search_index.py", "find_ranges"): "search index",
+    ("search_index.py", "search"): "search index",
+    ("speaker_index.py", "__init__"): "search index",
+    ("stats_engine.py", "document_stats"): "stats",
+}
+SUBSYSTEMS = ("text", "highlights", "history", "rendered", "search index", "stats", "other")
+
+_report_path = None
+
+def start():
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(TRACEBACK_LIMIT)
+
+def configure():
+    """Starts tracing if SLOTHY_TRACEMALLOC names a report file; the report is written at exit."""
+    global _report_path
+    path = os.environ.get(ENV_VAR)
+    if not path: return
+    _report_path = os.path.expanduser(path)
+    start()
+    atexit.register(write_report)
+
+def _subsystem(traceback: tracemalloc.Traceback) -> str:
+    # Frames are stored most recent call first.
+    for frame in traceback:
+        subsystem = SUBSYSTEM_FRAMES.get((os.path.basename(frame.filename), _function_name(frame)))
+        if subsystem: return subsystem
+    return "other"
+
+_line_functions: dict[tuple[str, int], str] = {}
+
+def _function_name(frame) -> str:
+    # tracemalloc frames carry only file and line, so the enclosing def is looked up once per line.
+    key = (frame.filename, frame.lineno)
+    name = _line_functions.get(key)
+    if name is None:
+        name = _line_functions[key] = _enclosing_function(frame.filename, frame.lineno)
+    return name
+
+_file_lines: dict[str, list[str]] = {}
+
+def _enclosing_function(filename: str, lineno: int) -> str:
+    lines = _file_lines.get(filename)
+    if lines is None:
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except (OSError, UnicodeDecodeError):
+            lines = []
+        _file_lines[filename] = lines
+    for line in reversed(lines[:lineno]):
+        stripped = line.lstrip()
+        if stripped.startswith("def "):
+            return stripped[4:].split("(", 1)[0].strip()
+    return ""
+
+def subsystem_sizes(snapshot: tracemalloc.Snapshot | None = None) -> dict[str, int]:
+    """Bytes currently allocated per subsystem."""
+    snapshot = snapshot or tracemalloc.take_snapshot()
+    sizes = dict.fromkeys(SUBSYSTEMS, 0)
+    for statistic in snapshot.statistics("traceback"):
+        sizes[_subsystem(statistic.traceback)] += statistic.size
+    return sizes
+
+def report() -> dict:
+    current, peak = tracemalloc.get_traced_memory()
+    return {"current_bytes": current, "peak_bytes": peak, "by_subsystem": subsystem_sizes()}
+
+def write_report(path: str | None = None) -> str | None:
+    path = path or _report_path
+    if not path or not tracemalloc.is_tracing(): return None
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report(), f, indent=2)
+    except OSError:
+        return None
+    return path
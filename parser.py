@@ -2,8 +2,8 @@ import os
 import re
 import docx
 import fitz
-import html
 from dataclasses import dataclass
+import tracing
 
 @dataclass(unsafe_hash=True)
 class Highlight:
@@ -12,60 +12,127 @@ class Highlight:
     start_time: float = -1.0
     end_time: float = -1.0
     display_text: str = ""
-    sort_key: int = 0
+    sort_key: float = 0 # user order in simple mode; fractional after drag-reordering
 
     def __post_init__(self):
         if not self.display_text: self.display_text = self.text
 
-def _create_styled_span(text, index, is_selected, highlight_color, selection_color):
-    bg_color = selection_color if is_selected else highlight_color
-    style = f"background-color:{bg_color};"
-    if is_selected:
-        style += " color:white;"
-    
-    escaped_text = html.escape(text).replace('\n', '<br>')
-    return f'<a href="slothy:highlight_{index}" style="color:inherit; text-decoration:none;"><span style="{style}">{escaped_text}</span></a>'
+MARKER = "=="
+ESCAPED_MARKER = "\\=="
+# A run of backslashes that ends where the file has a marker or an escaped one.
+BACKSLASHES_BEFORE_MARKER = re.compile(r'(\\+)(?===)')
+
+def tokenize_markers(content: str) -> tuple[str, list[tuple[int, int]]]:
+    """
+    Strips == highlight markers in a single pass, returning the plain text and
+    the exact (start, end) of every highlight in it.
+
+    Markers pair up left to right. Backslashes directly before == escape one
+    another in pairs: an even run stands for half as many literal backslashes
+    followed by a marker, an odd run makes the == literal text. Backslashes
+    anywhere else are plain text. An opening marker that is never closed stays
+    as literal text; an empty pair (====) is removed without creating a highlight.
+    """
+    pieces, spans = [], []
+    length = pos = 0
+    open_at = open_piece = None
+    i = content.find(MARKER)
+    while i != -1:
+        run_start = i
+        while run_start > pos and content[run_start - 1] == "\\":
+            run_start -= 1
+        run = i - run_start
+        kept = content[pos:run_start] + "\\" * (run // 2)
+        pieces.append(kept)
+        length += len(kept)
+        if run % 2:
+            pieces.append(MARKER)
+            length += len(MARKER)
+        elif open_at is None:
+            open_at, open_piece = length, len(pieces)
+        else:
+            if length > open_at: spans.append((open_at, length))
+            open_at = None
+        pos = i + len(MARKER)
+        i = content.find(MARKER, pos)
+    pieces.append(content[pos:])
+    if open_at is not None:
+        # Every span ends before the unclosed marker, so putting it back shifts none of them.
+        pieces.insert(open_piece, MARKER)
+    return "".join(pieces), spans
+
+def _escape_segment(text: str, marker_follows: bool) -> str:
+    # Literal == gets a backslash; every backslash run that will end up before an == is doubled.
+    text = BACKSLASHES_BEFORE_MARKER.sub(r'\1\1', text).replace(MARKER, ESCAPED_MARKER)
+    if marker_follows and text.endswith("\\"):
+        trailing = len(text) - len(text.rstrip("\\"))
+        text += "\\" * trailing
+    return text
+
+def insert_markers(raw_text: str, ranges: list[tuple[int, int, int]]) -> str:
+    """
+    The inverse of tokenize_markers: wraps each (start, end, index) range in ==
+    markers and escapes literal == and the backslashes before any == so the
+    result parses back to raw_text.
+    Ranges must be sorted by start; one overlapping an earlier range is skipped.
+    """
+    pieces, pos = [], 0
+    for start, end, _ in ranges:
+        if start < pos: continue
+        pieces.append(_escape_segment(raw_text[pos:start], True))
+        pieces.append(MARKER + _escape_segment(raw_text[start:end], True) + MARKER)
+        pos = end
+    pieces.append(_escape_segment(raw_text[pos:], False))
+    return "".join(pieces)
 
 def _parse_simple(content: str) -> tuple[str, list[Highlight]]:
-    raw_text = re.sub(r'==(.*?)==', r'\1', flags=re.DOTALL, string=content)
-    highlight_texts = re.findall(r'==(.*?)==', content, re.DOTALL)
-    highlights = [Highlight(text=h, start_pos=raw_text.find(h)) for h in highlight_texts]
+    raw_text, spans = tokenize_markers(content)
+    highlights = [Highlight(text=raw_text[start:end], start_pos=start) for start, end in spans]
     return raw_text, highlights
 
-def _docx_parser(filepath: str) -> tuple[str, list[str]]:
+def _docx_parser(filepath: str, with_highlights: bool = True) -> tuple[str, list[str]]:
     doc = docx.Document(filepath)
     raw_text = "\n\n".join([para.text for para in doc.paragraphs])
+    if not with_highlights: return raw_text, []
     highlights_list = [run.text for para in doc.paragraphs for run in para.runs if run.font.highlight_color]
     return raw_text, [h.strip() for h in highlights_list if h.strip()]
 
-def _pdf_parser(filepath: str) -> tuple[str, list[str]]:
+def _pdf_parser(filepath: str, with_highlights: bool = True) -> tuple[str, list[str]]:
     doc = fitz.open(filepath)
     full_text = ""
     highlights_list = []
     for page in doc:
         full_text += page.get_text("text") + "\n"
-        for annot in page.annots(types=[fitz.ANNOT_HIGHLIGHT]):
-            text = " ".join(page.get_text("text", clip=quad).strip() for quad in annot.quads() or [])
+        if not with_highlights: continue
+        for annot in page.annots(types=[fitz.PDF_ANNOT_HIGHLIGHT]):
+            points = annot.vertices or []
+            quads = [fitz.Quad(points[i:i + 4]).rect for i in range(0, len(points), 4)]
+            text = " ".join(page.get_text("text", clip=quad).strip() for quad in quads)
             if text: highlights_list.append(text)
     return full_text, [h.strip() for h in highlights_list if h.strip()]
 
-def render_document_with_highlights(raw_text: str, all_highlights: list[Highlight], selected_highlights: list[Highlight], highlight_color: str, selection_color: str) -> str:
-    rendered_text = html.escape(raw_text)
-    sorted_by_len = sorted(all_highlights, key=lambda h: len(h.text), reverse=True)
-    
-    for h_obj in sorted_by_len:
-        is_selected = (h_obj in selected_highlights)
-        try:
-            stable_index = all_highlights.index(h_obj)
-            replacement_html = _create_styled_span(h_obj.text, stable_index, is_selected, highlight_color, selection_color)
-            escaped_search_text = html.escape(h_obj.text)
-            rendered_text = re.sub(re.escape(escaped_search_text), replacement_html, rendered_text, 1)
-        except (ValueError, re.error):
-            continue
-            
-    return rendered_text.replace('\n', '<br>')
+@tracing.traced("parser.resolve_highlight_ranges")
+def resolve_highlight_ranges(raw_text: str, highlights: list[Highlight], presorted: bool = False) -> list[tuple[int, int, int]]:
+    """
+    Returns (start, end, index) for every highlight found in raw_text, sorted by start.
+    presorted=True skips the sort when highlights already come by position and all offsets hold.
+    """
+    ranges, relocated = [], False
+    for index, h in enumerate(highlights):
+        if not h.text: continue
+        start = h.start_pos
+        if start < 0 or not raw_text.startswith(h.text, start):
+            # Stale or missing offset; fall back to the first occurrence of the text.
+            start = raw_text.find(h.text)
+            if start == -1: continue
+            relocated = True
+        ranges.append((start, start + len(h.text), index))
+    if relocated or not presorted: ranges.sort()
+    return ranges
 
-def parse_document(filepath: str, file_tags: list) -> tuple[str, list, str]:
+@tracing.traced("parser.parse_document")
+def parse_document(filepath: str, file_tags: list, with_highlights: bool = True) -> tuple[str, list, str]:
+    """with_highlights=False skips extracting DOCX/PDF highlight annotations, e.g. when they are stored elsewhere."""
     from transcript_parser import parse_transcript_file
     extension = os.path.splitext(filepath)[1].lower()
     
@@ -81,20 +148,20 @@ def parse_document(filepath: str, file_tags: list) -> tuple[str, list, str]:
         first_line = content.lstrip().split('\n', 1)[0].strip()
 
         if first_line in file_tags:
-            raw_text = re.sub(r'==(.*?)==', r'\1', flags=re.DOTALL, string=content)
-            highlights = parse_transcript_file(content)
+            raw_text, spans = tokenize_markers(content)
+            highlights = parse_transcript_file(raw_text, spans)
             return raw_text, highlights, first_line
         else:
             raw_text, highlights = _parse_simple(content)
             return raw_text, highlights, "simple"
             
     elif extension == '.docx':
-        raw_text, highlights_text = _docx_parser(filepath)
+        raw_text, highlights_text = _docx_parser(filepath, with_highlights)
         highlights = [Highlight(text=h, start_pos=raw_text.find(h)) for h in highlights_text]
         return raw_text, highlights, "simple"
 
     elif extension == '.pdf':
-        raw_text, highlights_text = _pdf_parser(filepath)
+        raw_text, highlights_text = _pdf_parser(filepath, with_highlights)
         highlights = [Highlight(text=h, start_pos=raw_text.find(h)) for h in highlights_text]
         return raw_text, highlights, "simple"
         
@@ -0,0 +1,35 @@
+import re
+from bisect import bisect_left
+
+# Characters outside the BMP take two UTF-16 code units (a surrogate pair) in Qt.
+ASTRAL_PATTERN = re.compile('[\U00010000-\U0010FFFF]')
+
+class PositionMap:
+    """
+    Maps raw-text offsets to positions in the viewer's QTextDocument and back.
+
+    The viewer holds either the whole raw text or, for very large documents,
+    the window [window_start, window_end) of it. Raw offsets count code points
+    while Qt counts UTF-16 units, so every non-BMP character (emoji, some CJK)
+    before a position shifts it by one; their offsets are kept sorted and
+    bisected. Built once per loaded text.
+    """
+    def __init__(self, window_start: int = 0, window_end: int = 0, window_text: str = ""):
+        self.window_start = window_start
+        self.window_end = window_end
+        # Window-relative code point offsets of non-BMP characters, and their viewer positions.
+        self.astral = [] if window_text.isascii() else [m.start() for m in ASTRAL_PATTERN.finditer(window_text)]
+        self._astral_view = [offset + i for i, offset in enumerate(self.astral)]
+
+    def contains(self, start: int, end: int) -> bool:
+        return self.window_start <= start and end <= self.window_end
+
+    def to_view(self, offset: int) -> int:
+        """Viewer position of a raw offset, clamped to the loaded window."""
+        offset = min(max(offset, self.window_start), self.window_end) - self.window_start
+        return offset + bisect_left(self.astral, offset) if self.astral else offset
+
+    def to_raw(self, position: int) -> int:
+        # Every pair starting before position adds one unit; a position inside a pair maps to its character.
+        if self.astral: position -= bisect_left(self._astral_view, position)
+        return self.window_start + position
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+import parser
+from highlight_index import IntervalTree
+
+# Rough footprint of one range across the plan's list, tuple, dict entries and ints.
+RANGE_SIZE_ESTIMATE = 240
+
+def _formats(ranges: list, selected_indexes) -> dict:
+    formats = {}
+    for start, end, index in ranges:
+        key = (start, end)
+        formats[key] = formats.get(key, False) or index in selected_indexes
+    return formats
+
+@dataclass(frozen=True)
+class RenderPlan:
+    """Everything the viewer needs to show one document version with one selection, in raw offsets."""
+    ranges: list # (start, end, index), sorted by start
+    intervals: IntervalTree # over ranges, for hit-testing and clipping to a window
+    range_by_index: dict
+    formats: dict # (start, end) -> is_selected
+    selected_indexes: frozenset
+
+    def estimated_size(self) -> int:
+        return (len(self.ranges) + len(self.formats)) * RANGE_SIZE_ESTIMATE + self.intervals.estimated_size()
+
+    def with_selection(self, selected_indexes) -> "RenderPlan":
+        """The same version with another selection; only the format map is rebuilt."""
+        selected = frozenset(selected_indexes)
+        return replace(self, formats=_formats(self.ranges, selected), selected_indexes=selected)
+
+def build_render_plan(raw_text: str, highlights: list, selected_indexes) -> RenderPlan:
+    ranges = parser.resolve_highlight_ranges(raw_text, highlights)
+    selected = frozenset(selected_indexes)
+    return RenderPlan(
+        ranges, IntervalTree([r[0] for r in ranges], [r[1] for r in ranges]),
+        {index: (start, end) for start, end, index in ranges}, _formats(ranges, selected), selected)
+
+class RenderCache:
+    """
+    Size-bounded LRU of render plans keyed by document version and selection.
+
+    A version is any object that stands for one immutable document state (the
+    controller's history snapshots). Entries hold on to their version, so its
+    id can't be reused by another object while it is cached. A selection
+    change for a cached version reuses that version's resolved ranges.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple, tuple[object, RenderPlan]] = OrderedDict()
+        self._size = 0
+
+    def lookup(self, version, selected_indexes) -> RenderPlan | None:
+        """The cached plan, or one derived cheaply from the same version's ranges; None when ranges must be resolved."""
+        if version is None: return None
+        key = (id(version), frozenset(selected_indexes))
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is version:
+            self._entries.move_to_end(key)
+            return entry[1]
+        sibling = next((p for v, p in self._entries.values() if v is version), None)
+        if sibling is None: return None
+        plan = sibling.with_selection(selected_indexes)
+        self.put(version, plan)
+        return plan
+
+    def put(self, version, plan: RenderPlan):
+        if version is None: return
+        key = (id(version), plan.selected_indexes)
+        old = self._entries.pop(key, None)
+        if old is not None: self._size -= old[1].estimated_size()
+        size = plan.estimated_size()
+        if size > self.max_bytes: return
+        self._entries[key] = (version, plan)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted.estimated_size()
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
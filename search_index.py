@@ -0,0 +1,174 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from keyword_matcher import KeywordMatcher, leftmost_longest
+
+@dataclass(frozen=True)
+class SearchQuery:
+    text: str
+    regex: bool = False
+    whole_word: bool = False
+
+class SearchCancelled(Exception):
+    """Raised inside a search when its should_cancel callback reports the query is stale."""
+
+def as_search_query(query) -> SearchQuery:
+    return query if isinstance(query, SearchQuery) else SearchQuery(query)
+
+class SearchIndex:
+    """
+    Case-insensitive substring index over one version of a document's raw text.
+
+    The casefolded text is built once; queries are answered with C-level scans
+    over it and memoised, and a query that extends a cached one (the usual case
+    while typing) is answered by filtering the shorter query's hits instead of
+    rescanning the document. Regex and whole-word searches are memoised too.
+    The index is shared with background search tasks, so caches are locked.
+    """
+    MAX_CACHED_QUERIES = 64
+    CANCEL_CHECK_INTERVAL = 1024
+
+    def __init__(self, text: str):
+        self.text = text
+        self.folded = text.casefold()
+        # casefold() never shrinks a character, so equal lengths mean offsets line up 1:1.
+        self._raw_of = None
+        if len(self.folded) != len(text):
+            self._raw_of = [i for i, ch in enumerate(text) for _ in ch.casefold()]
+        self._cache: OrderedDict[str, list[int]] = OrderedDict()
+        self._search_cache: OrderedDict[SearchQuery, list[tuple[int, int]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _remember(cache: OrderedDict, key, value):
+        cache[key] = value
+        if len(cache) > SearchIndex.MAX_CACHED_QUERIES:
+            cache.popitem(last=False)
+
+    def _folded_starts(self, folded_query: str) -> list[int]:
+        # Every occurrence, overlapping ones included, so a longer query can filter these hits.
+        with self._lock:
+            cached = self._cache.get(folded_query)
+            if cached is not None:
+                self._cache.move_to_end(folded_query)
+                return cached
+
+            prefix_hits = None
+            for length in range(len(folded_query) - 1, 0, -1):
+                prefix_hits = self._cache.get(folded_query[:length])
+                if prefix_hits is not None: break
+
+        if prefix_hits is not None:
+            startswith = self.folded.startswith
+            starts = [p for p in prefix_hits if startswith(folded_query, p)]
+        else:
+            starts = []
+            find = self.folded.find
+            pos = find(folded_query)
+            while pos != -1:
+                starts.append(pos)
+                pos = find(folded_query, pos + 1)
+
+        with self._lock:
+            self._remember(self._cache, folded_query, starts)
+        return starts
+
+    def find_ranges(self, query: str) -> list[tuple[int, int]]:
+        """Returns the (start, end) raw-text ranges of every non-overlapping match, in document order."""
+        if not query: return []
+        folded_query = query.casefold()
+        length = len(folded_query)
+        starts, last_end = [], -1
+        for s in self._folded_starts(folded_query):
+            # Matches don't overlap, like re.finditer: "aa" occurs twice in "aaaa", not three times.
+            if s >= last_end:
+                starts.append(s)
+                last_end = s + length
+        if self._raw_of is None:
+            return [(s, s + length) for s in starts]
+        raw_of = self._raw_of
+        return [(raw_of[s], raw_of[s + length - 1] + 1) for s in starts]
+
+    def search(self, query, should_cancel=None) -> list[tuple[int, int]]:
+        """
+        Returns the (start, end) ranges matching a SearchQuery (or plain string).
+        Raises re.error for an invalid pattern and SearchCancelled if should_cancel() turns true.
+        """
+        query = as_search_query(query)
+        if not query.text: return []
+        if not (query.regex or query.whole_word):
+            return self.find_ranges(query.text)
+
+        with self._lock:
+            cached = self._search_cache.get(query)
+            if cached is not None:
+                self._search_cache.move_to_end(query)
+                return cached
+
+        if query.regex:
+            ranges = self._regex_ranges(query, should_cancel)
+        else:
+            ranges = self._whole_word_ranges(query.text, should_cancel)
+        with self._lock:
+            self._remember(self._search_cache, query, ranges)
+        return ranges
+
+    def _regex_ranges(self, query: SearchQuery, should_cancel) -> list[tuple[int, int]]:
+        pattern = rf"\b(?:{query.text})\b" if query.whole_word else query.text
+        compiled = re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+        ranges = []
+        for i, match in enumerate(compiled.finditer(self.text)):
+            if should_cancel and i % self.CANCEL_CHECK_INTERVAL == 0 and should_cancel():
+                raise SearchCancelled()
+            if match.end() > match.start():
+                ranges.append(match.span())
+        return ranges
+
+    def _is_whole_word(self, start: int, end: int) -> bool:
+        raw = self.text
+        before_ok = start == 0 or not (raw[start - 1].isalnum() or raw[start - 1] == '_')
+        after_ok = end == len(raw) or not (raw[end].isalnum() or raw[end] == '_')
+        return before_ok and after_ok
+
+    def _whole_word_ranges(self, text: str, should_cancel) -> list[tuple[int, int]]:
+        ranges = []
+        for i, (start, end) in enumerate(self.find_ranges(text)):
+            if should_cancel and i % self.CANCEL_CHECK_INTERVAL == 0 and should_cancel():
+                raise SearchCancelled()
+            if self._is_whole_word(start, end):
+                ranges.append((start, end))
+        return ranges
+
+    def keyword_ranges(self, matcher: KeywordMatcher, whole_word: bool = False) -> list[tuple[int, int]]:
+        """
+        Returns the raw-text ranges of every keyword of the matcher, in one pass over
+        the document. Overlapping matches are resolved leftmost-longest.
+        """
+        if matcher.case_sensitive or self._raw_of is None:
+            ranges = matcher.find_all(self.text if matcher.case_sensitive else self.folded)
+        else:
+            raw_of = self._raw_of
+            ranges = [(raw_of[s], raw_of[e - 1] + 1) for s, e in matcher.find_all(self.folded)]
+        if whole_word:
+            ranges = [r for r in ranges if self._is_whole_word(*r)]
+        return leftmost_longest(ranges)
+
+    def count(self, query) -> int:
+        return len(self.search(query))
+
+    def locate(self, query, offset: int, backwards=False) -> tuple[int, tuple[int, int]] | None:
+        """
+        Finds the match after (or before, when searching backwards) a raw-text offset,
+        wrapping around the document. Returns (match_number, (start, end)) or None.
+        """
+        ranges = self.search(query)
+        if not ranges: return None
+        starts = [r[0] for r in ranges]
+        if backwards:
+            i = bisect_left(starts, offset) - 1
+        else:
+            i = bisect_right(starts, offset)
+        i %= len(ranges)
+        return i, ranges[i]
@@ -0,0 +1,124 @@
+import re
+from bisect import bisect_right
+from parser import Highlight
+from stats_engine import HighlightTotals
+from transcript_parser import _timestamp_line, _timestamp_header
+
+SPEAKER_PREFIX_PATTERN = re.compile(r'^\s*Speaker\s*(\d+)[:\-]?\s*', re.IGNORECASE)
+VOICE_TAG_PATTERN = re.compile(r'^\s*<v(?:\.[^\s>]*)?\s+([^>]+)>')
+# "00:00:12:05 Professor Von Sloth": the label follows the timestamp on its line.
+INLINE_LABEL_PATTERN = re.compile(r'^\d{1,2}:\d{2}:\d{2}(?:[:.,]\d+)?\s+(\S.*?):?$')
+MAX_LABEL_WORDS = 4
+
+def _is_label_line(line: str) -> bool:
+    # A label on its own line under a bare timestamp: a short name, not a sentence or a stage direction.
+    return len(line.split()) <= MAX_LABEL_WORDS and line[-1] not in '.?!,;)]' and line[0] not in '([<'
+
+class SpeakerIndex:
+    """
+    Speaker labels of one version of a transcript or subtitle document.
+
+    The text is split once into segments: every cue (timestamp line) starts
+    one, and so does every line opening with a label ("Speaker 2:", a VTT
+    <v Name> tag). [TRANSCRIPT] turns take the label after their timestamp or
+    on the line below it. Offsets are answered by bisecting the segment
+    starts, so a highlight's speaker costs O(log n) and never rereads text.
+    """
+    def __init__(self, text: str, mode: str):
+        self.text = text
+        self.mode = mode
+        self._starts: list[int] = [] # raw offset of each segment, ascending
+        self._speakers: list[str | None] = []
+        self._cues: list[int] = [] # cue of each segment
+        self._label_ends: list[int] = [] # end of a "Speaker N:" prefix opening the segment, or -1
+        self.cue_times: list[tuple[float, float]] = [] # (start, end) seconds of each cue
+        self.ranges: dict[str, list[tuple[int, int]]] = {} # speaker -> raw ranges of their segments
+        if mode == "simple": return
+
+        is_transcript = mode == "[TRANSCRIPT]"
+        awaiting_label = False
+        line_start = 0
+        for line in text.split('\n'):
+            stripped = line.strip()
+            offset, line_start = line_start, line_start + len(line) + 1
+            if not stripped: continue
+            if _timestamp_line(stripped):
+                _, start_time, end_time = _timestamp_header(text, offset, stripped)
+                self.cue_times.append((start_time, end_time))
+                label = INLINE_LABEL_PATTERN.match(stripped) if is_transcript else None
+                self._open(offset, label.group(1) if label else None)
+                awaiting_label = is_transcript and label is None
+            elif self.cue_times:
+                prefix = SPEAKER_PREFIX_PATTERN.match(line)
+                voice = None if prefix else VOICE_TAG_PATTERN.match(line)
+                if prefix:
+                    self._open(offset, f"Speaker {int(prefix.group(1))}", offset + prefix.end())
+                elif voice:
+                    self._open(offset, voice.group(1).strip())
+                elif awaiting_label and _is_label_line(stripped):
+                    self._speakers[-1] = stripped.rstrip(':')
+                awaiting_label = False
+
+        ends = self._starts[1:] + [len(text)]
+        for start, end, speaker in zip(self._starts, ends, self._speakers):
+            if speaker is not None:
+                self.ranges.setdefault(speaker, []).append((start, end))
+        self._fill_end_times()
+
+    def _open(self, offset: int, speaker: str | None, label_end: int = -1):
+        self._starts.append(offset)
+        self._speakers.append(speaker)
+        self._cues.append(len(self.cue_times) - 1)
+        self._label_ends.append(label_end)
+
+    def _fill_end_times(self):
+        # Transcripts only mark where a turn starts; it lasts until the next one does.
+        for i, (start, end) in enumerate(self.cue_times):
+            if end <= start and i + 1 < len(self.cue_times):
+                self.cue_times[i] = (start, self.cue_times[i + 1][0])
+
+    @property
+    def speakers(self) -> list[str]:
+        """Every labelled speaker, in order of first appearance."""
+        return list(self.ranges)
+
+    def _segment(self, offset: int) -> int:
+        return bisect_right(self._starts, offset) - 1
+
+    def speaker_of(self, offset: int) -> str | None:
+        i = self._segment(offset)
+        return self._speakers[i] if i >= 0 else None
+
+    def cue_duration(self, offset: int) -> float:
+        """Length in seconds of the cue containing offset, 0 if it has no usable times."""
+        i = self._segment(offset)
+        if i < 0: return 0.0
+        start, end = self.cue_times[self._cues[i]]
+        return end - start if start >= 0 and end > start else 0.0
+
+    def highlights_by_speaker(self, highlights: list[Highlight]) -> dict[str, list[Highlight]]:
+        by_speaker = {speaker: [] for speaker in self.ranges}
+        for h in highlights:
+            speaker = self.speaker_of(h.start_pos)
+            if speaker is not None: by_speaker[speaker].append(h)
+        return by_speaker
+
+    def speaker_totals(self, highlights: list[Highlight]) -> dict[str, HighlightTotals]:
+        """Word counts and cue durations of each speaker's highlights, counted like StatsEngine does."""
+        totals = {speaker: HighlightTotals() for speaker in self.ranges}
+        for speaker, speaker_highlights in self.highlights_by_speaker(highlights).items():
+            t = totals[speaker]
+            for h in speaker_highlights:
+                words = len(h.text.split())
+                t.word_count += words
+                if h.start_time >= 0:
+                    t.timed_word_count += words
+                    t.timed_duration += self.cue_duration(h.start_pos)
+        return totals
+
+    def cue_text(self, h: Highlight) -> str:
+        """A highlight's text for a subtitle cue, without the "Speaker N:" label its line opens with."""
+        i = self._segment(h.start_pos)
+        if i >= 0 and h.start_pos < self._label_ends[i]:
+            return h.text[self._label_ends[i] - h.start_pos:].strip()
+        return h.text.strip()
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import time
+import logging
+import threading
+import traceback
+from logging.handlers import RotatingFileHandler
+from PySide6.QtCore import QObject, Signal, Qt
+
+class StallWatchdog(QObject):
+    """
+    Detects main-thread stalls by pinging the Qt event loop from a helper thread.
+
+    When a ping goes unanswered for longer than the threshold, the main thread's
+    Python stack is captured with sys._current_frames(). Once the event loop
+    answers, the stall is logged with its duration, that stack and the size of
+    the current document to a rotating log file.
+    """
+    _ping = Signal(int)
+    stall_detected = Signal(float) # duration in seconds
+
+    def __init__(self, log_path: str, threshold_ms: int = 500, interval_ms: int = 100, document_size=lambda: 0):
+        super().__init__()
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._document_size = document_size
+        self._main_thread_id = threading.main_thread().ident
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sequence = 0
+        self._pending_since = None
+        self._stall = None # (stack, document size) captured while the current ping is overdue
+
+        self.log_path = os.path.expanduser(log_path)
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        self._logger = logging.getLogger(f"slothy_marker.stalls.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._handler = RotatingFileHandler(self.log_path, maxBytes=1_000_000, backupCount=3, encoding='utf-8', delay=True)
+        self._logger.addHandler(self._handler)
+
+        # The watchdog lives on the main thread, so queued pings are answered by its event loop.
+        self._ping.connect(self._pong, Qt.QueuedConnection)
+
+    def start(self):
+        if self._thread is not None: return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._handler.close()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            now = time.monotonic()
+            with self._lock:
+                if self._pending_since is None:
+                    self._sequence += 1
+                    self._pending_since = now
+                    sequence = self._sequence
+                elif self._stall is None and now - self._pending_since >= self.threshold:
+                    self._stall = self._capture()
+                    continue
+                else:
+                    continue
+            self._ping.emit(sequence)
+
+    def _capture(self) -> tuple[str, int]:
+        frame = sys._current_frames().get(self._main_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame is not None else ""
+        try:
+            size = self._document_size()
+        except Exception:
+            size = -1
+        return stack, size
+
+    def _pong(self, sequence: int):
+        with self._lock:
+            if sequence != self._sequence or self._pending_since is None: return
+            duration = time.monotonic() - self._pending_since
+            stall, self._stall = self._stall, None
+            self._pending_since = None
+        if stall is None: return
+        stack, size = stall
+        self._logger.info(json.dumps({
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "duration_ms": round(duration * 1000),
+            "document_chars": size, "stack": stack,
+        }))
+        self.stall_detected.emit(duration)
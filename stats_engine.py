@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from parser import Highlight
+import tracing
+
+def _time_to_seconds(time_str: str) -> float:
+    time_str = time_str.strip().replace(',', '.')
+    try:
+        parts = list(map(float, time_str.split(':')))
+        if len(parts) == 3: return parts[0] * 3600 + parts[1] * 60 + parts[2]
+        if len(parts) == 2: return parts[0] * 60 + parts[1]
+    except (ValueError, IndexError):
+        return -1.0
+    return -1.0
+
+def parse_duration_from_line(line: str) -> float:
+    """Parses a full timestamp line (e.g., 00:01.. --> 00:02..) and returns the duration."""
+    parts = line.split('-->')
+    if len(parts) != 2:
+        return 0.0
+    
+    start_time = _time_to_seconds(parts[0])
+    end_time = _time_to_seconds(parts[1])
+
+    if start_time >= 0 and end_time > start_time:
+        return end_time - start_time
+    return 0.0
+
+def _highlight_duration(h: Highlight) -> float:
+    # The display_text contains the timestamp line
+    for line in h.display_text.split('\n'):
+        if '-->' in line:
+            return parse_duration_from_line(line)
+    return 0.0
+
+@dataclass(frozen=True)
+class DocumentStats:
+    word_count: int
+    duration: float
+
+@dataclass
+class HighlightTotals:
+    word_count: int = 0
+    timed_word_count: int = 0
+    timed_duration: float = 0.0
+
+class StatsEngine:
+    """
+    Keeps word counts and durations current without rescanning.
+
+    Document stats are computed once per text version (undo/redo hand back the
+    same string objects, so revisits are cache hits). Highlight totals are
+    running sums adjusted per added, removed or edited highlight.
+    """
+    MAX_CACHED_DOCUMENTS = 8
+
+    def __init__(self):
+        self._document_cache: OrderedDict[int, tuple[str, DocumentStats]] = OrderedDict()
+        self._records: dict[int, tuple[int, bool, float]] = {}
+        self.highlight_totals = HighlightTotals()
+
+    @tracing.traced("StatsEngine.document_stats")
+    def document_stats(self, text: str) -> DocumentStats:
+        entry = self._document_cache.get(id(text))
+        if entry is not None and entry[0] is text:
+            self._document_cache.move_to_end(id(text))
+            return entry[1]
+
+        duration = 0.0
+        if '-->' in text:
+            duration = sum(parse_duration_from_line(line) for line in text.split('\n') if '-->' in line)
+        stats = DocumentStats(len(text.split()), duration)
+        self._document_cache[id(text)] = (text, stats)
+        if len(self._document_cache) > self.MAX_CACHED_DOCUMENTS:
+            self._document_cache.popitem(last=False)
+        return stats
+
+    def _apply(self, record: tuple[int, bool, float], sign: int):
+        words, is_timed, duration = record
+        totals = self.highlight_totals
+        totals.word_count += sign * words
+        if is_timed:
+            totals.timed_word_count += sign * words
+            totals.timed_duration += sign * duration
+
+    def reset_highlights(self, highlights: list[Highlight]):
+        self._records = {}
+        self.highlight_totals = HighlightTotals()
+        for h in highlights:
+            self.highlight_added(h)
+
+    def highlight_added(self, h: Highlight):
+        record = (len(h.text.split()), h.start_time >= 0, _highlight_duration(h))
+        self._records[id(h)] = record
+        self._apply(record, 1)
+
+    def highlight_removed(self, h: Highlight):
+        record = self._records.pop(id(h), None)
+        if record: self._apply(record, -1)
+
+    def highlight_changed(self, h: Highlight):
+        self.highlight_removed(h)
+        self.highlight_added(h)
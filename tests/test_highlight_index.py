@@ -0,0 +1,47 @@
+import random
+import unittest
+
+from highlight_index import IntervalTree, HighlightIndex
+from parser import Highlight
+
+def span(h):
+    return (h.start_pos, h.start_pos + len(h.text))
+
+class IntervalTreeTest(unittest.TestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(1000):
+            intervals = sorted((s, s + rng.randint(1, 30)) for s in (rng.randint(0, 100) for _ in range(rng.randint(0, 40))))
+            tree = IntervalTree([s for s, _ in intervals], [e for _, e in intervals])
+            for _ in range(10):
+                start = rng.randint(-5, 140)
+                end = start + rng.randint(1, 20)
+                self.assertEqual(tree.overlapping(start, end), [i for i, (s, e) in enumerate(intervals) if s < end and e > start])
+                self.assertEqual(tree.stabbing(start), [i for i, (s, e) in enumerate(intervals) if s <= start < e])
+
+    def test_long_interval_does_not_hide_short_ones(self):
+        tree = IntervalTree([0, 10, 20, 30], [1000, 15, 25, 35])
+        self.assertEqual(tree.stabbing(22), [0, 2])
+        self.assertEqual(tree.overlapping(14, 31), [0, 1, 2, 3])
+        self.assertEqual(tree.stabbing(1000), [])
+
+class HighlightIndexQueryTest(unittest.TestCase):
+    def test_queries_follow_edits(self):
+        rng = random.Random(1)
+        highlights = [Highlight(text="x" * rng.randint(1, 50), start_pos=rng.randint(0, 900)) for _ in range(200)]
+        index = HighlightIndex()
+        index.reset(highlights[:100])
+        for h in highlights[100:]: index.highlight_added(h)
+        for h in highlights[:20]: index.highlight_removed(h)
+        index.shift_after(500, 7)
+        live = highlights[20:]
+        for _ in range(200):
+            start = rng.randint(0, 1000)
+            end = start + rng.randint(1, 40)
+            got = index.overlapping(start, end)
+            self.assertEqual([span(h) for h in got], sorted(span(h) for h in got))
+            self.assertEqual({id(h) for h in got}, {id(h) for h in live if span(h)[0] < end and span(h)[1] > start})
+            self.assertEqual({id(h) for h in index.covering(start)}, {id(h) for h in live if span(h)[0] <= start < span(h)[1]})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import random
+import unittest
+
+import parser
+
+def round_trip(raw_text, spans):
+    saved = parser.insert_markers(raw_text, [(start, end, i) for i, (start, end) in enumerate(spans)])
+    return parser.tokenize_markers(saved)
+
+class MarkerRoundTripTest(unittest.TestCase):
+    def test_backslash_before_highlight_end(self):
+        raw = 'path C:\\ x'
+        self.assertEqual(parser.insert_markers(raw, [(8, 10, 0)]), 'path C:\\\\== x==')
+        self.assertEqual(round_trip(raw, [(8, 10)]), (raw, [(8, 10)]))
+
+    def test_highlight_ending_in_backslash(self):
+        raw = 'see C:\\ now'
+        self.assertEqual(round_trip(raw, [(4, 7)]), (raw, [(4, 7)]))
+
+    def test_backslash_runs_at_boundaries(self):
+        for raw, spans in [('\\', [(0, 1)]), ('a\\\\', [(1, 3)]), ('\\\\b', [(2, 3)]),
+                           ('x\\==y', [(0, 2)]), ('\\==', []), ('a\\\\\\', [(0, 2)])]:
+            with self.subTest(raw=raw, spans=spans):
+                self.assertEqual(round_trip(raw, spans), (raw, spans))
+
+    def test_legacy_escapes_still_parse(self):
+        self.assertEqual(parser.tokenize_markers('a \\== b ==hi== c\\d'), ('a == b hi c\\d', [(7, 9)]))
+
+    def test_random_texts_round_trip(self):
+        rng = random.Random(0)
+        for _ in range(5000):
+            tokens = [rng.choice(['a', ' ', '\\', '\\\\', '==']) for _ in range(rng.randint(0, 12))]
+            bounds = [0]
+            for token in tokens: bounds.append(bounds[-1] + len(token))
+            raw = "".join(tokens)
+            # Highlights start and end between tokens, never inside a literal ==.
+            cuts = sorted(rng.sample(bounds, min(len(bounds), 2 * rng.randint(0, 3))))
+            spans = [(cuts[i], cuts[i + 1]) for i in range(0, len(cuts) - 1, 2) if cuts[i] < cuts[i + 1]]
+            self.assertEqual(round_trip(raw, spans), (raw, spans), repr(raw))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Opt-in timing spans for the hot paths, written as a Chrome/Perfetto trace.
+
+Tracing is off unless the SLOTHY_TRACE environment variable or the
+app_config.trace_file setting names an output file ("1" picks a file in the
+temp directory). While off, traced functions cost one global lookup per call.
+Open the trace in chrome://tracing or https://ui.perfetto.dev.
+"""
+import os
+import json
+import atexit
+import tempfile
+import threading
+import functools
+from contextlib import contextmanager, nullcontext
+from time import perf_counter_ns
+
+ENV_VAR = "SLOTHY_TRACE"
+MAX_EVENTS = 1_000_000
+
+_events: list | None = None
+_output_path: str | None = None
+_summary: dict[str, list[int]] = {}
+_lock = threading.Lock()
+_null_span = nullcontext()
+_pid = os.getpid()
+
+def configure(theme_manager=None):
+    """Turns tracing on if the environment or config asks for it; the trace is written at exit."""
+    path = os.environ.get(ENV_VAR) or (theme_manager.get_value("app_config.trace_file", "") if theme_manager else "")
+    if path: enable(path)
+
+def enable(path: str):
+    global _events, _output_path
+    if path == "1":
+        path = os.path.join(tempfile.gettempdir(), f"slothy-marker-trace-{_pid}.json")
+    if _events is None:
+        _events = []
+        atexit.register(write)
+    _output_path = os.path.expanduser(path)
+
+def is_enabled() -> bool:
+    return _events is not None
+
+def output_path() -> str | None:
+    return _output_path
+
+def _record(name: str, start_ns: int, end_ns: int, args: dict | None):
+    duration = end_ns - start_ns
+    event = {"name": name, "cat": "slothy", "ph": "X", "pid": _pid, "tid": threading.get_ident(),
+             "ts": start_ns / 1000, "dur": duration / 1000}
+    if args: event["args"] = args
+    with _lock:
+        if len(_events) < MAX_EVENTS: _events.append(event)
+        totals = _summary.setdefault(name, [0, 0])
+        totals[0] += duration
+        totals[1] += 1
+
+@contextmanager
+def _span(name: str, args: dict):
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        _record(name, start, perf_counter_ns(), args)
+
+def span(name: str, **args):
+    """Context manager timing the enclosed block; keyword arguments are attached to the event."""
+    if _events is None: return _null_span
+    return _span(name, args)
+
+def traced(name: str):
+    """Decorator form of span() for whole functions and methods."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _events is None: return fn(*args, **kwargs)
+            start = perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, start, perf_counter_ns(), None)
+        return wrapper
+    return decorate
+
+def take_summary() -> list[tuple[str, float, int]]:
+    """Returns (name, total ms, calls) per span since the last call, slowest first, and resets it."""
+    global _summary
+    with _lock:
+        summary, _summary = _summary, {}
+    return sorted(((name, total / 1e6, count) for name, (total, count) in summary.items()),
+                  key=lambda item: item[1], reverse=True)
+
+def format_summary(summary: list[tuple[str, float, int]], limit: int = 5) -> str:
+    return " · ".join(f"{name} {ms:.1f} ms" + (f" ×{count}" if count > 1 else "")
+                      for name, ms, count in summary[:limit])
+
+def write(path: str | None = None) -> str | None:
+    """Writes every event recorded so far; returns the file written, if any."""
+    path = path or _output_path
+    if _events is None or not path: return None
+    with _lock:
+        events = list(_events)
+    try:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    except OSError:
+        return None
+    return path
@@ -1,6 +1,7 @@
 import re
 from dataclasses import dataclass
 from parser import Highlight
+import tracing
 
 def _time_to_seconds(time_str: str) -> float:
     # MODIFIED: More robustly find the first timestamp in a line
@@ -20,33 +21,44 @@ def _time_to_seconds(time_str: str) -> float:
         return -1.0
     return -1.0
 
-def _find_preceding_timestamp(text_before: str) -> tuple[str | None, float, float]:
-    lines = text_before.strip().split('\n')
-    # Iterate backwards to find the last timestamp block
-    for i in range(len(lines) - 1, -1, -1):
-        line = lines[i].strip()
-        
-        # Look for a line containing time info
-        if '-->' in line or re.search(r'\d{1,2}:\d{2}:\d{2}', line):
-            start_time, end_time = -1.0, -1.0
-            
-            # If it's a range (SRT/VTT), parse both start and end
-            if '-->' in line:
-                parts = line.split('-->')
-                start_time = _time_to_seconds(parts[0])
-                end_time = _time_to_seconds(parts[1])
-            # Otherwise, it's a simple timestamp (just a start time)
-            else:
-                start_time = _time_to_seconds(line)
+TIMESTAMP_PATTERN = re.compile(r'\d{1,2}:\d{2}:\d{2}')
 
-            # Reconstruct the full header, checking for a sequence number above
-            full_header = line
-            if i > 0 and lines[i-1].strip().isdigit():
-                full_header = f"{lines[i-1].strip()}\n{line}"
-            
-            return full_header, start_time, end_time
+def _timestamp_line(line: str) -> bool:
+    return '-->' in line or TIMESTAMP_PATTERN.search(line) is not None
 
-    return None, -1.0, -1.0
+def _timestamp_header(text: str, line_start: int, line: str) -> tuple[str, float, float]:
+    start_time, end_time = -1.0, -1.0
+    # If it's a range (SRT/VTT), parse both start and end
+    if '-->' in line:
+        parts = line.split('-->')
+        start_time = _time_to_seconds(parts[0])
+        end_time = _time_to_seconds(parts[1])
+    # Otherwise, it's a simple timestamp (just a start time)
+    else:
+        start_time = _time_to_seconds(line)
+
+    # Reconstruct the full header, checking for a sequence number above
+    full_header = line
+    if line_start > 0:
+        previous = text[text.rfind('\n', 0, line_start - 1) + 1:line_start - 1].strip()
+        if previous.isdigit():
+            full_header = f"{previous}\n{line}"
+    return full_header, start_time, end_time
+
+def _find_preceding_timestamp(text: str, pos: int, stop: int = 0) -> tuple[str, float, float] | None:
+    """
+    Walks back line by line from pos (the partial line before pos included) to
+    the nearest timestamp line, without looking at lines that start before stop.
+    """
+    end = pos
+    while True:
+        line_start = text.rfind('\n', 0, end) + 1
+        if line_start < stop: return None
+        line = text[line_start:end].strip()
+        if line and _timestamp_line(line):
+            return _timestamp_header(text, line_start, line)
+        if line_start == 0: return None
+        end = line_start - 1
 
 def _create_display_text(time_str: str | None, highlight_text: str) -> str:
     clean_highlight = highlight_text.replace("==", "")
@@ -56,17 +68,19 @@ def _create_display_text(time_str: str | None, highlight_text: str) -> str:
     # If no timestamp, just show the text
     return clean_highlight
 
-def parse_transcript_file(raw_text: str) -> list[Highlight]:
+@tracing.traced("transcript_parser.parse_transcript_file")
+def parse_transcript_file(raw_text: str, spans: list[tuple[int, int]]) -> list[Highlight]:
+    """Builds highlights for the marker spans of a transcript (see parser.tokenize_markers)."""
     highlights = []
-    highlight_pattern = re.compile(r'==(.+?)==', re.DOTALL)
-    
-    for match in highlight_pattern.finditer(raw_text):
-        highlight_text = match.group(1)
-        start_pos = match.start(1) # Get start position of the content inside '=='
-        
-        text_before_highlight = raw_text[:start_pos]
-        time_str, start_time, end_time = _find_preceding_timestamp(text_before_highlight)
-        
+    # Spans arrive in document order, so each backwards search only has to cover the
+    # lines since the previous highlight; beyond that the previous answer still holds.
+    previous, scanned_from = (None, -1.0, -1.0), 0
+    for start_pos, end_pos in spans:
+        found = _find_preceding_timestamp(raw_text, start_pos, scanned_from)
+        if found is not None: previous = found
+        scanned_from = raw_text.rfind('\n', 0, start_pos) + 1
+        time_str, start_time, end_time = previous
+        highlight_text = raw_text[start_pos:end_pos]
         highlights.append(Highlight(
             text=highlight_text,
             start_pos=start_pos,
@@ -76,9 +90,9 @@ def parse_transcript_file(raw_text: str) -> list[Highlight]:
         ))
     return highlights
 
+@tracing.traced("transcript_parser.process_new_highlight")
 def process_new_highlight(raw_text: str, selected_text: str, selection_start: int) -> Highlight:
-    text_before_selection = raw_text[:selection_start]
-    time_str, start_time, end_time = _find_preceding_timestamp(text_before_selection)
+    time_str, start_time, end_time = _find_preceding_timestamp(raw_text, selection_start) or (None, -1.0, -1.0)
     
     return Highlight(
         text=selected_text,
@@ -86,4 +100,4 @@ def process_new_highlight(raw_text: str, selected_text: str, selection_start: in
         start_time=start_time,
         end_time=end_time,
         display_text=_create_display_text(time_str, selected_text)
-    )
\ No newline at end of file
+    )
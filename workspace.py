@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import atexit
+import shutil
+import hashlib
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass, field, asdict
+from parser import Highlight
+from search_index import SearchQuery
+
+# Rough per-Highlight footprint (object, dict, strings) used for budgeting.
+HIGHLIGHT_SIZE_ESTIMATE = 400
+
+@dataclass
+class DocumentState:
+    """Everything the controller needs to resume work on one open document."""
+    filepath: str
+    raw_text: str
+    highlights: list
+    document_mode: str
+    history: list = field(default_factory=list)
+    history_index: int = -1
+    last_shown_search: object = None
+    search_index: object = None
+    content_hash: str | None = None
+
+    @property
+    def is_modified(self) -> bool:
+        return self.history_index > 0
+
+    def estimated_size(self) -> int:
+        # History snapshots share unchanged text objects, so each distinct string is counted once.
+        texts = {id(self.raw_text): self.raw_text}
+        highlight_count = len(self.highlights)
+        for text, highlights in self.history:
+            texts[id(text)] = text
+            highlight_count += len(highlights)
+        size = sum(sys.getsizeof(t) for t in texts.values()) + highlight_count * HIGHLIGHT_SIZE_ESTIMATE
+        if self.search_index is not None:
+            size += sys.getsizeof(self.search_index.folded)
+        return size
+
+    def to_json(self) -> dict:
+        # History snapshots share text objects, so each distinct string is written once and referenced by index.
+        texts, text_ids = [], {}
+        def text_ref(text):
+            if id(text) not in text_ids:
+                text_ids[id(text)] = len(texts)
+                texts.append(text)
+            return text_ids[id(text)]
+        search = self.last_shown_search
+        if isinstance(search, str): search = SearchQuery(search)
+        return {
+            "filepath": self.filepath,
+            "texts": texts,
+            "raw_text": text_ref(self.raw_text),
+            "highlights": [asdict(h) for h in self.highlights],
+            "document_mode": self.document_mode,
+            "history": [[text_ref(text), [asdict(h) for h in highlights]] for text, highlights in self.history],
+            "history_index": self.history_index,
+            "last_shown_search": asdict(search) if search else None,
+            "content_hash": self.content_hash,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "DocumentState":
+        texts = data["texts"]
+        search = data["last_shown_search"]
+        return cls(
+            filepath=data["filepath"],
+            raw_text=texts[data["raw_text"]],
+            highlights=[Highlight(**h) for h in data["highlights"]],
+            document_mode=data["document_mode"],
+            history=[(texts[text], [Highlight(**h) for h in highlights]) for text, highlights in data["history"]],
+            history_index=data["history_index"],
+            last_shown_search=SearchQuery(**search) if search else None,
+            content_hash=data["content_hash"],
+        )
+
+class Workspace:
+    """
+    The set of open documents, kept in memory in least-recently-used order.
+
+    When the estimated size of the in-memory documents exceeds the budget, the
+    least recently used ones (never the active one) are written as JSON to a
+    cache directory and dropped from memory; switching back reads them instead
+    of re-parsing the source file. Unless a cache_dir is given, the cache is a
+    private directory created on first use and deleted at exit.
+    """
+    def __init__(self, memory_budget_bytes: int, cache_dir: str | None = None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.cache_dir = cache_dir
+        self._open_order: list[str] = []
+        self._states: OrderedDict[str, DocumentState] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._modified: dict[str, bool] = {}
+        self.active_path: str | None = None
+        self._owns_cache_dir = False
+
+    def paths(self) -> list[str]:
+        return list(self._open_order)
+
+    def is_open(self, path: str) -> bool:
+        return path in self._modified
+
+    def is_modified(self, path: str) -> bool:
+        return self._modified.get(path, False)
+
+    def is_in_memory(self, path: str) -> bool:
+        return path in self._states
+
+    def memory_in_use(self) -> int:
+        return sum(self._sizes.values())
+
+    def most_recent(self, exclude: str | None = None) -> str | None:
+        recent = [p for p in self._states if p != exclude]
+        if recent: return recent[-1]
+        return next((p for p in reversed(self._open_order) if p != exclude), None)
+
+    def put(self, state: DocumentState):
+        path = state.filepath
+        if path not in self._modified:
+            self._open_order.append(path)
+        self._states[path] = state
+        self._states.move_to_end(path)
+        self._sizes[path] = state.estimated_size()
+        self._modified[path] = state.is_modified
+        self._evict_over_budget()
+
+    def take(self, path: str) -> DocumentState | None:
+        """Returns the state of an open document, loading it back from the cache if it was evicted."""
+        state = self._states.get(path)
+        if state is None:
+            state = self._load_evicted(path)
+            if state is None: return None
+            self._states[path] = state
+            self._sizes[path] = state.estimated_size()
+        self._states.move_to_end(path)
+        self._evict_over_budget()
+        return state
+
+    def remove(self, path: str):
+        if path in self._modified:
+            self._open_order.remove(path)
+        self._states.pop(path, None)
+        self._sizes.pop(path, None)
+        self._modified.pop(path, None)
+        self._remove_cache_file(path)
+        if self.active_path == path:
+            self.active_path = None
+
+    def clear(self):
+        for path in list(self._open_order):
+            self.remove(path)
+
+    def close(self):
+        """Drops every document and deletes the session's own cache directory."""
+        self.clear()
+        if self._owns_cache_dir:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.cache_dir, self._owns_cache_dir = None, False
+
+    def _ensure_cache_dir(self):
+        if self.cache_dir is None:
+            # mkdtemp makes the directory readable by this user only.
+            self.cache_dir = tempfile.mkdtemp(prefix="slothy-marker-workspace-")
+            self._owns_cache_dir = True
+            atexit.register(self.close)
+        else:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _cache_file(self, path: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(path.encode('utf-8')).hexdigest() + ".json")
+
+    def _remove_cache_file(self, path: str):
+        if self.cache_dir is None: return
+        try:
+            os.remove(self._cache_file(path))
+        except OSError:
+            pass
+
+    def _evict_over_budget(self):
+        while self.memory_in_use() > self.memory_budget_bytes:
+            victim = next((p for p in self._states if p != self.active_path), None)
+            if victim is None or not self._evict(victim): return
+
+    def _evict(self, path: str) -> bool:
+        state = self._states.pop(path)
+        self._sizes.pop(path, None)
+        try:
+            self._ensure_cache_dir()
+            # The search index is cheap to rebuild and doubles the text size, so it isn't cached.
+            with open(self._cache_file(path), 'w', encoding='utf-8') as f:
+                json.dump(state.to_json(), f, ensure_ascii=False)
+        except (OSError, TypeError, ValueError):
+            # Without a cache file the document has to stay resident.
+            self._states[path] = state
+            self._states.move_to_end(path, last=False)
+            self._sizes[path] = state.estimated_size()
+            return False
+        return True
+
+    def _load_evicted(self, path: str) -> DocumentState | None:
+        if path not in self._modified or self.cache_dir is None: return None
+        try:
+            with open(self._cache_file(path), 'r', encoding='utf-8') as f:
+                return DocumentState.from_json(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, IndexError):
+            return None